@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import auth, organizations, public, organization_registration, team_management, public_status, services, incidents
+from app.api.v1.endpoints import auth, organizations, public, organization_registration, team_management, public_status, services, incidents, internal, changes, dashboard, batch
 
 api_router = APIRouter()
 
@@ -18,6 +18,12 @@ api_router.include_router(services.router, prefix="/organization", tags=["servic
 # Include incident management routes (admin only)
 api_router.include_router(incidents.router, prefix="/organization", tags=["incident-management"])
 
+# Include the admin dashboard aggregate
+api_router.include_router(dashboard.router, prefix="/organization", tags=["dashboard"])
+
+# Include the change feed for delta sync of the admin pages
+api_router.include_router(changes.router, prefix="/organization", tags=["change-feed"])
+
 # Include organization routes
 api_router.include_router(organizations.router, prefix="/organizations", tags=["organizations"])
 
@@ -27,6 +33,12 @@ api_router.include_router(public.router, prefix="/public", tags=["public"])
 # Include public status pages (no authentication required)
 api_router.include_router(public_status.router, prefix="/status", tags=["public-status"])
 
+# Include batched sub-requests, run in-process
+api_router.include_router(batch.router, tags=["batch"])
+
+# Include internal diagnostics (token protected)
+api_router.include_router(internal.router, prefix="/internal", tags=["internal"])
+
 @api_router.get("/health")
 def health_check():
     return {"status": "healthy", "database": "SQLite"}
\ No newline at end of file
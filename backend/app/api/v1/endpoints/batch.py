@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import Response
+from sqlalchemy.orm import Session
+from app.db.session.database import get_db
+from app.core.batch import batch_response_body, run_batch
+from app.core.dependencies import get_current_user
+from app.models.user import User
+from app.schemas.batch import BatchRequest
+
+router = APIRouter()
+
+@router.post("/batch")
+async def run_batch_requests(
+    batch: BatchRequest,
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Run up to 50 API calls in one request, as the current user.
+    Responses come back in order as {"status", "body"}. With transactional set,
+    the first failure rolls back every write and the rest are not run (424).
+    """
+    results, committed = await run_batch(request, batch.requests, current_user, db, batch.transactional)
+    return Response(content=batch_response_body(results, committed), media_type="application/json")
@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy.orm import Session
+from app.db.session.database import get_db
+from app.core.config import settings
+from app.core.dependencies import get_current_user
+from app.core.responses import negotiated_response
+from app.models.user import User, UserRole
+from app.services.change_feed import get_changes
+
+router = APIRouter()
+
+@router.get("/changes")
+def get_organization_changes(
+    request: Request,
+    since: int = Query(0, ge=0, description="Last sequence the client has seen"),
+    limit: int = Query(500, ge=1, le=settings.CHANGE_FEED_MAX_LIMIT, description="Maximum log entries to read"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Incidents, services, settings and members changed since a sequence number.
+    Poll again with the returned sequence; when has_more is set there is more to
+    read right away, and when reset is set the client must refetch its lists.
+    """
+    return negotiated_response(request, get_changes(
+        db,
+        current_user.organization_id,
+        since,
+        limit,
+        # Team lists are admin-only
+        include_members=current_user.role == UserRole.ADMIN
+    ))
@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy.orm import Session
+from app.db.session.database import get_db
+from app.core.dependencies import get_current_user
+from app.core.responses import negotiated_response
+from app.models.user import User, UserRole
+from app.services.dashboard import get_organization_dashboard
+
+router = APIRouter()
+
+@router.get("/dashboard")
+def get_dashboard(
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Active incidents, services, incident statistics and pending-member count in one response."""
+    return negotiated_response(request, get_organization_dashboard(
+        db,
+        current_user.organization_id,
+        # Pending members are only visible to admins; others get null
+        include_members=current_user.role == UserRole.ADMIN
+    ))
@@ -1,21 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from app.db.session.database import get_db
+from datetime import datetime
+from app.db.session.database import SCOPE_SESSION_KEY, get_db
 from app.core.dependencies import get_current_user
+from app.core.responses import (
+    csv_chunks,
+    ndjson_chunks,
+    negotiated_response,
+    streaming_download,
+    streaming_json_response,
+    trusted_response
+)
+from app.core.wire_formats import JSON, negotiate_format
 from app.models.user import User, UserRole
 from app.schemas.incident import IncidentCreate, IncidentUpdate, IncidentStatusUpdate, IncidentResponse
 from app.services.incident_management import (
-    get_incidents_by_organization,
-    get_incidents_by_service,
+    iter_organization_incidents,
     get_incident_by_id,
     create_incident,
     update_incident,
     update_incident_status,
     delete_incident,
-    get_active_incidents_by_organization,
     get_incident_statistics
 )
+from app.services.incident_export import EXPORT_FIELDS, iter_incident_export
+from app.services.public_status import naive_utc
 
 router = APIRouter()
 
@@ -37,41 +47,68 @@ def require_admin_or_editor(current_user: User = Depends(get_current_user)):
         )
     return current_user
 
+def _incident_to_dict(incident, creator_email: Optional[str] = None) -> dict:
+    """Build an IncidentResponse-shaped dict enriched with service and creator info."""
+    if creator_email is None and incident.creator:
+        creator_email = incident.creator.email
+    return {
+        "id": incident.id,
+        "title": incident.title,
+        "description": incident.description,
+        "status": incident.status.value,
+        "impact": incident.impact.value,
+        "service_id": incident.service_id,
+        "created_by": incident.created_by,
+        "resolved_at": incident.resolved_at,
+        "created_at": incident.created_at,
+        "updated_at": incident.updated_at,
+        "service_name": incident.service.name if incident.service else None,
+        "creator_email": creator_email
+    }
+
 @router.get("/incidents", response_model=List[IncidentResponse])
 def get_organization_incidents(
+    request: Request,
     service_id: Optional[str] = Query(None, description="Filter by service ID"),
     active_only: bool = Query(False, description="Show only active incidents"),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user)
 ):
-    """Get incidents for the current user's organization."""
-    if service_id:
-        incidents = get_incidents_by_service(db, service_id, current_user.organization_id)
-    elif active_only:
-        incidents = get_active_incidents_by_organization(db, current_user.organization_id)
-    else:
-        incidents = get_incidents_by_organization(db, current_user.organization_id)
+    """Get incidents for the current user's organization, streamed as they are read."""
+    incidents = iter_organization_incidents(
+        current_user.organization_id,
+        service_id=service_id,
+        # A service filter lists all of that service's incidents
+        active_only=active_only and not service_id,
+        db=request.scope.get(SCOPE_SESSION_KEY)
+    )
     
     # Enrich with service and creator info
-    enriched_incidents = []
-    for incident in incidents:
-        incident_dict = {
-            "id": incident.id,
-            "title": incident.title,
-            "description": incident.description,
-            "status": incident.status.value,
-            "impact": incident.impact.value,
-            "service_id": incident.service_id,
-            "created_by": incident.created_by,
-            "resolved_at": incident.resolved_at,
-            "created_at": incident.created_at,
-            "updated_at": incident.updated_at,
-            "service_name": incident.service.name if incident.service else None,
-            "creator_email": incident.creator.email if incident.creator else None
-        }
-        enriched_incidents.append(incident_dict)
-    
-    return enriched_incidents
+    rows = (_incident_to_dict(incident) for incident in incidents)
+    if negotiate_format(request.headers.get("accept")) != JSON:
+        # Binary formats are encoded whole
+        return negotiated_response(request, list(rows))
+    return streaming_json_response(rows, headers={"Vary": "Accept"})
+
+@router.get("/incidents/export")
+def export_organization_incidents(
+    request: Request,
+    format: str = Query("csv", pattern="^(csv|ndjson)$", description="csv or ndjson"),
+    service_id: Optional[str] = Query(None, description="Filter by service ID"),
+    start: Optional[datetime] = Query(None, description="Incidents created at or after (UTC)"),
+    end: Optional[datetime] = Query(None, description="Incidents created before (UTC)"),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Export the organization's incidents with resolution times, streamed.
+    gzip / brotli compressed on the fly when the client accepts it.
+    """
+    rows = iter_incident_export(
+        current_user.organization_id, service_id=service_id, start=naive_utc(start), end=naive_utc(end),
+        db=request.scope.get(SCOPE_SESSION_KEY)
+    )
+    if format == "csv":
+        return streaming_download(request, csv_chunks(EXPORT_FIELDS, rows), "text/csv", "incidents.csv")
+    return streaming_download(request, ndjson_chunks(rows), "application/x-ndjson", "incidents.ndjson")
 
 @router.post("/incidents", response_model=IncidentResponse)
 def create_organization_incident(
@@ -88,20 +125,7 @@ def create_organization_incident(
         )
     
     # Return enriched response
-    return {
-        "id": incident.id,
-        "title": incident.title,
-        "description": incident.description,
-        "status": incident.status.value,
-        "impact": incident.impact.value,
-        "service_id": incident.service_id,
-        "created_by": incident.created_by,
-        "resolved_at": incident.resolved_at,
-        "created_at": incident.created_at,
-        "updated_at": incident.updated_at,
-        "service_name": incident.service.name if incident.service else None,
-        "creator_email": current_user.email
-    }
+    return trusted_response(_incident_to_dict(incident, creator_email=current_user.email))
 
 @router.get("/incidents/{incident_id}", response_model=IncidentResponse)
 def get_incident(
@@ -117,20 +141,7 @@ def get_incident(
             detail="Incident not found"
         )
     
-    return {
-        "id": incident.id,
-        "title": incident.title,
-        "description": incident.description,
-        "status": incident.status.value,
-        "impact": incident.impact.value,
-        "service_id": incident.service_id,
-        "created_by": incident.created_by,
-        "resolved_at": incident.resolved_at,
-        "created_at": incident.created_at,
-        "updated_at": incident.updated_at,
-        "service_name": incident.service.name if incident.service else None,
-        "creator_email": incident.creator.email if incident.creator else None
-    }
+    return trusted_response(_incident_to_dict(incident))
 
 @router.put("/incidents/{incident_id}", response_model=IncidentResponse)
 def update_organization_incident(
@@ -147,20 +158,7 @@ def update_organization_incident(
             detail="Incident not found"
         )
     
-    return {
-        "id": incident.id,
-        "title": incident.title,
-        "description": incident.description,
-        "status": incident.status.value,
-        "impact": incident.impact.value,
-        "service_id": incident.service_id,
-        "created_by": incident.created_by,
-        "resolved_at": incident.resolved_at,
-        "created_at": incident.created_at,
-        "updated_at": incident.updated_at,
-        "service_name": incident.service.name if incident.service else None,
-        "creator_email": incident.creator.email if incident.creator else None
-    }
+    return trusted_response(_incident_to_dict(incident))
 
 @router.patch("/incidents/{incident_id}/status")
 def update_incident_status_endpoint(
@@ -0,0 +1,85 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from app.core.dependencies import require_internal_access
+from app.core.config import settings
+from app.core.circuit_breaker import status_breaker
+from app.core.heavy_hitters import tenant_tracker
+from app.core.invalidation import invalidation_bus
+from app.core.profiling import profiler
+from app.core.singleflight import status_flights
+from app.core.snapshots import fallback_store, shared_snapshots, snapshot_cache
+from app.core.tenant_costs import METRICS, cost_ledger
+from app.services.cdn_purge import purge_dispatcher
+from app.services.domain_map import domain_map
+from app.services.snapshot_prewarm import prewarmer
+
+router = APIRouter(dependencies=[Depends(require_internal_access)])
+
+@router.get("/profile")
+def get_profile_summary():
+    """Get sampling profiler status and per-route sample counts."""
+    return {
+        "running": profiler.running,
+        "interval_seconds": profiler.interval,
+        "started_at": profiler.started_at,
+        "samples": profiler.sample_count,
+        "routes": profiler.routes()
+    }
+
+@router.get("/profile/flamegraph", response_class=PlainTextResponse)
+def download_flamegraph(
+    route: Optional[str] = Query(None, description="Only stacks for this route key, e.g. 'GET /api/v1/health'"),
+    include_idle: bool = Query(False, description="Include threads parked on locks, queues or selectors"),
+    reset: bool = Query(False, description="Clear collected samples after download")
+):
+    """
+    Download collected stacks in folded format.
+    Feed the file to flamegraph.pl or drop it into speedscope.
+    """
+    body = profiler.folded(route=route, include_idle=include_idle)
+    if reset:
+        profiler.reset()
+    return PlainTextResponse(
+        body,
+        headers={"Content-Disposition": 'attachment; filename="profile.folded"'}
+    )
+
+@router.get("/cache")
+def get_cache_stats():
+    """Get status snapshot cache, build coalescing and circuit breaker counters."""
+    return {
+        "snapshots": snapshot_cache.stats(),
+        "shared_store": shared_snapshots.files.stats(),
+        "single_flight": status_flights.stats(),
+        "breaker": status_breaker.stats(),
+        "fallback": fallback_store.stats(),
+        "prewarm": prewarmer.stats(),
+        "domains": domain_map.stats(),
+        "cdn_purge": purge_dispatcher.stats()
+    }
+
+@router.get("/invalidation")
+def get_invalidation_stats():
+    """Get invalidation bus delivery, lag and dropped-message counters."""
+    return invalidation_bus.stats()
+
+@router.get("/tenants")
+def get_tenant_traffic(limit: int = Query(20, ge=1, le=200)):
+    """
+    Get the busiest organizations and endpoints on this worker.
+    Rates are estimates from decaying count-min sketches.
+    """
+    return tenant_tracker.report(limit)
+
+@router.get("/tenant-costs")
+def get_tenant_costs(
+    minutes: int = Query(15, ge=1, le=settings.TENANT_COST_RETENTION_MINUTES),
+    limit: int = Query(20, ge=1, le=500),
+    sort: str = Query("db_ms", description="One of: " + ", ".join(METRICS)),
+    organization_id: Optional[str] = Query(None, description="Also return this organization's per-minute series")
+):
+    """Rank organizations by database time, queries, rows or response bytes across this host's workers."""
+    if sort not in METRICS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of: {', '.join(METRICS)}")
+    return cost_ledger.report(minutes, limit, sort, organization_id)
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy.orm import Session
 from app.db.session.database import get_db
 from app.schemas.organization_settings import (
@@ -10,18 +10,46 @@ from app.schemas.organization_settings import (
 from app.services.organization_settings import (
     get_organization_settings,
     create_organization_settings,
-    update_organization_settings,
-    get_public_status_page
+    update_organization_settings
 )
 from app.services.public_status import (
-    get_organization_incident_timeline,
-    get_organization_incident_timeline
+    MAX_TIMELINE_DAYS,
+    TIMELINE_INCIDENT_FIELDS,
+    TIMELINE_SECTIONS,
+    TIMELINE_SERVICE_FIELDS
 )
-from app.core.dependencies import get_current_user
+from app.services.status_snapshots import get_public_page_snapshot, get_timeline_snapshot
+from app.core.dependencies import get_current_user, parse_selection_parameter
+from app.core.cdn import cdn_headers
+from app.core.responses import snapshot_response, trusted_response
 from app.models.user import User
+from typing import Optional
 
 router = APIRouter()
 
+def _settings_to_dict(settings) -> dict:
+    """Build an OrganizationSettingsResponse-shaped dict from the ORM row."""
+    return {
+        "id": settings.id,
+        "organization_id": settings.organization_id,
+        "page_title": settings.page_title,
+        "page_description": settings.page_description,
+        "custom_domain": settings.custom_domain,
+        "subdomain": settings.subdomain,
+        "logo_url": settings.logo_url,
+        "primary_color": settings.primary_color,
+        "background_color": settings.background_color,
+        "custom_css": settings.custom_css,
+        "show_incident_history": settings.show_incident_history,
+        "show_uptime_stats": settings.show_uptime_stats,
+        "maintenance_mode": settings.maintenance_mode,
+        "maintenance_message": settings.maintenance_message,
+        "contact_email": settings.contact_email,
+        "support_url": settings.support_url,
+        "created_at": settings.created_at.isoformat(),
+        "updated_at": settings.updated_at.isoformat()
+    }
+
 @router.get("/settings", response_model=OrganizationSettingsResponse)
 def get_settings(
     current_user: User = Depends(get_current_user),
@@ -41,26 +69,7 @@ def get_settings(
             detail="Organization settings not found"
         )
     
-    return OrganizationSettingsResponse(
-        id=settings.id,
-        organization_id=settings.organization_id,
-        page_title=settings.page_title,
-        page_description=settings.page_description,
-        custom_domain=settings.custom_domain,
-        subdomain=settings.subdomain,
-        logo_url=settings.logo_url,
-        primary_color=settings.primary_color,
-        background_color=settings.background_color,
-        custom_css=settings.custom_css,
-        show_incident_history=settings.show_incident_history,
-        show_uptime_stats=settings.show_uptime_stats,
-        maintenance_mode=settings.maintenance_mode,
-        maintenance_message=settings.maintenance_message,
-        contact_email=settings.contact_email,
-        support_url=settings.support_url,
-        created_at=settings.created_at.isoformat(),
-        updated_at=settings.updated_at.isoformat()
-    )
+    return trusted_response(_settings_to_dict(settings))
 
 @router.post("/settings", response_model=OrganizationSettingsResponse)
 def create_settings(
@@ -84,26 +93,7 @@ def create_settings(
         )
     
     new_settings = create_organization_settings(db, current_user.organization_id, settings)
-    return OrganizationSettingsResponse(
-        id=new_settings.id,
-        organization_id=new_settings.organization_id,
-        page_title=new_settings.page_title,
-        page_description=new_settings.page_description,
-        custom_domain=new_settings.custom_domain,
-        subdomain=new_settings.subdomain,
-        logo_url=new_settings.logo_url,
-        primary_color=new_settings.primary_color,
-        background_color=new_settings.background_color,
-        custom_css=new_settings.custom_css,
-        show_incident_history=new_settings.show_incident_history,
-        show_uptime_stats=new_settings.show_uptime_stats,
-        maintenance_mode=new_settings.maintenance_mode,
-        maintenance_message=new_settings.maintenance_message,
-        contact_email=new_settings.contact_email,
-        support_url=new_settings.support_url,
-        created_at=new_settings.created_at.isoformat(),
-        updated_at=new_settings.updated_at.isoformat()
-    )
+    return trusted_response(_settings_to_dict(new_settings))
 
 @router.put("/settings", response_model=OrganizationSettingsResponse)
 def update_settings(
@@ -125,62 +115,49 @@ def update_settings(
             detail="Organization settings not found"
         )
     
-    return OrganizationSettingsResponse(
-        id=updated_settings.id,
-        organization_id=updated_settings.organization_id,
-        page_title=updated_settings.page_title,
-        page_description=updated_settings.page_description,
-        custom_domain=updated_settings.custom_domain,
-        subdomain=updated_settings.subdomain,
-        logo_url=updated_settings.logo_url,
-        primary_color=updated_settings.primary_color,
-        background_color=updated_settings.background_color,
-        custom_css=updated_settings.custom_css,
-        show_incident_history=updated_settings.show_incident_history,
-        show_uptime_stats=updated_settings.show_uptime_stats,
-        maintenance_mode=updated_settings.maintenance_mode,
-        maintenance_message=updated_settings.maintenance_message,
-        contact_email=updated_settings.contact_email,
-        support_url=updated_settings.support_url,
-        created_at=updated_settings.created_at.isoformat(),
-        updated_at=updated_settings.updated_at.isoformat()
-    )
+    return trusted_response(_settings_to_dict(updated_settings))
 
 # Public endpoints (no authentication required)
 @router.get("/public/{identifier}", response_model=PublicStatusPage)
 def get_public_status_page_by_identifier(
     identifier: str,
+    request: Request,
     db: Session = Depends(get_db)
 ):
     """Get public status page by subdomain or custom domain."""
-    status_page = get_public_status_page(db, identifier)
-    if not status_page:
+    snapshot = get_public_page_snapshot(db, identifier)
+    if not snapshot:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Status page not found"
         )
     
-    return status_page
+    return snapshot_response(request, snapshot, headers=cdn_headers(snapshot, "services", "incidents", "settings"))
 
 @router.get("/public/org/{organization_id}", response_model=PublicStatusPage)
 def get_public_status_page_by_org_id(
     organization_id: str,
+    request: Request,
     db: Session = Depends(get_db)
 ):
     """Get public status page by organization ID."""
-    status_page = get_public_status_page(db, organization_id, by_org_id=True)
-    if not status_page:
+    snapshot = get_public_page_snapshot(db, organization_id, by_org_id=True)
+    if not snapshot:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Status page not found"
         )
     
-    return status_page
+    return snapshot_response(request, snapshot, headers=cdn_headers(snapshot, "services", "incidents", "settings"))
 
 @router.get("/public/{identifier}/incidents/timeline")
 def get_public_incident_timeline(
     identifier: str,
-    days: int = 30,
+    request: Request,
+    days: int = Query(30, ge=1, le=MAX_TIMELINE_DAYS, description="Days to look back"),
+    include: Optional[str] = Query(None, description="Sections to return: " + ", ".join(TIMELINE_SECTIONS)),
+    service_fields: Optional[str] = Query(None, alias="fields[services]", description="Service fields: " + ", ".join(TIMELINE_SERVICE_FIELDS)),
+    incident_fields: Optional[str] = Query(None, alias="fields[incidents]", description="Incident block fields: " + ", ".join(TIMELINE_INCIDENT_FIELDS)),
     db: Session = Depends(get_db)
 ):
     """
@@ -189,13 +166,22 @@ def get_public_incident_timeline(
     
     Args:
         identifier: Organization ID or name
-        days: Number of days to look back (default: 30)
+        days: Number of days to look back (default: 30, at most 365)
+        include: Sections to return (incident blocks, summary, legend); default all
+        fields[services], fields[incidents]: Fields to return; default all
     """
-    timeline_data = get_organization_incident_timeline(db, identifier, days)
-    if not timeline_data:
+    snapshot = get_timeline_snapshot(
+        db,
+        identifier,
+        days,
+        parse_selection_parameter(include, TIMELINE_SECTIONS, "include"),
+        parse_selection_parameter(service_fields, TIMELINE_SERVICE_FIELDS, "fields[services]"),
+        parse_selection_parameter(incident_fields, TIMELINE_INCIDENT_FIELDS, "fields[incidents]")
+    )
+    if not snapshot:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Organization not found"
         )
     
-    return timeline_data
+    return snapshot_response(request, snapshot, headers=cdn_headers(snapshot, "services", "incidents"))
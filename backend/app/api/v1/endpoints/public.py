@@ -1,37 +1,76 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
+from app.core.cdn import cdn_headers
+from app.core.responses import snapshot_response
 from app.db.session.database import get_db
 from app.schemas.organization_settings import PublicStatusPage
-from app.services.organization_settings import get_public_status_page
+from app.services.branding import get_branding_css_asset
+from app.services.status_snapshots import get_public_page_snapshot
 
 router = APIRouter()
 
+@router.get("/status", response_model=PublicStatusPage)
+def get_public_status_page_by_host():
+    """
+    Get the public status page for the requested host.
+    Vanity domains are routed to the organization's page by HostRoutingMiddleware;
+    reaching this handler means the host isn't one.
+    """
+    raise HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="Status page not found"
+    )
+
 @router.get("/status/{identifier}", response_model=PublicStatusPage)
 def get_public_status_page_by_identifier(
     identifier: str,
+    request: Request,
     db: Session = Depends(get_db)
 ):
     """Get public status page by subdomain or custom domain."""
-    status_page = get_public_status_page(db, identifier)
-    if not status_page:
+    snapshot = get_public_page_snapshot(db, identifier)
+    if not snapshot:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Status page not found"
         )
     
-    return status_page
+    return snapshot_response(request, snapshot, headers=cdn_headers(snapshot, "services", "incidents", "settings"))
 
 @router.get("/status/org/{organization_id}", response_model=PublicStatusPage)
 def get_public_status_page_by_org_id(
     organization_id: str,
+    request: Request,
     db: Session = Depends(get_db)
 ):
     """Get public status page by organization ID."""
-    status_page = get_public_status_page(db, organization_id, by_org_id=True)
-    if not status_page:
+    snapshot = get_public_page_snapshot(db, organization_id, by_org_id=True)
+    if not snapshot:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Status page not found"
         )
     
-    return status_page
+    return snapshot_response(request, snapshot, headers=cdn_headers(snapshot, "services", "incidents", "settings"))
+
+@router.get("/branding/{organization_id}/{content_hash}.css")
+def get_branding_css(
+    organization_id: str,
+    content_hash: str,
+    request: Request,
+    db: Session = Depends(get_db)
+):
+    """Get an organization's custom CSS. The URL names its content, so it is cached forever."""
+    asset = get_branding_css_asset(db, organization_id, content_hash)
+    if not asset:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Stylesheet not found"
+        )
+    
+    return snapshot_response(
+        request,
+        asset,
+        headers={"Cache-Control": "public, max-age=31536000, immutable"},
+        media_type="text/css"
+    )
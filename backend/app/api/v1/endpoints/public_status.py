@@ -1,83 +1,181 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import Response
 from sqlalchemy.orm import Session
+from app.core.cdn import cdn_headers
+from app.core.circuit_breaker import StatusUnavailableError, status_breaker
+from app.core.dependencies import parse_selection_parameter
+from app.core.responses import snapshot_response
 from app.db.session.database import get_db
-from app.services.public_status import get_organization_status_page, get_all_organizations_list
-from typing import List
+from app.schemas.public_status import BatchStatusRequest
+from app.services.public_status import (
+    IMPACTS,
+    INCIDENT_FIELDS,
+    SERVICE_FIELDS,
+    STATUS_SECTIONS,
+    decode_history_cursor
+)
+from app.services.status_snapshots import (
+    get_directory_snapshot,
+    get_status_page_snapshot,
+    get_status_services_snapshot,
+    get_status_services_batch,
+    get_status_incidents_snapshot,
+    get_incident_history_snapshot
+)
+from datetime import datetime
+from typing import List, Optional
 
 router = APIRouter()
 
 @router.get("/organizations", response_model=List[dict])
-def get_organizations_directory(db: Session = Depends(get_db)):
+def get_organizations_directory(request: Request, db: Session = Depends(get_db)):
     """
     Get a directory of all organizations and their status.
     This is a public endpoint that doesn't require authentication.
     """
-    organizations = get_all_organizations_list(db)
-    return organizations
+    snapshot = get_directory_snapshot(db)
+    return snapshot_response(request, snapshot, headers=cdn_headers(snapshot))
+
+@router.post("/organizations/batch")
+def get_organizations_status_batch(batch: BatchStatusRequest, db: Session = Depends(get_db)):
+    """
+    Get overall and per-service status for up to 200 organizations at once.
+    Same shape per organization as /organizations/{org_identifier}/services,
+    keyed by the identifier given; unknown identifiers are listed in not_found.
+    """
+    identifiers = list(dict.fromkeys(batch.organizations))
+    snapshots, not_found, unavailable = get_status_services_batch(db, identifiers)
+    if unavailable and not snapshots:
+        raise StatusUnavailableError(status_breaker.retry_after())
+    
+    # Splice the cached bodies together rather than decoding and re-encoding them
+    body = b",".join(
+        orjson.dumps(identifier) + b":" + snapshots[identifier].variant("identity")
+        for identifier in identifiers if identifier in snapshots
+    )
+    return Response(
+        content=b'{"organizations":{' + body + b'},"not_found":' + orjson.dumps(not_found)
+        + b',"unavailable":' + orjson.dumps(unavailable) + b"}",
+        media_type="application/json"
+    )
 
 @router.get("/organizations/{org_identifier}/status")
 def get_organization_public_status(
     org_identifier: str,
+    request: Request,
+    include: Optional[str] = Query(None, description="Sections to return: " + ", ".join(STATUS_SECTIONS)),
+    service_fields: Optional[str] = Query(None, alias="fields[services]", description="Service fields: " + ", ".join(SERVICE_FIELDS)),
+    incident_fields: Optional[str] = Query(None, alias="fields[incidents]", description="Incident fields: " + ", ".join(INCIDENT_FIELDS)),
     db: Session = Depends(get_db)
 ):
     """
     Get public status page for a specific organization.
     org_identifier can be organization ID or subdomain.
     This is a public endpoint that doesn't require authentication.
+    include and fields[...] trim the payload; unselected data isn't queried.
     """
-    status_data = get_organization_status_page(db, org_identifier)
+    sections = parse_selection_parameter(include, STATUS_SECTIONS, "include")
+    snapshot = get_status_page_snapshot(
+        db,
+        org_identifier,
+        sections,
+        parse_selection_parameter(service_fields, SERVICE_FIELDS, "fields[services]"),
+        parse_selection_parameter(incident_fields, INCIDENT_FIELDS, "fields[incidents]")
+    )
     
-    if not status_data:
+    if not snapshot:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Organization not found"
         )
     
-    return status_data
+    contents = [content for content in ("services", "incidents") if sections is None or content in sections]
+    if sections is not None and "overall_status" in sections and "services" not in contents:
+        contents.append("services")
+    return snapshot_response(request, snapshot, headers=cdn_headers(snapshot, *contents))
 
 @router.get("/organizations/{org_identifier}/services")
 def get_organization_services_status(
     org_identifier: str,
+    request: Request,
+    service_fields: Optional[str] = Query(None, alias="fields[services]", description="Service fields: " + ", ".join(SERVICE_FIELDS)),
     db: Session = Depends(get_db)
 ):
     """
     Get only services status for a specific organization.
     Useful for lightweight checks or widgets.
     """
-    status_data = get_organization_status_page(db, org_identifier)
+    snapshot = get_status_services_snapshot(
+        db, org_identifier, parse_selection_parameter(service_fields, SERVICE_FIELDS, "fields[services]")
+    )
     
-    if not status_data:
+    if not snapshot:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Organization not found"
         )
     
-    return {
-        "organization": status_data["organization"],
-        "overall_status": status_data["overall_status"],
-        "services": status_data["services"],
-        "last_updated": status_data["last_updated"]
-    }
+    return snapshot_response(request, snapshot, headers=cdn_headers(snapshot, "services"))
 
 @router.get("/organizations/{org_identifier}/incidents")
 def get_organization_incidents_status(
     org_identifier: str,
+    request: Request,
+    incident_fields: Optional[str] = Query(None, alias="fields[incidents]", description="Incident fields: " + ", ".join(INCIDENT_FIELDS)),
     db: Session = Depends(get_db)
 ):
     """
     Get only incidents for a specific organization.
     Useful for incident history pages.
     """
-    status_data = get_organization_status_page(db, org_identifier)
+    snapshot = get_status_incidents_snapshot(
+        db, org_identifier, parse_selection_parameter(incident_fields, INCIDENT_FIELDS, "fields[incidents]")
+    )
+    
+    if not snapshot:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Organization not found"
+        )
+    
+    return snapshot_response(request, snapshot, headers=cdn_headers(snapshot, "incidents"))
+
+@router.get("/organizations/{org_identifier}/incidents/history")
+def get_organization_incident_history(
+    org_identifier: str,
+    request: Request,
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(25, ge=1, le=100),
+    service_id: Optional[str] = Query(None),
+    impact: Optional[str] = Query(None, description="Impacts to include: " + ", ".join(IMPACTS)),
+    start: Optional[datetime] = Query(None, description="Incidents created at or after (UTC)"),
+    end: Optional[datetime] = Query(None, description="Incidents created before (UTC)"),
+    db: Session = Depends(get_db)
+):
+    """
+    Get an organization's incident history, newest first, a page at a time.
+    Pass next_cursor back as cursor for the next page. Pages of long-resolved
+    incidents are "settled" and kept longer by tag-purged edge caches.
+    """
+    if cursor:
+        try:
+            decode_history_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"cursor: {e}"
+            )
+    
+    snapshot = get_incident_history_snapshot(
+        db, org_identifier, service_id, parse_selection_parameter(impact, IMPACTS, "impact"), start, end, cursor, limit
+    )
     
-    if not status_data:
+    if not snapshot:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Organization not found"
         )
     
-    return {
-        "organization": status_data["organization"],
-        "incidents": status_data["incidents"],
-        "last_updated": status_data["last_updated"]
-    }
+    settled = snapshot.decoded_payload()["settled"]
+    return snapshot_response(request, snapshot, headers=cdn_headers(snapshot, "incidents", settled=settled))
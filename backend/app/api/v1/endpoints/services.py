@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
 from typing import List
 from app.db.session.database import get_db
 from app.core.dependencies import get_current_user
+from app.core.responses import negotiated_response
 from app.models.user import User, UserRole
 from app.models.service import ServiceStatus
 from app.schemas.service import ServiceCreate, ServiceUpdate, ServiceResponse
@@ -16,6 +17,7 @@ from app.services.service_management import (
     is_user_admin_of_organization
 )
 from app.services.dynamic_status import update_all_services_status_for_organization
+from app.services.change_feed import service_data
 
 router = APIRouter()
 
@@ -53,12 +55,13 @@ def debug_current_user(
 
 @router.get("/services", response_model=List[ServiceResponse])
 def get_organization_services(
+    request: Request,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get all services for the current user's organization."""
     services = get_services_by_organization(db, current_user.organization_id)
-    return services
+    return negotiated_response(request, [service_data(service) for service in services])
 
 @router.post("/services", response_model=ServiceResponse)
 def create_organization_service(
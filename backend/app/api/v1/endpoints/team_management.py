@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
 from app.db.session.database import get_db
 from app.core.dependencies import get_current_user
+from app.core.responses import negotiated_response
 from app.models.user import User, UserRole
 from app.schemas.team_management import (
     TeamMembersListResponse,
@@ -37,6 +38,7 @@ def require_admin(current_user: User = Depends(get_current_user)):
 
 @router.get("/members", response_model=TeamMembersListResponse)
 def get_team_members(
+    request: Request,
     current_user: User = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
@@ -68,13 +70,13 @@ def get_team_members(
             approved_by=member.approved_by
         ))
     
-    return TeamMembersListResponse(
+    return negotiated_response(request, TeamMembersListResponse(
         total=len(members),
         pending=pending_count,
         approved=approved_count,
         rejected=rejected_count,
         members=team_members
-    )
+    ).model_dump())
 
 @router.post("/approve-user", response_model=UserApprovalResponse)
 def approve_team_member(
@@ -0,0 +1,203 @@
+"""
+In-process execution of batched API calls.
+
+Each sub-request is dispatched straight to the API router as an ASGI call,
+skipping the HTTP round trip and the middleware stack. The batch's user is
+placed in the sub-request's scope, so get_current_user doesn't decode the
+token or look the user up again, and so is its database session, which
+get_db hands out instead of opening a new one.
+
+Writes run one at a time, in order, on the shared session. Without
+transactional mode every write commits as it would on its own, and a run of
+consecutive GETs goes out concurrently (bounded), each on a pooled session of
+its own since a Session can't be used from several threads at once. In
+transactional mode everything runs in order inside one database transaction:
+the endpoints' commits only end their unit of work, and the batch commits at
+the end, or rolls everything back at the first 4xx/5xx.
+"""
+
+import asyncio
+from typing import List, NamedTuple, Optional, Tuple
+from urllib.parse import unquote
+
+import orjson
+from fastapi import Request
+from fastapi.middleware.asyncexitstack import AsyncExitStackMiddleware
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware.exceptions import ExceptionMiddleware
+
+from app.core.config import settings
+from app.core.dependencies import SCOPE_PRINCIPAL_KEY
+from app.core.invalidation import invalidation_bus
+from app.db.session.database import SCOPE_SESSION_KEY, SessionLocal, engine
+from app.models.user import User
+from app.schemas.batch import BatchOperation
+
+BATCH_PATH = "/api/v1/batch"
+# Headers of the batch request that sub-requests see
+FORWARDED_HEADERS = {b"authorization", b"host", b"user-agent", b"x-forwarded-for", b"x-forwarded-proto"}
+
+
+class SubResponse(NamedTuple):
+    status: int
+    content_type: str
+    body: bytes
+
+
+def _error(status: int, detail: str) -> SubResponse:
+    return SubResponse(status, "application/json", orjson.dumps({"detail": detail}))
+
+
+NOT_RUN = _error(424, "Not run: an earlier request in the transactional batch failed")
+
+
+def _sub_scope(parent: dict, operation: BatchOperation, body: bytes, principal: User, db) -> dict:
+    path, _, query = operation.path.partition("?")
+    headers = [(name, value) for name, value in parent["headers"] if name in FORWARDED_HEADERS]
+    if body:
+        headers.append((b"content-type", b"application/json"))
+        headers.append((b"content-length", str(len(body)).encode()))
+    scope = {
+        "type": "http",
+        "asgi": parent.get("asgi", {"version": "3.0"}),
+        "http_version": parent.get("http_version", "1.1"),
+        "method": operation.method,
+        "scheme": parent.get("scheme", "http"),
+        "server": parent.get("server"),
+        "client": parent.get("client"),
+        "root_path": parent.get("root_path", ""),
+        "path": unquote(path),
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "headers": headers,
+        "app": parent.get("app"),
+        SCOPE_PRINCIPAL_KEY: principal,
+    }
+    if db is not None:
+        scope[SCOPE_SESSION_KEY] = db
+    return scope
+
+
+async def _dispatch(app, scope: dict, body: bytes) -> SubResponse:
+    status, content_type, chunks = 500, "", []
+    received = False
+
+    async def receive():
+        nonlocal received
+        if not received:
+            received = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        # The client never disconnects; a streaming response cancels this when done
+        await asyncio.Event().wait()
+
+    async def send(message):
+        nonlocal status, content_type
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            for name, value in message.get("headers", []):
+                if name.lower() == b"content-type":
+                    content_type = value.decode("latin-1")
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    try:
+        await app(scope, receive, send)
+    except Exception:
+        return _error(500, "Internal Server Error")
+    return SubResponse(status, content_type, b"".join(chunks))
+
+
+async def _run_one(app, parent: dict, operation: BatchOperation, principal: User, db) -> SubResponse:
+    if operation.path.partition("?")[0].rstrip("/") == BATCH_PATH:
+        return _error(400, "Batches cannot be nested")
+    body = b"" if operation.body is None else orjson.dumps(operation.body)
+    return await _dispatch(app, _sub_scope(parent, operation, body, principal, db), body)
+
+
+def _detach(db, instance) -> None:
+    if instance in db:
+        db.refresh(instance)
+        db.expunge(instance)
+
+
+async def run_batch(
+    request: Request,
+    operations: List[BatchOperation],
+    principal: User,
+    db,
+    transactional: bool
+) -> Tuple[List[SubResponse], Optional[bool]]:
+    """
+    Run the operations in-process and return their responses in order, and
+    for transactional batches whether the transaction committed.
+    `db` is the shared session for non-transactional batches.
+    """
+    # The router wrapped the way FastAPI wraps it: exception handlers, then the
+    # exit stack that closes yield dependencies
+    app = ExceptionMiddleware(AsyncExitStackMiddleware(request.app.router), handlers=request.app.exception_handlers)
+    parent = request.scope
+    results: List[SubResponse] = []
+    # Writes commit `db`, which expires everything loaded through it; concurrent
+    # reads would then all refresh the principal on that one session from
+    # different threads. Detached and fully loaded, it never touches a session again.
+    await run_in_threadpool(_detach, db, principal)
+
+    if not transactional:
+        semaphore = asyncio.Semaphore(settings.BATCH_READ_CONCURRENCY)
+
+        async def read(operation):
+            async with semaphore:
+                return await _run_one(app, parent, operation, principal, None)
+
+        index = 0
+        while index < len(operations):
+            end = index
+            while end < len(operations) and operations[end].method == "GET":
+                end += 1
+            if end > index:
+                results.extend(await asyncio.gather(*(read(operation) for operation in operations[index:end])))
+                index = end
+            else:
+                results.append(await _run_one(app, parent, operations[index], principal, db))
+                index += 1
+        return results, None
+
+    connection = await run_in_threadpool(engine.connect)
+    transaction = connection.begin()
+    # Endpoint commits end only their own unit of work; the batch owns the transaction
+    session = SessionLocal(bind=connection, join_transaction_mode="rollback_only")
+    invalidation_bus.hold(session)
+    committed = False
+    try:
+        for operation in operations:
+            if results and results[-1].status >= 400:
+                results.append(NOT_RUN)
+                continue
+            results.append(await _run_one(app, parent, operation, principal, session))
+        if results[-1].status < 400 and transaction.is_active:
+            await run_in_threadpool(session.commit)
+            await run_in_threadpool(transaction.commit)
+            committed = True
+    finally:
+        if not committed:
+            await run_in_threadpool(session.rollback)
+        session.close()
+        await run_in_threadpool(connection.close)
+    # Caches and edge purges only hear about writes that are now committed
+    invalidation_bus.release(session)
+    return results, committed
+
+
+def batch_response_body(results: List[SubResponse], committed: Optional[bool]) -> bytes:
+    """Response JSON with each sub-response body spliced in as-is."""
+    items = []
+    for result in results:
+        if not result.body:
+            body = b"null"
+        elif result.content_type.startswith("application/json"):
+            body = result.body
+        else:
+            body = orjson.dumps(result.body.decode("utf-8", "replace"))
+        items.append(b'{"status":%d,"body":%s}' % (result.status, body))
+    prefix = b'{"committed":' + orjson.dumps(committed) + b"," if committed is not None else b"{"
+    return prefix + b'"responses":[' + b",".join(items) + b"]}"
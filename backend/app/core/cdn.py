@@ -0,0 +1,68 @@
+"""
+Shared-cache (CDN / reverse proxy) headers for public responses.
+
+Public snapshots are served with an s-maxage so an edge cache can answer
+anonymous traffic, and with Surrogate-Key tags naming the organization and
+the kinds of data in the response. When a write commits, the purge
+dispatcher (app.services.cdn_purge) purges exactly the tags it affected.
+"""
+
+from typing import Set
+
+from app.core.config import settings
+from app.core.shared_store import GLOBAL_SCOPE
+
+DIRECTORY_KEY = "directory"
+
+# Which tags a write to each entity makes stale
+_PURGED_CONTENTS = {
+    "incident": ("incidents",),
+    "service": ("services",),
+    # Settings and organization changes can touch every page (and every alias) of the org
+    "organization_settings": (None,),
+    "organization": (None,),
+}
+_PURGES_DIRECTORY = {"service", "organization"}
+
+
+def surrogate_key(organization_id: str, content: str = None) -> str:
+    """Tag for everything of an organization, or one kind of its data."""
+    return f"org-{organization_id}-{content}" if content else f"org-{organization_id}"
+
+
+def cdn_headers(snapshot, *contents: str, settled: bool = False) -> dict:
+    """
+    Cache-Control and Surrogate-Key headers for a public snapshot containing `contents`.
+    `settled` snapshots (history pages that rarely change) get a long
+    s-maxage when edge purges by tag reach them; browsers keep the short
+    max-age and revalidate by ETag, since purges never reach them.
+    """
+    if snapshot.organization_id == GLOBAL_SCOPE:
+        keys = [DIRECTORY_KEY]
+    else:
+        keys = [surrogate_key(snapshot.organization_id)]
+        keys.extend(surrogate_key(snapshot.organization_id, content) for content in contents)
+    if settled and not snapshot.stale and settings.CDN_PURGE_BACKEND == "surrogate-key":
+        # The nginx backend refreshes a fixed list of URLs, which can't cover every history page
+        cache_control = (
+            f"public, max-age={settings.CDN_MAX_AGE_SECONDS}, s-maxage={settings.CDN_SETTLED_S_MAXAGE_SECONDS}, "
+            f"stale-if-error={settings.CDN_STALE_IF_ERROR_SECONDS}"
+        )
+    elif snapshot.stale:
+        # Last-known-good data: let the edge hold it only briefly
+        cache_control = f"public, max-age=0, s-maxage={settings.CDN_STALE_S_MAXAGE_SECONDS}"
+    else:
+        cache_control = (
+            f"public, max-age={settings.CDN_MAX_AGE_SECONDS}, s-maxage={settings.CDN_S_MAXAGE_SECONDS}, "
+            f"stale-while-revalidate={settings.CDN_STALE_WHILE_REVALIDATE_SECONDS}, "
+            f"stale-if-error={settings.CDN_STALE_IF_ERROR_SECONDS}"
+        )
+    return {"Cache-Control": cache_control, "Surrogate-Key": " ".join(keys)}
+
+
+def purge_keys(entity: str, organization_id: str) -> Set[str]:
+    """Surrogate keys to purge after a committed write to entity."""
+    keys = {surrogate_key(organization_id, content) for content in _PURGED_CONTENTS.get(entity, ())}
+    if entity in _PURGES_DIRECTORY:
+        keys.add(DIRECTORY_KEY)
+    return keys
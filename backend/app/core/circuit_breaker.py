@@ -0,0 +1,145 @@
+"""
+Circuit breaker for the public read path.
+
+The breaker watches how database-backed builds behave over a rolling window.
+When too many fail or run slow it opens, and callers serve last-known-good
+snapshots instead of piling more queries onto a struggling database. After a
+cool-down it lets a single probe through (half-open); the probe's outcome
+decides whether it closes again or stays open. The probe is the thread that
+allow() admitted: outcomes other threads record meanwhile (background
+refreshes, builds admitted before the breaker opened) don't count.
+"""
+
+import threading
+import time
+from collections import deque
+
+from app.core.config import settings
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class StatusUnavailableError(Exception):
+    """Raised when a public payload can't be built and no fallback exists."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Status data is temporarily unavailable")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Trips on error rate or slow-call rate over a rolling time window."""
+
+    def __init__(
+        self,
+        window_seconds: float,
+        min_calls: int,
+        error_rate: float,
+        slow_call_ms: float,
+        slow_call_rate: float,
+        open_seconds: float
+    ):
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.slow_call_ms = slow_call_ms
+        self.slow_call_rate = slow_call_rate
+        self.open_seconds = open_seconds
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.trips = 0
+        self._calls = deque()  # (timestamp, ok, slow)
+        self._probe_started = None
+        self._probe_thread = None
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a caller may hit the database right now."""
+        with self._lock:
+            now = time.monotonic()
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN:
+                if now - self.opened_at < self.open_seconds:
+                    return False
+                self.state = HALF_OPEN
+            # Half-open: one probe at a time; a lost probe expires after a cool-down
+            if self._probe_started is None or now - self._probe_started > self.open_seconds:
+                self._probe_started = now
+                self._probe_thread = threading.get_ident()
+                return True
+            return False
+
+    def release_probe(self) -> None:
+        """Give up the probe if this thread holds it without having recorded an outcome."""
+        with self._lock:
+            if self.state == HALF_OPEN and self._probe_thread == threading.get_ident():
+                self._probe_started = None
+                self._probe_thread = None
+
+    def record(self, duration: float, ok: bool) -> None:
+        """Record the outcome of one database-backed build."""
+        slow = duration * 1000 >= self.slow_call_ms
+        with self._lock:
+            now = time.monotonic()
+            if self.state == HALF_OPEN:
+                if self._probe_thread != threading.get_ident():
+                    return
+                self._probe_started = None
+                self._probe_thread = None
+                if ok and not slow:
+                    self.state = CLOSED
+                    self._calls.clear()
+                else:
+                    self._trip(now)
+                return
+
+            self._calls.append((now, ok, slow))
+            self._trim(now)
+            if self.state == CLOSED and len(self._calls) >= self.min_calls:
+                errors = sum(1 for _, call_ok, _ in self._calls if not call_ok)
+                slow_calls = sum(1 for _, _, call_slow in self._calls if call_slow)
+                if (errors / len(self._calls) >= self.error_rate
+                        or slow_calls / len(self._calls) >= self.slow_call_rate):
+                    self._trip(now)
+
+    def retry_after(self) -> int:
+        """Seconds until the breaker will next let a probe through."""
+        with self._lock:
+            if self.state != OPEN:
+                return 1
+            return max(1, int(self.open_seconds - (time.monotonic() - self.opened_at)) + 1)
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._trim(time.monotonic())
+            calls = len(self._calls)
+            return {
+                "state": self.state,
+                "trips": self.trips,
+                "window_calls": calls,
+                "window_errors": sum(1 for _, ok, _ in self._calls if not ok),
+                "window_slow": sum(1 for _, _, slow in self._calls if slow)
+            }
+
+    def _trip(self, now: float) -> None:
+        self.state = OPEN
+        self.opened_at = now
+        self.trips += 1
+        self._calls.clear()
+
+    def _trim(self, now: float) -> None:
+        while self._calls and now - self._calls[0][0] > self.window_seconds:
+            self._calls.popleft()
+
+
+status_breaker = CircuitBreaker(
+    window_seconds=settings.BREAKER_WINDOW_SECONDS,
+    min_calls=settings.BREAKER_MIN_CALLS,
+    error_rate=settings.BREAKER_ERROR_RATE,
+    slow_call_ms=settings.BREAKER_SLOW_CALL_MS,
+    slow_call_rate=settings.BREAKER_SLOW_CALL_RATE,
+    open_seconds=settings.BREAKER_OPEN_SECONDS
+)
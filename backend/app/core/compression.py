@@ -0,0 +1,208 @@
+"""
+gzip / brotli content negotiation.
+
+CompressionMiddleware compresses dynamic API responses on the fly. Cached
+status-page snapshots carry precompressed variants instead (see
+app.core.snapshots), so those responses already have a Content-Encoding and
+pass through the middleware untouched.
+"""
+
+import gzip
+import zlib
+from typing import Iterable, Iterator, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+try:
+    import brotli
+except ImportError:  # optional dependency; fall back to gzip only
+    brotli = None
+
+# Bodies above this are compressed in the threadpool rather than on the event loop
+THREADPOOL_COMPRESS_SIZE = 64 * 1024
+
+COMPRESSIBLE_TYPES = (
+    "application/json", "text/", "application/javascript", "application/x-ndjson",
+    "application/msgpack", "application/cbor"
+)
+
+
+def supported_encodings() -> tuple:
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> str:
+    """Pick the best encoding we support from an Accept-Encoding header."""
+    if not accept_encoding:
+        return "identity"
+    weights = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[token] = quality
+    wildcard = weights.get("*")
+    best, best_quality = "identity", 0.0
+    for encoding in supported_encodings():
+        quality = weights.get(encoding, wildcard if wildcard is not None else 0.0)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(body: bytes, encoding: str, per_request: bool = False) -> bytes:
+    """
+    Compress a complete body with the given encoding. Cached snapshots are
+    compressed once at the high levels; per-request bodies use the cheaper
+    stream levels since they are compressed on every response.
+    """
+    if encoding == "br":
+        quality = settings.BROTLI_STREAM_QUALITY if per_request else settings.BROTLI_QUALITY
+        return brotli.compress(body, quality=quality)
+    if encoding == "gzip":
+        level = settings.GZIP_STREAM_LEVEL if per_request else settings.GZIP_LEVEL
+        return gzip.compress(body, compresslevel=level, mtime=0)
+    return body
+
+
+class _StreamCompressor:
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=settings.BROTLI_STREAM_QUALITY)
+        else:
+            self._compressor = zlib.compressobj(settings.GZIP_STREAM_LEVEL, zlib.DEFLATED, 31)
+
+    def feed(self, chunk: bytes, flush: bool = True) -> bytes:
+        if self.encoding == "br":
+            output = self._compressor.process(chunk)
+            return output + self._compressor.flush() if flush else output
+        output = self._compressor.compress(chunk)
+        return output + self._compressor.flush(zlib.Z_SYNC_FLUSH) if flush else output
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+def compress_chunks(chunks: Iterable[bytes], encoding: str) -> Iterator[bytes]:
+    """
+    Compress a streamed body as it is produced, for bodies long enough that
+    flushing every chunk (as the middleware does) isn't worth the ratio.
+    """
+    compressor = _StreamCompressor(encoding)
+    for chunk in chunks:
+        output = compressor.feed(chunk, flush=False)
+        if output:
+            yield output
+    yield compressor.finish()
+
+
+class CompressionMiddleware:
+    """Compress JSON/text responses according to Accept-Encoding."""
+
+    def __init__(self, app, minimum_size: int = 500):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = None
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+        encoding = negotiate_encoding(accept_encoding)
+        if encoding == "identity":
+            async def send_identity(message):
+                # Compressible responses depend on Accept-Encoding even when sent as-is
+                if message["type"] == "http.response.start" and _compressible(message):
+                    message = _with_vary(message)
+                await send(message)
+
+            await self.app(scope, receive, send_identity)
+            return
+
+        start_message = None
+        compressor = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, compressor, passthrough
+            if message["type"] == "http.response.start":
+                start_message = message
+                passthrough = not _compressible(message)
+                if passthrough:
+                    await send(message)
+                return
+
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if compressor is None and not more_body:
+                # Whole body in one message: compress it in one go if worth it
+                if len(body) < self.minimum_size:
+                    await send(_with_vary(start_message))
+                    await send(message)
+                    return
+                if len(body) > THREADPOOL_COMPRESS_SIZE:
+                    compressed = await run_in_threadpool(compress, body, encoding, True)
+                else:
+                    compressed = compress(body, encoding, per_request=True)
+                await send(_with_encoding(start_message, encoding, len(compressed)))
+                await send({"type": "http.response.body", "body": compressed})
+                return
+
+            if compressor is None:
+                compressor = _StreamCompressor(encoding)
+                await send(_with_encoding(start_message, encoding, None))
+            chunk = compressor.feed(body) if body else b""
+            if not more_body:
+                chunk += compressor.finish()
+            await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
+
+
+def _compressible(start_message: dict) -> bool:
+    """Whether the middleware may compress this response (not already encoded, compressible type)."""
+    headers = {name.lower(): value for name, value in start_message.get("headers", [])}
+    content_type = headers.get(b"content-type", b"").decode("latin-1")
+    return b"content-encoding" not in headers and content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def _with_vary(start_message: dict) -> dict:
+    headers = [(name, value) for name, value in start_message.get("headers", []) if name.lower() != b"vary"]
+    vary = [value for name, value in start_message.get("headers", []) if name.lower() == b"vary"]
+    if not any(b"accept-encoding" in value.lower() for value in vary):
+        vary.append(b"Accept-Encoding")
+    headers.append((b"vary", b", ".join(vary)))
+    return {**start_message, "headers": headers}
+
+
+def _with_encoding(start_message: dict, encoding: str, content_length: Optional[int]) -> dict:
+    start_message = _with_vary(start_message)
+    headers = [
+        (name, value) for name, value in start_message.get("headers", [])
+        if name.lower() != b"content-length"
+    ]
+    headers.append((b"content-encoding", encoding.encode()))
+    if content_length is not None:
+        headers.append((b"content-length", str(content_length).encode()))
+    return {**start_message, "headers": headers}
@@ -12,6 +12,107 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
+    # Internal endpoints (profiling, diagnostics); disabled when the token is empty
+    INTERNAL_API_TOKEN: str = ""
+
+    # Sampling profiler
+    PROFILER_ENABLED: bool = True
+    PROFILER_INTERVAL_SECONDS: float = 0.02
+
+    # Response compression; cached snapshots are compressed once at the higher levels
+    COMPRESSION_MIN_SIZE: int = 500
+    GZIP_LEVEL: int = 9
+    BROTLI_QUALITY: int = 9
+    GZIP_STREAM_LEVEL: int = 5
+    BROTLI_STREAM_QUALITY: int = 4
+
+    # Status pages are served on <subdomain>.<base domain> as well as custom domains
+    STATUS_PAGE_BASE_DOMAIN: str = "statuspage.app"
+    # Use X-Forwarded-Host instead of Host (only behind a proxy that sets it)
+    TRUST_FORWARDED_HOST: bool = False
+
+    # Edge caching of public responses (Cache-Control / Surrogate-Key)
+    CDN_MAX_AGE_SECONDS: int = 5
+    CDN_S_MAXAGE_SECONDS: int = 60
+    CDN_STALE_WHILE_REVALIDATE_SECONDS: int = 30
+    CDN_STALE_IF_ERROR_SECONDS: int = 86400
+    CDN_STALE_S_MAXAGE_SECONDS: int = 5
+    # Purges after writes: "" (off), "surrogate-key" or "nginx" (see app/services/cdn_purge.py)
+    CDN_PURGE_BACKEND: str = ""
+    CDN_PURGE_URL: str = ""
+    CDN_PURGE_TOKEN: str = ""
+    # Also gives other nodes time to apply the invalidation before the edge re-fetches
+    CDN_PURGE_BATCH_SECONDS: float = 1.0
+
+    # Per-worker cache of content-hashed custom CSS assets
+    BRANDING_CACHE_MAX_BYTES: int = 16 * 1024 * 1024
+
+    # Public status page snapshot cache
+    STATUS_CACHE_TTL_SECONDS: float = 10.0
+    # Organizations in the hot traffic tier keep snapshots longer
+    STATUS_CACHE_HOT_TTL_SECONDS: float = 30.0
+    STATUS_CACHE_MAX_ENTRIES: int = 5000
+
+    # How long concurrent requests wait on an in-flight build before building themselves
+    SINGLEFLIGHT_TIMEOUT_SECONDS: float = 10.0
+
+    # Expired snapshots are still served for this long while a background refresh runs
+    STATUS_CACHE_STALE_WHILE_REVALIDATE_SECONDS: float = 60.0
+
+    # Last-known-good snapshots, served when the database is failing; empty means a temp dir.
+    # This and SHARED_STORE_DIR get a subdirectory per DATABASE_URL
+    SNAPSHOT_FALLBACK_DIR: str = ""
+
+    # Snapshot and resolver store shared by all workers on a host; empty dir means /dev/shm
+    SHARED_STORE_ENABLED: bool = True
+    SHARED_STORE_DIR: str = ""
+    SHARED_STORE_MAX_AGE_SECONDS: float = 300.0
+
+    # Invalidation bus: Postgres LISTEN/NOTIFY, or table polling on other databases
+    INVALIDATION_BUS_ENABLED: bool = True
+    INVALIDATION_CHANNEL: str = "status_invalidation"
+    INVALIDATION_POLL_SECONDS: float = 0.5
+    INVALIDATION_RECONCILE_SECONDS: float = 5.0
+    INVALIDATION_RETENTION_SECONDS: float = 3600.0
+
+    # Heavy-hitter tracking of public traffic per organization and endpoint
+    TRACKER_SKETCH_WIDTH: int = 2048
+    TRACKER_SKETCH_DEPTH: int = 4
+    TRACKER_TOP_K: int = 200
+    TRACKER_HOT_TIER: int = 20
+    TRACKER_HALF_LIFE_SECONDS: float = 120.0
+    TRACKER_BUFFER_SIZE: int = 100000
+
+    # Prewarm snapshots of the busiest organizations on worker start and after invalidation
+    PREWARM_ENABLED: bool = True
+    PREWARM_TOP_ORGANIZATIONS: int = 50
+    PREWARM_CONCURRENCY: int = 2
+    PREWARM_INTERVAL_SECONDS: float = 30.0
+
+    # Per-organization database cost accounting, in one-minute buckets
+    TENANT_COST_RETENTION_MINUTES: int = 60
+
+    # Change-log entries older than this are pruned; clients further behind refetch everything
+    CHANGE_FEED_RETENTION_DAYS: int = 7
+    CHANGE_FEED_MAX_LIMIT: int = 1000
+
+    # GETs of a non-transactional /batch that may run at once
+    BATCH_READ_CONCURRENCY: int = 4
+
+    # Incident history pages whose incidents were all resolved this long ago
+    # (and whose range ends as long ago) rarely change: with a surrogate-key
+    # purge backend the edge keeps them this long (browsers still revalidate)
+    HISTORY_SETTLED_AFTER_DAYS: int = 7
+    CDN_SETTLED_S_MAXAGE_SECONDS: int = 86400
+
+    # Circuit breaker around public status builds
+    BREAKER_WINDOW_SECONDS: float = 30.0
+    BREAKER_MIN_CALLS: int = 10
+    BREAKER_ERROR_RATE: float = 0.5
+    BREAKER_SLOW_CALL_MS: float = 2000.0
+    BREAKER_SLOW_CALL_RATE: float = 0.8
+    BREAKER_OPEN_SECONDS: float = 15.0
+
     class Config:
         env_file = ".env"
 
@@ -1,18 +1,31 @@
-from fastapi import Depends, HTTPException, status
+import secrets
+from typing import Optional, Tuple
+from fastapi import Depends, Header, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from app.db.session.database import get_db
 from app.core.auth import verify_token
+from app.core.config import settings
+from app.core.tenant_costs import attribute_to_organization
 from app.services.auth import get_user_by_email
+from app.services.public_status import parse_selection
 from app.models.user import User, UserStatus
 
 security = HTTPBearer()
 
+# Sub-requests of a batch find the batch's already-authenticated user in their ASGI scope
+SCOPE_PRINCIPAL_KEY = "principal"
+
 def get_current_user(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
 ) -> User:
     """Get current authenticated user."""
+    principal = request.scope.get(SCOPE_PRINCIPAL_KEY)
+    if principal is not None:
+        return principal
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -27,6 +40,7 @@ def get_current_user(
     user = get_user_by_email(db, email=username)
     if user is None:
         raise credentials_exception
+    attribute_to_organization(user.organization_id)
     
     # Check if user status allows access
     if user.status == UserStatus.PENDING:
@@ -49,3 +63,23 @@ def get_current_user(
         )
     
     return user
+
+def parse_selection_parameter(value: Optional[str], allowed: Tuple[str, ...], parameter: str) -> Optional[Tuple[str, ...]]:
+    """Parse an include/fields parameter, rejecting unknown names with a 400."""
+    try:
+        return parse_selection(value, allowed)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{parameter}: {e}"
+        )
+
+def require_internal_access(x_internal_token: Optional[str] = Header(None)) -> None:
+    """Guard internal diagnostic endpoints behind INTERNAL_API_TOKEN."""
+    if not settings.INTERNAL_API_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not x_internal_token or not secrets.compare_digest(x_internal_token, settings.INTERNAL_API_TOKEN):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Internal access token required"
+        )
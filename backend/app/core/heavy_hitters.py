@@ -0,0 +1,254 @@
+"""
+Constant-memory tracking of the busiest tenants.
+
+Public requests are recorded per organization, per endpoint and per
+(organization, endpoint) pair. Recording only appends to a bounded buffer; a
+background thread folds the buffer into count-min sketches and keeps the top
+K organizations and pairs, so the request path pays for one deque append.
+Counts decay exponentially, so rankings follow current traffic rather than
+all-time totals.
+"""
+
+import heapq
+import math
+import threading
+import time
+from array import array
+from collections import Counter, OrderedDict, deque
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+HOT = "hot"
+WARM = "warm"
+NORMAL = "normal"
+
+
+class CountMinSketch:
+    """Approximate counts in fixed memory; estimates never undercount."""
+
+    def __init__(self, width: int, depth: int):
+        self.width = width
+        self.depth = depth
+        self._rows = [array("d", [0.0]) * width for _ in range(depth)]
+
+    def _indexes(self, item) -> List[int]:
+        h1 = hash(item)
+        h2 = hash((item, 0x9E3779B9)) | 1
+        return [(h1 + row * h2) % self.width for row in range(self.depth)]
+
+    def add(self, item, count: float = 1.0) -> float:
+        """Add count to item and return its new estimate."""
+        estimate = math.inf
+        for row, index in zip(self._rows, self._indexes(item)):
+            row[index] += count
+            estimate = min(estimate, row[index])
+        return estimate
+
+    def estimate(self, item) -> float:
+        return min(row[index] for row, index in zip(self._rows, self._indexes(item)))
+
+    def scale(self, factor: float) -> None:
+        for row in self._rows:
+            for index in range(self.width):
+                row[index] *= factor
+
+
+class TopK:
+    """The k items with the highest estimates seen so far."""
+
+    def __init__(self, k: int):
+        self.k = k
+        self.items: Dict[object, float] = {}
+
+    def offer(self, item, estimate: float) -> Optional[object]:
+        """Track item if it ranks in the top k; returns any item it displaced."""
+        if item in self.items or len(self.items) < self.k:
+            self.items[item] = estimate
+            return None
+        lowest = min(self.items, key=self.items.get)
+        if estimate <= self.items[lowest]:
+            return item
+        del self.items[lowest]
+        self.items[item] = estimate
+        return lowest
+
+    def scale(self, factor: float) -> None:
+        for item in self.items:
+            self.items[item] *= factor
+
+    def top(self, n: int) -> List[Tuple[object, float]]:
+        return heapq.nlargest(n, self.items.items(), key=lambda entry: entry[1])
+
+
+class TenantTracker:
+    """Heavy-hitter statistics for public traffic."""
+
+    def __init__(
+        self,
+        width: int,
+        depth: int,
+        top_k: int,
+        hot_tier: int,
+        half_life: float,
+        buffer_size: int,
+        keys_per_organization: int = 8
+    ):
+        self.half_life = half_life
+        self.hot_tier = hot_tier
+        self.keys_per_organization = keys_per_organization
+        self._buffer = deque(maxlen=buffer_size)
+        self._organizations = CountMinSketch(width, depth)
+        self._pairs = CountMinSketch(width, depth)
+        self._top_organizations = TopK(top_k)
+        self._top_pairs = TopK(top_k)
+        self._endpoints: Dict[str, float] = {}
+        # Recently requested snapshot keys of each top organization, for prewarming
+        self._keys: Dict[str, "OrderedDict[str, None]"] = {}
+        self._hot = frozenset()
+        self._warm = frozenset()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        self._decayed_at = time.monotonic()
+        self.recorded = 0
+        self.overflowed = 0
+
+    def record(self, organization_id: Optional[str], endpoint: str, key: str) -> None:
+        """Record one request. Cheap enough for the hot path: a single append."""
+        self._buffer.append((organization_id, endpoint, key))
+
+    def start(self, interval: float = 0.25) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(interval,), name="tenant-tracker", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self._thread = None
+
+    def _run(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            self.drain()
+
+    def drain(self) -> None:
+        """Fold buffered requests into the sketches."""
+        batch = []
+        pop = self._buffer.popleft
+        try:
+            while True:
+                batch.append(pop())
+        except IndexError:
+            pass
+        if len(batch) == self._buffer.maxlen:
+            # The buffer may have wrapped and dropped requests since the last drain
+            self.overflowed += 1
+
+        organizations, pairs, endpoints = Counter(), Counter(), Counter()
+        keys: Dict[str, Dict[str, None]] = {}
+        for organization_id, endpoint, key in batch:
+            endpoints[endpoint] += 1
+            if organization_id is None:
+                continue
+            organizations[organization_id] += 1
+            pairs[(organization_id, endpoint)] += 1
+            keys.setdefault(organization_id, {})[key] = None
+
+        with self._lock:
+            self._decay()
+            self.recorded += len(batch)
+            for endpoint, count in endpoints.items():
+                self._endpoints[endpoint] = self._endpoints.get(endpoint, 0.0) + count
+            for organization_id, count in organizations.items():
+                estimate = self._organizations.add(organization_id, count)
+                displaced = self._top_organizations.offer(organization_id, estimate)
+                if displaced is not None:
+                    self._keys.pop(displaced, None)
+                if organization_id in self._top_organizations.items:
+                    recent = self._keys.setdefault(organization_id, OrderedDict())
+                    for key in keys[organization_id]:
+                        recent[key] = None
+                        recent.move_to_end(key)
+                    while len(recent) > self.keys_per_organization:
+                        recent.popitem(last=False)
+            for pair, count in pairs.items():
+                self._top_pairs.offer(pair, self._pairs.add(pair, count))
+            ranked = [organization_id for organization_id, _ in self._top_organizations.top(len(self._top_organizations.items))]
+            self._hot = frozenset(ranked[:self.hot_tier])
+            self._warm = frozenset(ranked[self.hot_tier:])
+
+    def _decay(self) -> None:
+        elapsed = time.monotonic() - self._decayed_at
+        if elapsed < self.half_life / 4:
+            return
+        self._decayed_at += elapsed
+        factor = 0.5 ** (elapsed / self.half_life)
+        self._organizations.scale(factor)
+        self._pairs.scale(factor)
+        self._top_organizations.scale(factor)
+        self._top_pairs.scale(factor)
+        for endpoint in self._endpoints:
+            self._endpoints[endpoint] *= factor
+
+    def _rate(self, count: float) -> float:
+        # A steady rate r settles at a decayed count of r * half_life / ln 2
+        return round(count * math.log(2) / self.half_life, 3)
+
+    def tier(self, organization_id: Optional[str]) -> str:
+        """Traffic tier of an organization: hot, warm or normal."""
+        if organization_id in self._hot:
+            return HOT
+        if organization_id in self._warm:
+            return WARM
+        return NORMAL
+
+    def top_organizations(self, n: int) -> List[Tuple[str, float, List[str]]]:
+        """(organization_id, decayed count, recent snapshot keys) for the n busiest organizations."""
+        with self._lock:
+            return [
+                (organization_id, count, list(reversed(self._keys.get(organization_id, {}))))
+                for organization_id, count in self._top_organizations.top(n)
+            ]
+
+    def report(self, limit: int) -> dict:
+        with self._lock:
+            endpoints = dict(self._endpoints)
+            organizations = self._top_organizations.top(limit)
+            pairs = self._top_pairs.top(limit)
+            return {
+                "organizations": [
+                    {
+                        "organization_id": organization_id,
+                        "requests_per_second": self._rate(count),
+                        "tier": self.tier(organization_id),
+                        "endpoints": {
+                            endpoint: self._rate(self._pairs.estimate((organization_id, endpoint)))
+                            for endpoint in endpoints
+                        }
+                    }
+                    for organization_id, count in organizations
+                ],
+                "pairs": [
+                    {"organization_id": organization_id, "endpoint": endpoint, "requests_per_second": self._rate(count)}
+                    for (organization_id, endpoint), count in pairs
+                ],
+                "endpoints": {endpoint: self._rate(count) for endpoint, count in endpoints.items()},
+                "recorded": self.recorded,
+                "buffered": len(self._buffer),
+                "overflowed": self.overflowed,
+                "half_life_seconds": self.half_life
+            }
+
+
+tenant_tracker = TenantTracker(
+    width=settings.TRACKER_SKETCH_WIDTH,
+    depth=settings.TRACKER_SKETCH_DEPTH,
+    top_k=settings.TRACKER_TOP_K,
+    hot_tier=settings.TRACKER_HOT_TIER,
+    half_life=settings.TRACKER_HALF_LIFE_SECONDS,
+    buffer_size=settings.TRACKER_BUFFER_SIZE
+)
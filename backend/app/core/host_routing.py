@@ -0,0 +1,38 @@
+"""
+Host-header routing for vanity status page domains.
+
+A request for the host status page (HOST_PAGE_PATH) on status.customer.com or
+customer.<base domain> is rewritten to that organization's page by ID, so it
+is served from the same cached snapshot without looking the domain up in the
+database. Other paths pass through untouched.
+"""
+
+from typing import Callable, Optional
+
+HOST_PAGE_PATH = "/api/v1/public/status"
+
+
+class HostRoutingMiddleware:
+    def __init__(self, app, resolve: Callable[[str], Optional[str]], trust_forwarded_host: bool = False):
+        self.app = app
+        self.resolve = resolve
+        self.trust_forwarded_host = trust_forwarded_host
+
+    def _host(self, scope) -> Optional[str]:
+        host = None
+        for name, value in scope["headers"]:
+            if name == b"x-forwarded-host" and self.trust_forwarded_host:
+                # Left-most entry is the host the client asked for
+                return value.decode("latin-1").split(",")[0]
+            if name == b"host":
+                host = value.decode("latin-1")
+        return host
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].rstrip("/") == HOST_PAGE_PATH:
+            host = self._host(scope)
+            organization_id = self.resolve(host) if host else None
+            if organization_id is not None:
+                path = f"{HOST_PAGE_PATH}/org/{organization_id}"
+                scope = {**scope, "path": path, "raw_path": path.encode()}
+        await self.app(scope, receive, send)
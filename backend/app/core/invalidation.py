@@ -0,0 +1,298 @@
+"""
+Cache invalidation bus.
+
+Service-layer write functions call publish_invalidation() before they commit.
+That records an InvalidationEvent row in the same transaction, so a message
+exists only if the write it describes was committed. On Postgres the
+transaction also issues a NOTIFY, which is delivered to every listening
+worker on every node at commit; anywhere else (SQLite in dev) listeners poll
+the table instead.
+
+Every worker runs one listener thread and hands each message to the local
+subscribers (e.g. the snapshot cache). The publishing worker also applies its
+own messages right after commit, without waiting for the round trip.
+"""
+
+import select
+import threading
+import time
+from collections import deque
+from typing import Callable, List, NamedTuple
+
+import orjson
+from sqlalchemy import event, func, text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session.database import SessionLocal, engine
+from app.models.invalidation_event import InvalidationEvent
+
+_PENDING_KEY = "pending_invalidations"
+_HELD_KEY = "hold_invalidations"
+PRUNE_INTERVAL_SECONDS = 600
+FETCH_BATCH_SIZE = 1000
+
+
+class InvalidationMessage(NamedTuple):
+    entity: str
+    organization_id: str
+    version: int
+    published_at: float
+
+
+class InvalidationBus:
+    """Delivers committed invalidation messages to subscribers in every worker."""
+
+    def __init__(self, channel: str, poll_interval: float, reconcile_interval: float, retention: float):
+        self.channel = channel
+        self.poll_interval = poll_interval
+        self.reconcile_interval = reconcile_interval
+        self.retention = retention
+        self.backend = "notify" if engine.dialect.name == "postgresql" else "polling"
+        self._subscribers: List[Callable[[InvalidationMessage], None]] = []
+        self._publisher_subscribers: List[Callable[[InvalidationMessage], None]] = []
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._last_version = 0
+        self._last_reconciled = 0
+        # Versions received via NOTIFY but not yet reconciled against the table
+        self._seen = set()
+        self._lags = deque(maxlen=1000)
+        self.published = 0
+        self.received = 0
+        self.dropped = 0
+        self.subscriber_errors = 0
+        self.reconnects = 0
+
+        event.listen(Session, "after_commit", self._after_commit)
+        event.listen(Session, "after_rollback", self._after_rollback)
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def subscribe(self, callback: Callable[[InvalidationMessage], None], published_only: bool = False) -> None:
+        """
+        Call back with every message, in every worker. With published_only,
+        only with messages this worker published (e.g. for side effects that
+        must happen once per write rather than once per worker).
+        """
+        if published_only:
+            self._publisher_subscribers.append(callback)
+        else:
+            self._subscribers.append(callback)
+
+    def publish(self, db: Session, entity: str, organization_id: str) -> None:
+        """
+        Queue an invalidation as part of db's current transaction.
+        Nothing is delivered unless and until the transaction commits.
+        """
+        row = InvalidationEvent(entity=entity, organization_id=organization_id, published_at=time.time())
+        db.add(row)
+        db.flush()
+        message = InvalidationMessage(entity, organization_id, row.id, row.published_at)
+        if self.backend == "notify":
+            db.execute(
+                text("SELECT pg_notify(:channel, :payload)"),
+                {"channel": self.channel, "payload": orjson.dumps(message._asdict()).decode()}
+            )
+        db.info.setdefault(_PENDING_KEY, []).append(message)
+
+    def hold(self, db: Session) -> None:
+        """
+        Keep db's messages past its commits until release(). For sessions
+        whose commit() doesn't end the real transaction (transactional batches).
+        """
+        db.info[_HELD_KEY] = True
+
+    def release(self, db: Session) -> None:
+        """Deliver the messages held for db once its real transaction has committed."""
+        db.info.pop(_HELD_KEY, None)
+        self._after_commit(db)
+
+    def _after_commit(self, session: Session) -> None:
+        if session.info.get(_HELD_KEY):
+            return
+        for message in session.info.pop(_PENDING_KEY, []):
+            self.published += 1
+            self._deliver(message)
+
+    def _after_rollback(self, session: Session) -> None:
+        session.info.pop(_PENDING_KEY, None)
+
+    def _deliver(self, message: InvalidationMessage, received: bool = False) -> None:
+        if received:
+            with self._lock:
+                self.received += 1
+                self._lags.append(max(0.0, time.time() - message.published_at))
+                self._last_version = max(self._last_version, message.version)
+            subscribers = self._subscribers
+        else:
+            subscribers = self._subscribers + self._publisher_subscribers
+        for callback in subscribers:
+            try:
+                callback(message)
+            except Exception:
+                # One broken subscriber must not starve the others
+                self.subscriber_errors += 1
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stop.clear()
+        db = SessionLocal()
+        try:
+            self._last_version = db.query(func.max(InvalidationEvent.id)).scalar() or 0
+            self._last_reconciled = self._last_version
+        finally:
+            db.close()
+        target = self._listen if self.backend == "notify" else self._poll
+        self._thread = threading.Thread(target=target, name="invalidation-bus", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self._thread = None
+
+    def _poll(self) -> None:
+        """Dev fallback: read new events from the table."""
+        last_prune = time.monotonic()
+        while not self._stop.wait(self.poll_interval):
+            try:
+                for message in self._fetch_after(self._last_version):
+                    self._deliver(message, received=True)
+                if time.monotonic() - last_prune > PRUNE_INTERVAL_SECONDS:
+                    self._prune()
+                    last_prune = time.monotonic()
+            except Exception:
+                # Database hiccup; pick up where we left off on the next tick
+                continue
+
+    def _listen(self) -> None:
+        """Postgres: LISTEN on the channel and reconcile against the table periodically."""
+        backoff = 0.5
+        while not self._stop.is_set():
+            connection = None
+            try:
+                connection = engine.raw_connection()
+                # Keep this connection out of the pool; it stays in autocommit mode for LISTEN
+                connection.detach()
+                dbapi_connection = connection.dbapi_connection
+                dbapi_connection.autocommit = True
+                cursor = dbapi_connection.cursor()
+                cursor.execute(f'LISTEN "{self.channel}"')
+                backoff = 0.5
+                # Catch up on anything published while we weren't listening
+                self._reconcile(grace=0.0)
+                last_reconcile = last_prune = time.monotonic()
+                while not self._stop.is_set():
+                    if select.select([dbapi_connection], [], [], self.poll_interval) != ([], [], []):
+                        dbapi_connection.poll()
+                        while dbapi_connection.notifies:
+                            notify = dbapi_connection.notifies.pop(0)
+                            message = InvalidationMessage(**orjson.loads(notify.payload))
+                            with self._lock:
+                                self._seen.add(message.version)
+                            self._deliver(message, received=True)
+                    if time.monotonic() - last_reconcile > self.reconcile_interval:
+                        self._reconcile(grace=self.reconcile_interval)
+                        last_reconcile = time.monotonic()
+                    if time.monotonic() - last_prune > PRUNE_INTERVAL_SECONDS:
+                        self._prune()
+                        last_prune = time.monotonic()
+            except Exception:
+                self.reconnects += 1
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                if connection is not None:
+                    try:
+                        connection.close()
+                    except Exception:
+                        pass
+
+    def _reconcile(self, grace: float) -> None:
+        """
+        Deliver committed events whose NOTIFY never arrived (e.g. while the
+        listener was reconnecting) and count them as dropped. Events younger
+        than `grace` are left alone, since their notifications may still be in
+        flight.
+        """
+        cutoff = time.time() - grace
+        reconciled_to = self._last_reconciled
+        while True:
+            batch = self._fetch_after(reconciled_to)
+            for message in batch:
+                if message.published_at > cutoff:
+                    batch = []
+                    break
+                with self._lock:
+                    seen = message.version in self._seen
+                    self._seen.discard(message.version)
+                if not seen:
+                    self.dropped += 1
+                    self._deliver(message, received=True)
+                reconciled_to = message.version
+            if len(batch) < FETCH_BATCH_SIZE:
+                break
+        self._last_reconciled = reconciled_to
+        with self._lock:
+            self._seen = {version for version in self._seen if version > reconciled_to}
+
+    def _fetch_after(self, version: int) -> List[InvalidationMessage]:
+        db = SessionLocal()
+        try:
+            rows = db.query(InvalidationEvent).filter(
+                InvalidationEvent.id > version
+            ).order_by(InvalidationEvent.id).limit(FETCH_BATCH_SIZE).all()
+            return [
+                InvalidationMessage(row.entity, row.organization_id, row.id, row.published_at)
+                for row in rows
+            ]
+        finally:
+            db.close()
+
+    def _prune(self) -> None:
+        db = SessionLocal()
+        try:
+            db.query(InvalidationEvent).filter(
+                InvalidationEvent.published_at < time.time() - self.retention
+            ).delete(synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lags = sorted(self._lags)
+        return {
+            "backend": self.backend,
+            "running": self.running,
+            "last_version": self._last_version,
+            "published": self.published,
+            "received": self.received,
+            "dropped": self.dropped,
+            "subscriber_errors": self.subscriber_errors,
+            "reconnects": self.reconnects,
+            "lag_ms": {
+                "avg": round(sum(lags) / len(lags) * 1000, 2) if lags else None,
+                "p99": round(lags[min(len(lags) - 1, int(len(lags) * 0.99))] * 1000, 2) if lags else None,
+                "max": round(lags[-1] * 1000, 2) if lags else None
+            }
+        }
+
+
+invalidation_bus = InvalidationBus(
+    channel=settings.INVALIDATION_CHANNEL,
+    poll_interval=settings.INVALIDATION_POLL_SECONDS,
+    reconcile_interval=settings.INVALIDATION_RECONCILE_SECONDS,
+    retention=settings.INVALIDATION_RETENTION_SECONDS
+)
+
+
+def publish_invalidation(db: Session, entity: str, organization_id: str) -> None:
+    """Invalidate cached data for an organization once db's transaction commits."""
+    invalidation_bus.publish(db, entity, organization_id)
@@ -0,0 +1,153 @@
+"""
+Always-on statistical sampling profiler.
+
+A daemon thread wakes up every PROFILER_INTERVAL_SECONDS, grabs the stacks of
+all threads through sys._current_frames() and folds them into
+"route;frame;frame;... count" lines, the format consumed by flamegraph.pl,
+speedscope and friends. Stacks are keyed by the API route whose endpoint
+function is on the stack, so a flamegraph can be cut per route.
+
+Sampling is wall-clock: a thread blocked on the database shows up as time
+spent inside the driver call, which is usually what we want to see.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+from app.core.config import settings
+
+# Stacks whose leaf frame lives in one of these files are threads parked on a
+# lock, queue or selector; they are dropped unless idle samples are requested.
+IDLE_LEAF_FILES = ("threading.py", "selectors.py", "queue.py", "base_events.py")
+
+# Upper bound on distinct folded stacks so memory stays flat under long uptimes
+MAX_UNIQUE_STACKS = 50000
+MAX_STACK_DEPTH = 128
+
+_APP_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class SamplingProfiler:
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self.idle_samples: Counter = Counter()
+        self.sample_count = 0
+        self.started_at: Optional[float] = None
+        self._route_codes: Dict[object, str] = {}
+        self._labels: Dict[object, str] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def register_routes(self, app) -> None:
+        """Map endpoint code objects to "METHOD /path" route keys."""
+        for route in app.routes:
+            endpoint = getattr(route, "endpoint", None)
+            code = getattr(endpoint, "__code__", None)
+            if code is None:
+                continue
+            methods = ",".join(sorted(getattr(route, "methods", None) or []))
+            self._route_codes[code] = f"{methods} {route.path}".strip()
+
+    def start(self) -> None:
+        """Start the sampler thread (idempotent)."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self.started_at = time.time()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the sampler thread."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def reset(self) -> None:
+        """Drop all collected samples."""
+        with self._lock:
+            self.samples.clear()
+            self.idle_samples.clear()
+            self.sample_count = 0
+            self.started_at = time.time()
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            filename = code.co_filename
+            if filename.startswith(_APP_ROOT):
+                filename = os.path.relpath(filename, _APP_ROOT)
+            else:
+                filename = os.path.basename(filename)
+            label = f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(";", ":")
+            self._labels[code] = label
+        return label
+
+    def _run(self) -> None:
+        own_ident = threading.get_ident()
+        main_ident = threading.main_thread().ident
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            folded = []
+            for ident, frame in frames.items():
+                if ident == own_ident:
+                    continue
+                idle = os.path.basename(frame.f_code.co_filename) in IDLE_LEAF_FILES
+                route = None
+                stack = []
+                while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                    code = frame.f_code
+                    if route is None:
+                        route = self._route_codes.get(code)
+                    stack.append(self._label(code))
+                    frame = frame.f_back
+                if route is None:
+                    route = "<event-loop>" if ident == main_ident else "<background>"
+                stack.append(route)
+                stack.reverse()
+                folded.append((";".join(stack), idle))
+            del frames
+
+            with self._lock:
+                self.sample_count += 1
+                for key, idle in folded:
+                    target = self.idle_samples if idle else self.samples
+                    if key in target or len(target) < MAX_UNIQUE_STACKS:
+                        target[key] += 1
+                    else:
+                        target["<truncated>"] += 1
+
+    def folded(self, route: Optional[str] = None, include_idle: bool = False) -> str:
+        """Render collected samples in folded-stack format."""
+        with self._lock:
+            counts = Counter(self.samples)
+            if include_idle:
+                counts.update(self.idle_samples)
+        lines = []
+        for stack, count in counts.most_common():
+            if route and not stack.startswith(route + ";"):
+                continue
+            lines.append(f"{stack} {count}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def routes(self) -> Dict[str, int]:
+        """Return the number of samples attributed to each route."""
+        totals: Counter = Counter()
+        with self._lock:
+            for stack, count in self.samples.items():
+                totals[stack.split(";", 1)[0]] += count
+        return dict(totals.most_common())
+
+
+profiler = SamplingProfiler(settings.PROFILER_INTERVAL_SECONDS)
@@ -0,0 +1,193 @@
+import csv
+import io
+from typing import Any, Iterable, Iterator, Sequence
+import orjson
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from app.core.compression import compress_chunks, negotiate_encoding
+from app.core.config import settings
+from app.core.wire_formats import JSON, encode, negotiate_format
+
+# Non-string dict keys show up in a few aggregate payloads (e.g. counts keyed by enum)
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+# Streamed bodies are written in chunks of about this size
+STREAM_CHUNK_BYTES = 64 * 1024
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response rendered by orjson.
+    Datetimes, enums, UUIDs and dataclasses are encoded natively, so payloads
+    don't need a jsonable_encoder pass first.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=ORJSON_OPTIONS)
+
+
+def trusted_response(content: Any, status_code: int = 200, headers: dict = None) -> FastJSONResponse:
+    """
+    Serialize a payload the handler built from trusted ORM data.
+    Returning a Response skips FastAPI's response_model validation and
+    jsonable_encoder; the route's response_model is still used for docs.
+    """
+    return FastJSONResponse(content, status_code=status_code, headers=headers)
+
+
+def json_array_chunks(items: Iterable[Any]) -> Iterator[bytes]:
+    """Encode items as one JSON array, a chunk at a time."""
+    buffer, separator = bytearray(b"["), b""
+    for item in items:
+        buffer += separator
+        buffer += orjson.dumps(item, option=ORJSON_OPTIONS)
+        separator = b","
+        if len(buffer) >= STREAM_CHUNK_BYTES:
+            yield bytes(buffer)
+            buffer.clear()
+    buffer += b"]"
+    yield bytes(buffer)
+
+
+def streaming_json_response(items: Iterable[Any], headers: dict = None) -> StreamingResponse:
+    """
+    Stream a JSON array as its items are produced.
+    Memory stays flat however long the list is, and the first bytes go out
+    as soon as the first chunk is encoded.
+    """
+    return StreamingResponse(json_array_chunks(items), media_type="application/json", headers=headers)
+
+
+def ndjson_chunks(items: Iterable[Any]) -> Iterator[bytes]:
+    """Encode items as newline-delimited JSON, a chunk at a time."""
+    buffer = bytearray()
+    for item in items:
+        buffer += orjson.dumps(item, option=ORJSON_OPTIONS | orjson.OPT_APPEND_NEWLINE)
+        if len(buffer) >= STREAM_CHUNK_BYTES:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+# Spreadsheets evaluate cells starting with these as formulas
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return value.isoformat() if hasattr(value, "isoformat") else value
+
+
+def csv_chunks(fields: Sequence[str], rows: Iterable[dict]) -> Iterator[bytes]:
+    """Encode dict rows as CSV with a header line, a chunk at a time."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    for row in rows:
+        writer.writerow([_csv_value(row[field]) for field in fields])
+        if buffer.tell() >= STREAM_CHUNK_BYTES:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode()
+
+
+def streaming_download(request: Request, chunks: Iterable[bytes], media_type: str, filename: str) -> StreamingResponse:
+    """
+    Stream a file download, compressed as it is produced if the client accepts it.
+    Compression happens here, in the threadpool that drives the iterator,
+    rather than in CompressionMiddleware on the event loop.
+    """
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"', "Vary": "Accept-Encoding"}
+    encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+    if encoding != "identity":
+        chunks = compress_chunks(chunks, encoding)
+        headers["Content-Encoding"] = encoding
+    return StreamingResponse(chunks, media_type=media_type, headers=headers)
+
+
+def negotiated_response(request: Request, content: Any, status_code: int = 200, headers: dict = None) -> Response:
+    """
+    trusted_response in the wire format the client's Accept header prefers:
+    JSON, or MessagePack / CBOR for machine clients.
+    """
+    media_type = negotiate_format(request.headers.get("accept"))
+    if media_type == JSON:
+        response = FastJSONResponse(content, status_code=status_code, headers=headers)
+    else:
+        response = Response(encode(content, media_type), status_code=status_code, headers=headers, media_type=media_type)
+    response.headers["Vary"] = "Accept"
+    return response
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """
+    The ETag of a snapshot's body in a content-coding.
+    A strong ETag names exact bytes, so each encoding gets its own.
+    """
+    return etag if encoding == "identity" else f'{etag[:-1]}-{encoding}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    Whether an If-None-Match header matches etag (RFC 9110 section 13.1.2):
+    "*" or a comma-separated list of entity tags, compared weakly.
+    """
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def snapshot_response(request: Request, snapshot, headers: dict = None, media_type: str = "application/json") -> Response:
+    """
+    Serve a cached snapshot as ready-made bytes.
+    The body variant matching Accept and Accept-Encoding is written as-is, and
+    a matching If-None-Match short-circuits to 304. Age reports how old the
+    data is; last-known-good fallbacks also carry a stale Warning.
+    """
+    # The snapshot in the negotiated wire format: same data, its own bytes and ETag
+    source = snapshot
+    vary = "Accept-Encoding"
+    if snapshot.formats and media_type == JSON:
+        vary = "Accept, Accept-Encoding"
+        wire_format = negotiate_format(request.headers.get("accept"))
+        if wire_format in snapshot.formats:
+            source, media_type = snapshot.formats[wire_format], wire_format
+    encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+    if encoding != "identity" and encoding not in source.variants and len(source.body) < settings.COMPRESSION_MIN_SIZE:
+        # Too small to be worth compressing
+        encoding = "identity"
+    etag = encoded_etag(source.etag, encoding)
+    response_headers = {
+        "ETag": etag,
+        "Vary": vary,
+        "Age": str(int(snapshot.age))
+    }
+    if snapshot.stale:
+        response_headers["Warning"] = '110 - "Response is Stale"'
+    if headers:
+        response_headers.update(headers)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=response_headers)
+
+    if encoding != "identity":
+        response_headers["Content-Encoding"] = encoding
+    return Response(
+        content=source.variant(encoding),
+        media_type=media_type,
+        headers=response_headers
+    )
@@ -0,0 +1,327 @@
+"""
+Host-local storage shared by every worker process.
+
+Gunicorn runs several workers per host and recycles each one after
+max_requests, so anything kept only in process memory is built once per
+worker and thrown away every few minutes. Entries here are files under a
+tmpfs directory (/dev/shm when available): each is written once and swapped
+in with an atomic rename, and any worker - including one forked a moment ago
+- maps it and reads it without rebuilding anything.
+
+Every entry is stamped with a version from a shared table of per-organization
+counters. Bumping an organization's counter invalidates its entries for every
+worker on the host at once.
+"""
+
+import fcntl
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+import orjson
+
+# Entries that aren't tied to one tenant (e.g. the directory) use this scope
+GLOBAL_SCOPE = "*"
+
+VERSION_SLOTS = 65536
+CLAIM_SLOTS = 4096
+LOCK_STRIPES = 1024
+_COUNTER = struct.Struct("<Q")
+_HEADER = struct.Struct("<4sI")  # magic, metadata length
+_MAGIC = b"SPS1"
+
+
+def default_directory() -> str:
+    shm = "/dev/shm"
+    base = shm if os.path.isdir(shm) and os.access(shm, os.W_OK) else tempfile.gettempdir()
+    return os.path.join(base, "status-page-store")
+
+
+def store_namespace(database_url: str) -> str:
+    """
+    Subdirectory for one database's entries. Instances on a host that point at
+    different databases (staging and production, two datasets) share a store
+    directory without ever reading each other's entries.
+    """
+    return hashlib.blake2b(database_url.encode(), digest_size=8).hexdigest()
+
+
+class _PerProcessFiles:
+    """Opens files lazily and re-opens them after fork, so flock is per process."""
+
+    def __init__(self):
+        self._pid = None
+        self._files: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def fd(self, path: str) -> int:
+        with self._lock:
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._files = {}
+            fd = self._files.get(path)
+            if fd is None:
+                fd = self._files[path] = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+            return fd
+
+
+class VersionTable:
+    """
+    Per-organization version counters in a shared memory-mapped file.
+    Organizations hash onto a fixed number of slots; a collision only costs an
+    extra invalidation. Slot 0 is the global counter, bumped on every change,
+    and a bump sets the organization's slot to the new global count, so a
+    global reading taken before a build tells whether any one organization
+    changed since (changed_since). Without a shared directory the counters
+    live in this process.
+    A second, smaller table records which invalidation messages the host has
+    already applied, so each is applied once however many workers receive it.
+    """
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self._files = _PerProcessFiles()
+        self._mm = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._local: Dict[int, int] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None
+
+    def _map(self) -> mmap.mmap:
+        with self._lock:
+            if self._mm is not None and self._pid == os.getpid():
+                return self._mm
+            fd = self._files.fd(self.path)
+            size = (VERSION_SLOTS + CLAIM_SLOTS) * _COUNTER.size
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                if os.fstat(fd).st_size != size:
+                    # Start from the clock so counters never repeat values from an
+                    # earlier table whose entries are still lying around
+                    os.ftruncate(fd, size)
+                    self._mm = mmap.mmap(fd, size)
+                    base = int(time.time() * 1000)
+                    for slot in range(VERSION_SLOTS):
+                        _COUNTER.pack_into(self._mm, slot * _COUNTER.size, base)
+                else:
+                    self._mm = mmap.mmap(fd, size)
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            self._pid = os.getpid()
+            return self._mm
+
+    def _slot(self, scope: Optional[str]) -> int:
+        if scope is None or scope == GLOBAL_SCOPE:
+            return 0
+        digest = hashlib.blake2b(scope.encode(), digest_size=8).digest()
+        return 1 + int.from_bytes(digest, "little") % (VERSION_SLOTS - 1)
+
+    def current(self, scope: Optional[str]) -> int:
+        """Current version for an organization id (or GLOBAL_SCOPE)."""
+        if not self.enabled:
+            return self._local.get(self._slot(scope), 0)
+        return _COUNTER.unpack_from(self._map(), self._slot(scope) * _COUNTER.size)[0]
+
+    def changed_since(self, scope: Optional[str], stamp: int) -> bool:
+        """Whether scope's entries were invalidated after current(GLOBAL_SCOPE) read `stamp`."""
+        version = self.current(scope)
+        # Global entries change with every bump; an organization's slot holds the count at its last one
+        return version != stamp if self._slot(scope) == 0 else version > stamp
+
+    def bump(self, scope: Optional[str]) -> None:
+        """Invalidate an organization's entries (and every global entry) host-wide."""
+        slot = self._slot(scope)
+        if not self.enabled:
+            with self._lock:
+                self._local[0] = self._local[slot] = self._local.get(0, 0) + 1
+            return
+        mm = self._map()
+        fd = self._files.fd(self.path)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            count = _COUNTER.unpack_from(mm, 0)[0] + 1
+            _COUNTER.pack_into(mm, 0, count)
+            _COUNTER.pack_into(mm, slot * _COUNTER.size, count)
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+
+    def claim(self, message_version: int) -> bool:
+        """
+        Record that an invalidation message is being applied on this host.
+        Returns False if another worker already claimed it.
+        """
+        if not self.enabled:
+            return True
+        mm = self._map()
+        fd = self._files.fd(self.path)
+        offset = (VERSION_SLOTS + message_version % CLAIM_SLOTS) * _COUNTER.size
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            if _COUNTER.unpack_from(mm, offset)[0] == message_version:
+                return False
+            _COUNTER.pack_into(mm, offset, message_version)
+            return True
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+class SharedFileStore:
+    """
+    One file per key: a small JSON header followed by raw blobs.
+    Readers map the file and get memoryviews onto its blobs, so nothing is
+    copied until a blob is actually written to a response.
+    """
+
+    def __init__(self, directory: Optional[str], max_age: float):
+        self.directory = directory
+        self.max_age = max_age
+        self._files = _PerProcessFiles()
+        self._puts = 0
+        self.hits = 0
+        self.misses = 0
+        self.write_errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, "entries", hashlib.blake2b(key.encode(), digest_size=16).hexdigest())
+
+    def read(self, key: str) -> Optional[Tuple[dict, Dict[str, memoryview]]]:
+        """Return (metadata, blobs by name) for key, or None."""
+        if not self.enabled:
+            return None
+        try:
+            with open(self._path(key), "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        magic, meta_length = _HEADER.unpack_from(mapped, 0)
+        if magic != _MAGIC:
+            self.misses += 1
+            return None
+        meta = orjson.loads(mapped[_HEADER.size:_HEADER.size + meta_length])
+        if meta.get("key") != key or time.time() - meta.get("built_at", 0) > self.max_age:
+            self.misses += 1
+            return None
+        view = memoryview(mapped)[_HEADER.size + meta_length:]
+        blobs = {name: view[offset:offset + length] for name, (offset, length) in meta["blobs"].items()}
+        self.hits += 1
+        return meta, blobs
+
+    def write(self, key: str, meta: dict, blobs: Dict[str, bytes]) -> None:
+        if not self.enabled:
+            return
+        offsets, offset = {}, 0
+        for name, blob in blobs.items():
+            offsets[name] = (offset, len(blob))
+            offset += len(blob)
+        header = orjson.dumps({**meta, "key": key, "blobs": offsets})
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                f.write(_HEADER.pack(_MAGIC, len(header)))
+                f.write(header)
+                for blob in blobs.values():
+                    f.write(blob)
+            os.replace(tmp_path, path)
+        except OSError:
+            # Best effort: the store is an optimisation, never a reason to fail a request
+            self.write_errors += 1
+            return
+        self._puts += 1
+        if self._puts % 256 == 0:
+            self.sweep()
+
+    def sweep(self) -> int:
+        """Remove entries too old to be served."""
+        entries = os.path.join(self.directory, "entries")
+        cutoff = time.time() - self.max_age
+        removed = 0
+        try:
+            names = os.listdir(entries)
+        except OSError:
+            return 0
+        for name in names:
+            path = os.path.join(entries, name)
+            try:
+                if os.stat(path).st_mtime < cutoff:
+                    os.remove(path)
+                    removed += 1
+            except OSError:
+                pass
+        return removed
+
+    def run_exclusive(self, name: str, fn: Callable, check: Callable, timeout: float):
+        """
+        Run fn while holding a host-wide lock for name.
+        While waiting for another process that holds it, check() is polled and
+        its result returned as soon as it's truthy, so only one worker on the
+        host builds while the others pick up what it stored.
+        """
+        if not self.enabled:
+            return fn()
+        stripe = int.from_bytes(hashlib.blake2b(name.encode(), digest_size=4).digest(), "little") % LOCK_STRIPES
+        try:
+            os.makedirs(os.path.join(self.directory, "locks"), exist_ok=True)
+            fd = self._files.fd(os.path.join(self.directory, "locks", f"{stripe:04d}"))
+        except OSError:
+            return fn()
+
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                found = check()
+                if found:
+                    return found
+                if time.monotonic() > deadline:
+                    # The holder is stuck; don't hold this request hostage to it
+                    return fn()
+                time.sleep(0.01)
+        try:
+            return check() or fn()
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+
+    def hold_leadership(self, name: str) -> bool:
+        """
+        Whether this process is the host's leader for name, taking the role if
+        it's free. Leadership is a lock held for the life of the process, so it
+        passes to another worker when the leader exits. Without a shared
+        directory every process leads.
+        """
+        if not self.enabled:
+            return True
+        try:
+            os.makedirs(os.path.join(self.directory, "leaders"), exist_ok=True)
+            fd = self._files.fd(os.path.join(self.directory, "leaders", name))
+        except OSError:
+            return True
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except BlockingIOError:
+            return False
+
+    def stats(self) -> dict:
+        return {
+            "directory": self.directory,
+            "hits": self.hits,
+            "misses": self.misses,
+            "write_errors": self.write_errors
+        }
@@ -0,0 +1,86 @@
+"""
+Request coalescing for expensive builds.
+
+When many requests miss the cache for the same key at once, only the first
+(the leader) runs the build; the others wait for it and share the result. This
+keeps a thundering herd of status-page viewers from turning into a thundering
+herd of identical database queries.
+"""
+
+import threading
+from typing import Any, Callable, Dict, Tuple
+
+from app.core.config import settings
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalesces concurrent calls for the same key within a worker."""
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.shared = 0
+        self.timeouts = 0
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Run fn once per key among concurrent callers.
+        Returns (result, shared) where shared is True for callers that reused
+        another caller's result. Exceptions propagate to every waiter.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                leader = True
+                self.leaders += 1
+            else:
+                call.waiters += 1
+                leader = False
+
+        if not leader:
+            if call.done.wait(self.timeout):
+                if call.error is not None:
+                    raise call.error
+                with self._lock:
+                    self.shared += 1
+                return call.result, True
+            # The leader is stuck; don't hold this request hostage to it
+            with self._lock:
+                self.timeouts += 1
+            return fn(), False
+
+        try:
+            call.result = fn()
+            return call.result, False
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "in_flight": len(self._calls),
+                "leaders": self.leaders,
+                "shared": self.shared,
+                "timeouts": self.timeouts
+            }
+
+
+status_flights = SingleFlight(settings.SINGLEFLIGHT_TIMEOUT_SECONDS)
@@ -0,0 +1,418 @@
+"""
+Caches of built public payloads.
+
+A Snapshot is a payload encoded once with orjson (and once per binary wire
+format, see app.core.wire_formats) and precompressed once per supported
+Content-Encoding, so serving a hot status page is a dictionary lookup plus a
+write of ready-made bytes. Each worker keeps an in-process LRU
+in front of a host-wide store shared by all workers (see
+app.core.shared_store), and both are checked against the shared version
+table so an invalidation anywhere on the host takes effect everywhere.
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Union
+
+import orjson
+
+from app.core.compression import compress, supported_encodings
+from app.core.config import settings
+from app.core.heavy_hitters import HOT, tenant_tracker
+from app.core.responses import ORJSON_OPTIONS
+from app.core.shared_store import GLOBAL_SCOPE, SharedFileStore, VersionTable, default_directory, store_namespace
+from app.core.wire_formats import binary_formats, encode
+
+# Snapshots read from the shared store hold memoryviews onto the mapped file
+# until a variant is first served
+Blob = Union[bytes, memoryview]
+
+
+@dataclass
+class Snapshot:
+    key: str
+    organization_id: Optional[str]
+    payload: Any
+    body: Blob
+    etag: str
+    built_at: float = field(default_factory=time.time)
+    variants: Dict[str, Blob] = field(default_factory=dict)
+    # Served from the last-known-good store instead of a fresh build
+    stale: bool = False
+    # Version of organization_id in the shared version table when built
+    version: int = 0
+    # The payload in each binary wire format, by media type
+    formats: Dict[str, "Snapshot"] = field(default_factory=dict)
+
+    @property
+    def age(self) -> float:
+        return max(0.0, time.time() - self.built_at)
+
+    def variant(self, encoding: str) -> bytes:
+        """Return the body for an encoding, compressing lazily if needed."""
+        if encoding == "identity":
+            if isinstance(self.body, memoryview):
+                self.body = bytes(self.body)
+            return self.body
+        data = self.variants.get(encoding)
+        if data is None:
+            data = compress(self.variant("identity"), encoding)
+        elif isinstance(data, memoryview):
+            data = bytes(data)
+        self.variants[encoding] = data
+        return data
+
+    def decoded_payload(self) -> Any:
+        """The payload, decoding the body for snapshots read from the shared store."""
+        if self.payload is None:
+            self.payload = orjson.loads(self.variant("identity"))
+        return self.payload
+
+
+def build_snapshot(key: str, payload: Any, organization_id: Optional[str]) -> Snapshot:
+    """Encode a payload in every wire format and precompress the JSON for every supported encoding."""
+    snapshot = build_asset(key, orjson.dumps(payload, option=ORJSON_OPTIONS), organization_id, payload)
+    for media_type in binary_formats():
+        # Binary formats are for a few machine clients: compressed lazily, on first request
+        snapshot.formats[media_type] = build_asset(key, encode(payload, media_type), organization_id, precompress=False)
+    return snapshot
+
+
+def build_asset(
+    key: str,
+    body: bytes,
+    organization_id: Optional[str],
+    payload: Any = None,
+    precompress: bool = True
+) -> Snapshot:
+    """Precompress ready-made bytes (e.g. a stylesheet) for every supported encoding."""
+    snapshot = Snapshot(
+        key=key,
+        organization_id=organization_id,
+        payload=payload,
+        body=body,
+        etag='"%s"' % hashlib.blake2b(body, digest_size=12).hexdigest(),
+    )
+    if precompress and len(body) >= settings.COMPRESSION_MIN_SIZE:
+        for encoding in supported_encodings():
+            snapshot.variants[encoding] = compress(body, encoding)
+    return snapshot
+
+
+def stale_snapshot(snapshot: Snapshot) -> Snapshot:
+    """
+    Copy of a snapshot marked as stale.
+    Object payloads gain a top-level "stale": true; built_at is kept so the
+    Age header reflects when the data was actually read.
+    """
+    payload = snapshot.decoded_payload()
+    if isinstance(payload, dict):
+        payload = {**payload, "stale": True}
+    stale = build_snapshot(snapshot.key, payload, snapshot.organization_id)
+    stale.built_at = snapshot.built_at
+    stale.stale = True
+    return stale
+
+
+class SnapshotCache:
+    """Thread-safe LRU of snapshots with a freshness TTL."""
+
+    def __init__(
+        self,
+        ttl: float,
+        max_entries: int,
+        versions: VersionTable,
+        ttl_policy: Optional[Callable[[Optional[str]], float]] = None
+    ):
+        self.ttl = ttl
+        self.ttl_policy = ttl_policy
+        self.max_entries = max_entries
+        self.versions = versions
+        self._entries: "OrderedDict[str, Snapshot]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Snapshot]:
+        """Return a fresh snapshot for key, or None."""
+        snapshot = self.peek(key)
+        with self._lock:
+            if snapshot is None or snapshot.age > self.ttl_for(snapshot.organization_id):
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return snapshot
+
+    def ttl_for(self, organization_id: Optional[str]) -> float:
+        """Freshness TTL for an organization's snapshots."""
+        if self.ttl_policy is None:
+            return self.ttl
+        return self.ttl_policy(organization_id)
+
+    def peek(self, key: str) -> Optional[Snapshot]:
+        """Return the snapshot for key regardless of age, or None if missing or invalidated."""
+        with self._lock:
+            snapshot = self._entries.get(key)
+        if snapshot is not None and snapshot.version != self.versions.current(snapshot.organization_id):
+            # Invalidated by another worker on this host
+            with self._lock:
+                if self._entries.get(key) is snapshot:
+                    del self._entries[key]
+            return None
+        return snapshot
+
+    def put(self, snapshot: Snapshot, stamp: Optional[int] = None) -> bool:
+        """
+        Store a snapshot unless its organization was invalidated since `stamp`
+        (a versions.current(GLOBAL_SCOPE) reading taken before it was built).
+        """
+        if stamp is not None and self.versions.changed_since(snapshot.organization_id, stamp):
+            return False
+        with self._lock:
+            self._entries[snapshot.key] = snapshot
+            self._entries.move_to_end(snapshot.key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return True
+
+    def invalidate_organization(self, organization_id: str) -> int:
+        """Drop every snapshot for an organization (and all global ones) on this host."""
+        self.versions.bump(organization_id)
+        with self._lock:
+            keys = [
+                key for key, snapshot in self._entries.items()
+                if snapshot.organization_id in (organization_id, GLOBAL_SCOPE)
+            ]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "ttl": self.ttl
+            }
+
+
+class FallbackStore:
+    """
+    Last-known-good snapshots on local disk, one file per key.
+    Files are replaced atomically, so they survive worker restarts and any
+    worker on the host can read what another one wrote.
+    """
+
+    def __init__(self, directory: str, max_entries: int):
+        self.directory = directory
+        self.max_entries = max_entries
+        # key -> (file mtime, stale snapshot) so repeated fallbacks don't re-read and re-compress
+        self._loaded: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.writes = 0
+        self.write_errors = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, hashlib.blake2b(key.encode(), digest_size=16).hexdigest() + ".json")
+
+    def save(self, snapshot: Snapshot) -> None:
+        record = orjson.dumps({
+            "key": snapshot.key,
+            "organization_id": snapshot.organization_id,
+            "built_at": snapshot.built_at,
+            "payload": snapshot.payload
+        }, option=ORJSON_OPTIONS)
+        self._write(snapshot.key, record)
+
+    def _write(self, key: str, record: bytes) -> None:
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                f.write(record)
+            os.replace(tmp_path, path)
+            self.writes += 1
+        except OSError:
+            # Best effort: a full or read-only disk must never fail a live request
+            self.write_errors += 1
+
+    def save_value(self, key: str, value: Any) -> None:
+        """Persist a small value, such as a resolver entry, alongside the snapshots."""
+        self._write(key, orjson.dumps({"key": key, "value": value}, option=ORJSON_OPTIONS))
+
+    def load_value(self, key: str) -> Any:
+        try:
+            with open(self._path(key), "rb") as f:
+                record = orjson.loads(f.read())
+        except (OSError, ValueError):
+            return None
+        return record.get("value") if record.get("key") == key else None
+
+    def load(self, key: str) -> Optional[Snapshot]:
+        """Return the last-known-good snapshot for key, marked stale, or None."""
+        path = self._path(key)
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            return None
+        with self._lock:
+            loaded = self._loaded.get(key)
+            if loaded is not None and loaded[0] == mtime:
+                self._loaded.move_to_end(key)
+                return loaded[1]
+        try:
+            with open(path, "rb") as f:
+                record = orjson.loads(f.read())
+        except (OSError, ValueError):
+            return None
+        if record.get("key") != key:
+            return None
+        snapshot = Snapshot(
+            key=key,
+            organization_id=record["organization_id"],
+            payload=record["payload"],
+            body=b"",
+            etag="",
+            built_at=record["built_at"]
+        )
+        stale = stale_snapshot(snapshot)
+        with self._lock:
+            self._loaded[key] = (mtime, stale)
+            while len(self._loaded) > self.max_entries:
+                self._loaded.popitem(last=False)
+        return stale
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "directory": self.directory,
+                "loaded": len(self._loaded),
+                "writes": self.writes,
+                "write_errors": self.write_errors
+            }
+
+
+# Shared-store blob name prefix for a binary wire format body
+_FORMAT_BLOB = "format:"
+
+
+class SharedSnapshotStore:
+    """Snapshots in the host-wide shared store, valid while their version is current."""
+
+    def __init__(self, files: SharedFileStore, versions: VersionTable):
+        self.files = files
+        self.versions = versions
+
+    def get(self, key: str) -> Optional[Snapshot]:
+        """Return the shared snapshot for key regardless of age, or None if missing or invalidated."""
+        found = self.files.read(key)
+        if found is None:
+            return None
+        meta, blobs = found
+        if meta["version"] != self.versions.current(meta["organization_id"]):
+            return None
+        formats = {
+            media_type: Snapshot(
+                key=key,
+                organization_id=meta["organization_id"],
+                payload=None,
+                body=blobs.pop(_FORMAT_BLOB + media_type),
+                etag=etag,
+                built_at=meta["built_at"],
+                version=meta["version"]
+            )
+            for media_type, etag in meta.get("formats", {}).items()
+        }
+        return Snapshot(
+            key=key,
+            organization_id=meta["organization_id"],
+            payload=None,
+            body=blobs.pop("identity"),
+            etag=meta["etag"],
+            built_at=meta["built_at"],
+            variants=blobs,
+            version=meta["version"],
+            formats=formats
+        )
+
+    def put(self, snapshot: Snapshot) -> None:
+        blobs = {"identity": snapshot.variant("identity")}
+        for encoding in list(snapshot.variants):
+            blobs[encoding] = snapshot.variant(encoding)
+        # Binary formats are shared uncompressed; each worker compresses on demand
+        for media_type, formatted in snapshot.formats.items():
+            blobs[_FORMAT_BLOB + media_type] = formatted.variant("identity")
+        self.files.write(snapshot.key, {
+            "organization_id": snapshot.organization_id,
+            "etag": snapshot.etag,
+            "built_at": snapshot.built_at,
+            "version": snapshot.version,
+            "formats": {media_type: formatted.etag for media_type, formatted in snapshot.formats.items()}
+        }, blobs)
+
+    def get_value(self, key: str) -> Any:
+        """Return a small shared value (e.g. a resolver entry), or None."""
+        found = self.files.read(key)
+        if found is None:
+            return None
+        meta, _ = found
+        if meta["version"] != self.versions.current(meta["organization_id"]):
+            return None
+        return meta["value"]
+
+    def put_value(self, key: str, value: Any, organization_id: str, version: int) -> None:
+        self.files.write(key, {
+            "organization_id": organization_id,
+            "built_at": time.time(),
+            "version": version,
+            "value": value
+        }, {})
+
+
+# Everything kept on disk is per database
+_namespace = store_namespace(settings.DATABASE_URL)
+_shared_directory = (
+    os.path.join(settings.SHARED_STORE_DIR or default_directory(), _namespace)
+    if settings.SHARED_STORE_ENABLED else None
+)
+versions = VersionTable(os.path.join(_shared_directory, "versions") if _shared_directory else None)
+if _shared_directory:
+    os.makedirs(_shared_directory, exist_ok=True)
+shared_snapshots = SharedSnapshotStore(
+    SharedFileStore(_shared_directory, settings.SHARED_STORE_MAX_AGE_SECONDS),
+    versions
+)
+
+
+def adaptive_ttl(organization_id: Optional[str]) -> float:
+    """
+    Hot organizations keep snapshots longer: their rebuilds are the most
+    expensive in aggregate, and the invalidation bus keeps them correct.
+    """
+    if tenant_tracker.tier(organization_id) == HOT:
+        return settings.STATUS_CACHE_HOT_TTL_SECONDS
+    return settings.STATUS_CACHE_TTL_SECONDS
+
+
+snapshot_cache = SnapshotCache(
+    settings.STATUS_CACHE_TTL_SECONDS,
+    settings.STATUS_CACHE_MAX_ENTRIES,
+    versions,
+    ttl_policy=adaptive_ttl
+)
+fallback_store = FallbackStore(
+    os.path.join(settings.SNAPSHOT_FALLBACK_DIR or os.path.join(tempfile.gettempdir(), "status-page-snapshots"), _namespace),
+    settings.STATUS_CACHE_MAX_ENTRIES
+)
@@ -0,0 +1,306 @@
+"""
+Per-tenant database cost accounting.
+
+Each HTTP request gets a usage record in a context variable. Engine events
+add every statement's count, time and row count to it, the middleware adds
+the response size, and whichever code learns the organization being served
+(authentication, public identifier resolution) attributes the request to it.
+When the response is done the record is added to per-organization,
+per-minute totals. Each worker writes its totals to a file in the host-shared
+store directory every few seconds and on exit, and reports merge every
+worker's file, so they cover the whole host and survive worker recycling.
+
+Statements outside a request (prewarming, background refresh, the
+invalidation bus) are booked under BACKGROUND.
+"""
+
+import atexit
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+import orjson
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.core.snapshots import shared_snapshots
+
+BACKGROUND = "(background)"
+UNATTRIBUTED = "(unattributed)"
+
+METRICS = ("requests", "queries", "db_ms", "rows", "response_bytes")
+
+# How often a worker writes its totals to the shared directory
+FLUSH_INTERVAL_SECONDS = 5.0
+
+
+class RequestUsage:
+    __slots__ = ("organization_id", "queries", "db_seconds", "rows", "response_bytes")
+
+    def __init__(self):
+        self.organization_id = None
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.rows = 0
+        self.response_bytes = 0
+
+
+# Holds a mutable record rather than values, so updates made in threadpool
+# copies of the request context are visible to the middleware
+_current_usage: ContextVar[Optional[RequestUsage]] = ContextVar("current_usage", default=None)
+
+
+def attribute_to_organization(organization_id: Optional[str]) -> None:
+    """Attribute the current request's database work to an organization."""
+    usage = _current_usage.get()
+    if usage is not None and organization_id and usage.organization_id is None:
+        usage.organization_id = organization_id
+
+
+class _CountingCursor:
+    """Wraps a DBAPI cursor to count the rows actually fetched from it."""
+
+    def __init__(self, cursor, usage: Optional[RequestUsage], ledger: "CostLedger"):
+        self._cursor = cursor
+        self._usage = usage
+        self._ledger = ledger
+
+    def _count(self, rows: int) -> None:
+        if not rows:
+            return
+        if self._usage is not None:
+            self._usage.rows += rows
+        else:
+            self._ledger.add(BACKGROUND, 0, 0, 0.0, rows, 0)
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        self._count(row is not None)
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        rows = self._cursor.fetchmany(*args, **kwargs)
+        self._count(len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        self._count(len(rows))
+        return rows
+
+    def __iter__(self):
+        for row in self._cursor:
+            self._count(1)
+            yield row
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class CostLedger:
+    """
+    Per-organization totals in one-minute buckets, kept for `retention_minutes`.
+    With a directory, reports cover every worker that wrote there.
+    """
+
+    def __init__(self, retention_minutes: int, directory: Optional[str] = None):
+        self.retention_minutes = retention_minutes
+        self.directory = directory
+        self._minutes: "OrderedDict[int, Dict[str, List[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._flushed_at = time.monotonic()
+        self._pid = None
+        self._file = None
+
+    def _path(self) -> str:
+        # One file per process; a forked worker starts its own
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._file = os.path.join(self.directory, f"{self._pid}-{uuid.uuid4().hex[:8]}.json")
+            self._minutes.clear()
+        return self._file
+
+    def flush(self) -> None:
+        """Write this worker's totals where other workers' reports can read them."""
+        if self.directory is None:
+            return
+        with self._lock:
+            path = self._path()
+            data = orjson.dumps({str(minute): bucket for minute, bucket in self._minutes.items()})
+            self._flushed_at = time.monotonic()
+        tmp_path = f"{path}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            # Best effort: the report just misses this worker's latest seconds
+            pass
+
+    def _host_minutes(self) -> List[tuple]:
+        """(minute, bucket) pairs from every worker's file, removing expired files."""
+        self.flush()
+        cutoff = time.time() - self.retention_minutes * 60
+        pairs = []
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            names = []
+        for name in names:
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                if os.stat(path).st_mtime < cutoff:
+                    os.remove(path)
+                    continue
+                with open(path, "rb") as f:
+                    minutes = orjson.loads(f.read())
+            except (OSError, orjson.JSONDecodeError):
+                continue
+            pairs.extend((int(minute), bucket) for minute, bucket in minutes.items())
+        return pairs
+
+    def _bucket(self, minute: int) -> Dict[str, List[float]]:
+        bucket = self._minutes.get(minute)
+        if bucket is None:
+            bucket = self._minutes[minute] = {}
+            while len(self._minutes) > self.retention_minutes:
+                self._minutes.popitem(last=False)
+        return bucket
+
+    def add(self, organization_id: str, requests: int, queries: int, db_seconds: float, rows: int, response_bytes: int) -> None:
+        minute = int(time.time() // 60)
+        with self._lock:
+            if self.directory is not None:
+                self._path()
+            totals = self._bucket(minute).setdefault(organization_id, [0, 0, 0.0, 0, 0])
+            totals[0] += requests
+            totals[1] += queries
+            totals[2] += db_seconds * 1000
+            totals[3] += rows
+            totals[4] += response_bytes
+            due = self.directory is not None and time.monotonic() - self._flushed_at > FLUSH_INTERVAL_SECONDS
+        if due:
+            self.flush()
+
+    def add_request(self, usage: RequestUsage) -> None:
+        self.add(usage.organization_id or UNATTRIBUTED, 1, usage.queries, usage.db_seconds, usage.rows, usage.response_bytes)
+
+    def report(self, minutes: int, limit: int, sort: str, organization_id: Optional[str] = None) -> dict:
+        """Rank organizations by a metric over the last `minutes` minutes."""
+        since = int(time.time() // 60) - min(minutes, self.retention_minutes) + 1
+        if self.directory is not None:
+            pairs = self._host_minutes()
+        else:
+            with self._lock:
+                pairs = list(self._minutes.items())
+
+        totals: Dict[str, List[float]] = {}
+        series: Dict[int, List[float]] = {}
+        for minute, bucket in pairs:
+            if minute < since:
+                continue
+            for org, values in bucket.items():
+                summed = totals.setdefault(org, [0, 0, 0.0, 0, 0])
+                for index, value in enumerate(values):
+                    summed[index] += value
+            if organization_id is not None and organization_id in bucket:
+                summed = series.setdefault(minute, [0, 0, 0.0, 0, 0])
+                for index, value in enumerate(bucket[organization_id]):
+                    summed[index] += value
+
+        index = METRICS.index(sort)
+        ranked = sorted(totals.items(), key=lambda item: item[1][index], reverse=True)
+        grand_total = sum(values[index] for values in totals.values()) or 1
+        report = {
+            "minutes": minutes,
+            "sort": sort,
+            "organizations": [
+                {
+                    "organization_id": org,
+                    **{metric: round(value, 2) for metric, value in zip(METRICS, values)},
+                    "share": round(values[index] / grand_total, 4)
+                }
+                for org, values in ranked[:limit]
+            ]
+        }
+        if organization_id is not None:
+            report["series"] = [
+                {"minute": minute * 60, **{metric: round(value, 2) for metric, value in zip(METRICS, values)}}
+                for minute, values in sorted(series.items())
+            ]
+        return report
+
+
+class TenantCostMiddleware:
+    """Gives each request a usage record and books it when the response finishes."""
+
+    def __init__(self, app, ledger: CostLedger):
+        self.app = app
+        self.ledger = ledger
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        usage = RequestUsage()
+        token = _current_usage.set(usage)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.body":
+                usage.response_bytes += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_usage.reset(token)
+            self.ledger.add_request(usage)
+
+
+def instrument_engine(engine, ledger: CostLedger) -> None:
+    """Count every statement against the current request (or BACKGROUND)."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("cost_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["cost_started"].pop()
+        usage = _current_usage.get()
+        if cursor.description is not None:
+            # rowcount is -1 or meaningless for SELECTs on most drivers (and
+            # before a server-side cursor is drained), so count rows as they're fetched
+            rows = 0
+            if context is not None:
+                context.cursor = _CountingCursor(cursor, usage, ledger)
+        else:
+            rows = max(cursor.rowcount, 0)
+        if usage is not None:
+            usage.queries += 1
+            usage.db_seconds += elapsed
+            usage.rows += rows
+        else:
+            ledger.add(BACKGROUND, 0, 1, elapsed, rows, 0)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        # Keep the timing stack balanced when a statement fails
+        started = context.connection.info.get("cost_started") if context.connection is not None else None
+        if started:
+            started.pop()
+
+
+cost_ledger = CostLedger(
+    settings.TENANT_COST_RETENTION_MINUTES,
+    os.path.join(shared_snapshots.files.directory, "tenant-costs") if shared_snapshots.files.enabled else None
+)
+atexit.register(cost_ledger.flush)
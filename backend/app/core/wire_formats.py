@@ -0,0 +1,112 @@
+"""
+Binary wire formats negotiated by Accept.
+
+Machine clients can ask for MessagePack (Accept: application/msgpack) or CBOR
+(application/cbor) instead of JSON. Timestamps use each format's native
+timestamp type rather than ISO strings, and enums are sent as their values.
+Cached snapshots carry a body per format (see app.core.snapshots), so serving
+a binary format costs no more than serving JSON.
+"""
+
+from datetime import date, datetime, timezone
+from enum import Enum
+from typing import Any, Optional
+from uuid import UUID
+
+try:
+    import msgpack
+except ImportError:  # optional dependency; MessagePack is not offered
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:  # optional dependency; CBOR is not offered
+    cbor2 = None
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+CBOR = "application/cbor"
+
+# Other media types clients send for the same formats
+_ALIASES = {
+    "application/x-msgpack": MSGPACK,
+    "application/vnd.msgpack": MSGPACK,
+}
+
+
+def binary_formats() -> tuple:
+    formats = []
+    if msgpack is not None:
+        formats.append(MSGPACK)
+    if cbor2 is not None:
+        formats.append(CBOR)
+    return tuple(formats)
+
+
+def negotiate_format(accept: Optional[str]) -> str:
+    """
+    Pick the wire format from an Accept header.
+    A binary format is chosen only when the client names it and doesn't rank
+    application/json at least as high; wildcards mean JSON.
+    """
+    if not accept:
+        return JSON
+    accept = accept.lower()
+    if "pack" not in accept and "cbor" not in accept:
+        # Browsers and most clients: skip parsing
+        return JSON
+    weights = {}
+    for part in accept.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        token = _ALIASES.get(token, token)
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[token] = max(quality, weights.get(token, 0.0))
+    best, best_quality = JSON, weights.get(JSON, 0.0)
+    for media_type in binary_formats():
+        quality = weights.get(media_type, 0.0)
+        if quality > best_quality:
+            best, best_quality = media_type, quality
+    return best
+
+
+def _naive_as_utc(value: datetime) -> datetime:
+    # Stored timestamps are naive UTC
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
+def _msgpack_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return msgpack.Timestamp.from_datetime(_naive_as_utc(value))
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError(f"Cannot encode {type(value).__name__} as MessagePack")
+
+
+def _cbor_default(encoder, value: Any) -> None:
+    if isinstance(value, Enum):
+        encoder.encode(value.value)
+    elif isinstance(value, date):
+        encoder.encode(value.isoformat())
+    else:
+        raise TypeError(f"Cannot encode {type(value).__name__} as CBOR")
+
+
+def encode(payload: Any, media_type: str) -> bytes:
+    """Encode a payload in a binary format from binary_formats()."""
+    if media_type == MSGPACK:
+        return msgpack.packb(payload, default=_msgpack_default, use_bin_type=True)
+    if media_type == CBOR:
+        # Epoch timestamps (tag 1) rather than RFC 3339 strings (tag 0)
+        return cbor2.dumps(payload, default=_cbor_default, timezone=timezone.utc, datetime_as_timestamp=True)
+    raise ValueError(f"Unsupported wire format: {media_type}")
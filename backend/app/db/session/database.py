@@ -1,3 +1,4 @@
+from fastapi import Request
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
@@ -11,8 +12,16 @@ engine = create_engine(
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Sub-requests of a batch find the batch's session in their ASGI scope
+SCOPE_SESSION_KEY = "db_session"
+
 # Dependency to get database session
-def get_db():
+def get_db(request: Request):
+    shared = request.scope.get(SCOPE_SESSION_KEY)
+    if shared is not None:
+        # Owned (and closed) by the batch
+        yield shared
+        return
     db = SessionLocal()
     try:
         yield db
@@ -0,0 +1,34 @@
+"""
+Bring an existing database up to the declared models.
+
+There are no migrations: create_all makes missing tables, and this adds what
+it skips on tables that already exist - nullable columns and indexes declared
+since - then fills in denormalised columns for rows written before them.
+"""
+
+from sqlalchemy import inspect, text
+
+from app.db.session.base import Base
+
+
+def sync_schema(engine) -> None:
+    import app.models  # noqa: F401 - register every table on Base.metadata
+
+    Base.metadata.create_all(bind=engine)
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing and column.nullable:
+                    column_type = column.type.compile(dialect=engine.dialect)
+                    conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+        # Incidents carry their service's organization (services never move between organizations)
+        conn.execute(text(
+            "UPDATE incidents SET organization_id = "
+            "(SELECT organization_id FROM services WHERE services.id = incidents.service_id) "
+            "WHERE organization_id IS NULL"
+        ))
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
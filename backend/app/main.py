@@ -1,14 +1,26 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.v1 import api_router
+from app.core.circuit_breaker import StatusUnavailableError
+from app.core.compression import CompressionMiddleware
+from app.core.config import settings
+from app.core.heavy_hitters import tenant_tracker
+from app.core.host_routing import HostRoutingMiddleware
+from app.core.invalidation import invalidation_bus
+from app.core.profiling import profiler
+from app.core.responses import FastJSONResponse
+from app.core.tenant_costs import TenantCostMiddleware, cost_ledger, instrument_engine
 from app.db.session.database import engine
-from app.db.session.base import Base
-import app.models  # Import models to register them with SQLAlchemy
+from app.db.session.schema import sync_schema
+from app.services.cdn_purge import purge_dispatcher
+from app.services.domain_map import domain_map
+from app.services.snapshot_prewarm import prewarmer
+from app.services.status_snapshots import invalidate_snapshots
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Create database tables, and columns and indexes added to existing ones
+sync_schema(engine)
 
-app = FastAPI(title="Status Page Application")
+app = FastAPI(title="Status Page Application", default_response_class=FastJSONResponse)
 
 # Add CORS middleware
 app.add_middleware(
@@ -19,8 +31,84 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress dynamic responses; cached snapshots arrive precompressed
+app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MIN_SIZE)
+
+# Serve vanity domains from the in-memory domain map
+app.add_middleware(HostRoutingMiddleware, resolve=domain_map.resolve, trust_forwarded_host=settings.TRUST_FORWARDED_HOST)
+
+# Outermost, so response sizes are counted as sent (after compression)
+app.add_middleware(TenantCostMiddleware, ledger=cost_ledger)
+instrument_engine(engine, cost_ledger)
+
 app.include_router(api_router, prefix="/api/v1")
 
+invalidation_bus.subscribe(invalidate_snapshots)
+invalidation_bus.subscribe(prewarmer.on_invalidation)
+invalidation_bus.subscribe(domain_map.on_invalidation)
+# Purge the edge once per write, from the worker that made it
+invalidation_bus.subscribe(purge_dispatcher.on_commit, published_only=True)
+
+@app.exception_handler(StatusUnavailableError)
+def status_unavailable_handler(request: Request, exc: StatusUnavailableError):
+    return FastJSONResponse(
+        {"detail": str(exc)},
+        status_code=503,
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+@app.on_event("startup")
+def start_profiler():
+    if settings.PROFILER_ENABLED:
+        profiler.register_routes(app)
+        profiler.start()
+
+@app.on_event("shutdown")
+def stop_profiler():
+    profiler.stop()
+
+@app.on_event("startup")
+def load_domain_map():
+    try:
+        domain_map.load()
+    except Exception:
+        # Domains are then resolved by query (and cached) until the map loads on the next start
+        pass
+
+@app.on_event("startup")
+def start_invalidation_bus():
+    if settings.INVALIDATION_BUS_ENABLED:
+        invalidation_bus.start()
+
+@app.on_event("shutdown")
+def stop_invalidation_bus():
+    invalidation_bus.stop()
+
+@app.on_event("startup")
+def start_tenant_tracker():
+    tenant_tracker.start()
+
+@app.on_event("shutdown")
+def stop_tenant_tracker():
+    tenant_tracker.stop()
+
+@app.on_event("startup")
+def start_prewarmer():
+    if settings.PREWARM_ENABLED:
+        prewarmer.start()
+
+@app.on_event("shutdown")
+def stop_prewarmer():
+    prewarmer.stop()
+
+@app.on_event("startup")
+def start_purge_dispatcher():
+    purge_dispatcher.start()
+
+@app.on_event("shutdown")
+def stop_purge_dispatcher():
+    purge_dispatcher.stop()
+
 @app.get("/")
 def read_root():
     return {"Hello": "World", "database": "SQLite"}
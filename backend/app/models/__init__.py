@@ -3,5 +3,7 @@ from .organization import Organization
 from .organization_settings import OrganizationSettings
 from .service import Service
 from .incident import Incident
+from .invalidation_event import InvalidationEvent
+from .change_log import ChangeSequence, ChangeLogEntry
 
-__all__ = ["User", "Organization", "OrganizationSettings", "Service", "Incident"]
\ No newline at end of file
+__all__ = ["User", "Organization", "OrganizationSettings", "Service", "Incident", "InvalidationEvent", "ChangeSequence", "ChangeLogEntry"]
\ No newline at end of file
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String, DateTime, UniqueConstraint
+from datetime import datetime
+from app.db.session.base import Base
+
+class ChangeSequence(Base):
+    __tablename__ = "change_sequences"
+
+    # Last sequence number handed out for the organization; bumped in each writing transaction
+    organization_id = Column(String, primary_key=True)
+    last_sequence = Column(Integer, nullable=False, default=0)
+
+class ChangeLogEntry(Base):
+    __tablename__ = "change_log"
+    __table_args__ = (UniqueConstraint("organization_id", "sequence"),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    organization_id = Column(String, nullable=False)
+    sequence = Column(Integer, nullable=False)
+    entity = Column(String, nullable=False)      # incident, service, settings, member
+    entity_id = Column(String, nullable=False)
+    operation = Column(String, nullable=False)   # upsert, delete
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Enum
+from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Enum, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.db.session.base import Base
@@ -19,6 +19,12 @@ class IncidentImpact(enum.Enum):
 
 class Incident(Base):
     __tablename__ = "incidents"
+    __table_args__ = (
+        # Newest-first keyset pagination of a service's incident history
+        Index("ix_incidents_service_created", "service_id", "created_at", "id"),
+        # ... and of an organization's, across all of its services
+        Index("ix_incidents_organization_created", "organization_id", "created_at", "id"),
+    )
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     title = Column(String, nullable=False)
@@ -26,6 +32,9 @@ class Incident(Base):
     status = Column(Enum(IncidentStatus), default=IncidentStatus.INVESTIGATING, nullable=False)
     impact = Column(Enum(IncidentImpact), default=IncidentImpact.MEDIUM, nullable=False)
     service_id = Column(String, ForeignKey("services.id"), nullable=False)
+    # The service's organization, copied so organization-wide history reads one index in order.
+    # Nullable only so existing databases can add it; sync_schema backfills it.
+    organization_id = Column(String, ForeignKey("organizations.id"), nullable=True)
     created_by = Column(String, ForeignKey("users.id"), nullable=False)
     resolved_at = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime
+from datetime import datetime
+from app.db.session.base import Base
+
+class InvalidationEvent(Base):
+    __tablename__ = "invalidation_events"
+
+    # Monotonic so listeners can resume from the last event they saw; doubles as the message version
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    entity = Column(String, nullable=False)          # incident, service, organization_settings, user, organization
+    organization_id = Column(String, nullable=False)
+    published_at = Column(Float, nullable=False)     # Unix time, for delivery lag
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
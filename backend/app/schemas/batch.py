@@ -0,0 +1,20 @@
+from pydantic import BaseModel, Field
+from typing import Any, List, Literal, Optional
+
+MAX_BATCH_REQUESTS = 50
+
+class BatchOperation(BaseModel):
+    method: Literal["GET", "POST", "PUT", "PATCH", "DELETE"]
+    path: str = Field(
+        ...,
+        pattern=r"^/api/v1/",
+        description="API path with optional query string, e.g. /api/v1/organization/incidents/{id}"
+    )
+    body: Optional[Any] = Field(None, description="JSON request body")
+
+class BatchRequest(BaseModel):
+    requests: List[BatchOperation] = Field(..., min_length=1, max_length=MAX_BATCH_REQUESTS)
+    transactional: bool = Field(
+        False,
+        description="Run every request in one transaction: all writes commit, or none do"
+    )
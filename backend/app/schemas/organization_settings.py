@@ -38,7 +38,7 @@ class PublicStatusPage(BaseModel):
     logo_url: Optional[str]
     primary_color: str
     background_color: str
-    custom_css: Optional[str]
+    custom_css_url: Optional[str] = None
     show_incident_history: bool
     show_uptime_stats: bool
     maintenance_mode: bool
@@ -47,4 +47,5 @@ class PublicStatusPage(BaseModel):
     support_url: Optional[str]
     services: list = []
     incidents: list = []
+    organization_id: Optional[str] = None
     organization_name: str
@@ -0,0 +1,12 @@
+from pydantic import BaseModel, Field
+from typing import List
+
+MAX_BATCH_ORGANIZATIONS = 200
+
+class BatchStatusRequest(BaseModel):
+    organizations: List[str] = Field(
+        ...,
+        min_length=1,
+        max_length=MAX_BATCH_ORGANIZATIONS,
+        description="Organization IDs or names"
+    )
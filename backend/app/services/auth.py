@@ -5,6 +5,8 @@ from app.models.organization_settings import OrganizationSettings
 from app.schemas.auth import UserCreate
 from app.core.auth import get_password_hash, verify_password
 import uuid
+from app.core.invalidation import publish_invalidation
+from app.services.change_feed import record_change
 
 def get_user_by_email(db: Session, email: str) -> User:
     """Get user by email."""
@@ -35,6 +37,8 @@ def create_user(db: Session, user: UserCreate) -> User:
         organization_id=user.organization_id
     )
     db.add(db_user)
+    publish_invalidation(db, "user", user.organization_id)
+    record_change(db, user.organization_id, "member", db_user.id)
     db.commit()
     db.refresh(db_user)
     return db_user
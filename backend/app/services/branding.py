@@ -0,0 +1,75 @@
+"""
+Custom CSS as a separate, content-addressed asset.
+
+Status page payloads carry only a URL with a hash of the organization's
+custom CSS. The stylesheet itself is served from that URL precompressed and
+marked immutable, so clients and CDNs fetch it once per change instead of
+receiving it inside every poll of the status page.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.snapshots import Snapshot, build_asset
+from app.models.organization_settings import OrganizationSettings
+
+BRANDING_PATH = "/api/v1/public/branding"
+
+# A given URL always names the same bytes, so cached copies never need invalidating
+_assets: "OrderedDict[str, Snapshot]" = OrderedDict()
+_assets_bytes = 0
+_assets_lock = threading.Lock()
+
+
+def css_hash(css: str) -> str:
+    return hashlib.blake2b(css.encode(), digest_size=8).hexdigest()
+
+
+def branding_css_url(organization_id: str, css: Optional[str]) -> Optional[str]:
+    """URL of an organization's custom CSS, or None if it has none."""
+    if not css:
+        return None
+    return f"{BRANDING_PATH}/{organization_id}/{css_hash(css)}.css"
+
+
+def _remember(asset: Snapshot) -> None:
+    global _assets_bytes
+    size = len(asset.body) + sum(len(variant) for variant in asset.variants.values())
+    if size > settings.BRANDING_CACHE_MAX_BYTES:
+        return
+    with _assets_lock:
+        if asset.key in _assets:
+            return
+        _assets[asset.key] = asset
+        _assets_bytes += size
+        while _assets_bytes > settings.BRANDING_CACHE_MAX_BYTES:
+            _, evicted = _assets.popitem(last=False)
+            _assets_bytes -= len(evicted.body) + sum(len(variant) for variant in evicted.variants.values())
+
+
+def get_branding_css_asset(db: Session, organization_id: str, content_hash: str) -> Optional[Snapshot]:
+    """
+    The precompressed stylesheet for an organization's CSS at a given hash.
+    Returns None if the organization's CSS no longer has that hash.
+    """
+    key = f"branding:{organization_id}:{content_hash}"
+    with _assets_lock:
+        asset = _assets.get(key)
+        if asset is not None:
+            _assets.move_to_end(key)
+            return asset
+
+    row = db.query(OrganizationSettings.custom_css).filter(
+        OrganizationSettings.organization_id == organization_id
+    ).first()
+    css = row[0] if row else None
+    if not css or css_hash(css) != content_hash:
+        return None
+    asset = build_asset(key, css.encode(), organization_id)
+    _remember(asset)
+    return asset
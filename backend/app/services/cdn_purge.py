@@ -0,0 +1,185 @@
+"""
+Targeted edge-cache purges after committed writes.
+
+The invalidation bus hands the dispatcher every invalidation this worker
+published, once its transaction has committed. The dispatcher maps it to
+surrogate keys (see app.core.cdn), batches bursts of writes, and sends the
+purge from a background thread so write requests never wait on the edge.
+
+Backends:
+  surrogate-key  POST to a purge API with the keys in a Surrogate-Key header
+                 (Fastly's batch purge; Varnish xkey setups accept the same)
+  nginx          the reference proxy in frontend/nginx.conf. Stock nginx
+                 can't purge by tag, so every cached URL of the affected
+                 organizations is re-fetched with X-Cache-Refresh, once per
+                 cached encoding
+"""
+
+import http.client
+import queue
+import threading
+import time
+from typing import Iterable, List, Optional, Set, Tuple
+from urllib.parse import quote, urlsplit
+
+from app.core.cdn import DIRECTORY_KEY, purge_keys
+from app.core.config import settings
+from app.core.invalidation import InvalidationMessage
+from app.services.domain_map import domain_map
+
+
+class SurrogateKeyBackend:
+    def __init__(self, url: str, token: str, timeout: float = 5.0):
+        self.url = url
+        self.token = token
+        self.timeout = timeout
+
+    def purge(self, keys: Set[str], organization_ids: Set[str]) -> None:
+        parts = urlsplit(self.url)
+        connection_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        connection = connection_class(parts.netloc, timeout=self.timeout)
+        try:
+            headers = {"Surrogate-Key": " ".join(sorted(keys))}
+            if self.token:
+                headers["Fastly-Key"] = self.token
+            connection.request("POST", parts.path or "/", headers=headers)
+            response = connection.getresponse()
+            response.read()
+            if response.status >= 400:
+                raise RuntimeError(f"purge failed with HTTP {response.status}")
+        finally:
+            connection.close()
+
+
+class NginxRefreshBackend:
+    ENCODINGS = ("br", "gzip", "identity")
+
+    def __init__(self, url: str, timeout: float = 5.0):
+        self.url = url
+        self.timeout = timeout
+
+    def _targets(self, keys: Set[str], organization_ids: Set[str]) -> List[Tuple[str, Optional[str]]]:
+        """(path, Host override) of every cached URL that may show the organizations."""
+        targets = []
+        if DIRECTORY_KEY in keys:
+            targets.append(("/api/v1/status/organizations", None))
+        for organization_id in organization_ids:
+            names = domain_map.names_for(organization_id)
+            targets.append((f"/api/v1/public/status/org/{quote(organization_id)}", None))
+            targets.append((f"/api/v1/organizations/public/org/{quote(organization_id)}", None))
+            for identifier in (organization_id, *names):
+                identifier = quote(identifier, safe="")
+                for view in ("status", "services", "incidents", "incidents/history"):
+                    targets.append((f"/api/v1/status/organizations/{identifier}/{view}", None))
+                targets.append((f"/api/v1/public/status/{identifier}", None))
+                targets.append((f"/api/v1/organizations/public/{identifier}", None))
+                # Other look-back windows (and history pages) expire with s-maxage
+                targets.append((f"/api/v1/organizations/public/{identifier}/incidents/timeline", None))
+            for name in names:
+                if "." in name:
+                    targets.append(("/api/v1/public/status", name))
+        return targets
+
+    def purge(self, keys: Set[str], organization_ids: Set[str]) -> None:
+        parts = urlsplit(self.url)
+        connection = http.client.HTTPConnection(parts.netloc, timeout=self.timeout)
+        try:
+            for path, host in self._targets(keys, organization_ids):
+                for encoding in self.ENCODINGS:
+                    headers = {"X-Cache-Refresh": "1", "Accept-Encoding": encoding}
+                    if host:
+                        headers["Host"] = host
+                    connection.request("GET", path, headers=headers)
+                    connection.getresponse().read()
+        finally:
+            connection.close()
+
+
+def _configured_backend():
+    if settings.CDN_PURGE_BACKEND == "surrogate-key":
+        return SurrogateKeyBackend(settings.CDN_PURGE_URL, settings.CDN_PURGE_TOKEN)
+    if settings.CDN_PURGE_BACKEND == "nginx":
+        return NginxRefreshBackend(settings.CDN_PURGE_URL)
+    return None
+
+
+class PurgeDispatcher:
+    """Sends batched purges for committed invalidations from a background thread."""
+
+    def __init__(self, backend, batch_delay: float):
+        self.backend = backend
+        self.batch_delay = batch_delay
+        self._queue: "queue.Queue[Tuple[Set[str], str]]" = queue.Queue()
+        self._thread = None
+        self._stop = threading.Event()
+        self.queued = 0
+        self.batches = 0
+        self.purged_keys = 0
+        self.failed = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.backend is None or self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="cdn-purge", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self._thread = None
+
+    def on_commit(self, message: InvalidationMessage) -> None:
+        """Invalidation bus subscriber for messages this worker published."""
+        if self.backend is None:
+            return
+        keys = purge_keys(message.entity, message.organization_id)
+        if keys:
+            self.queued += 1
+            self._queue.put((keys, message.organization_id))
+
+    def _drain(self, first: Tuple[Set[str], str]) -> Tuple[Set[str], Set[str]]:
+        keys, organization_ids = set(first[0]), {first[1]}
+        while True:
+            try:
+                more_keys, organization_id = self._queue.get_nowait()
+            except queue.Empty:
+                return keys, organization_ids
+            keys |= more_keys
+            organization_ids.add(organization_id)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                first = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            # Let the rest of a burst of writes arrive so it goes out as one purge
+            self._stop.wait(self.batch_delay)
+            keys, organization_ids = self._drain(first)
+            try:
+                self.backend.purge(keys, organization_ids)
+                self.batches += 1
+                self.purged_keys += len(keys)
+            except Exception:
+                # The edge keeps serving until s-maxage runs out; nothing else to do
+                self.failed += 1
+
+    def stats(self) -> dict:
+        return {
+            "backend": settings.CDN_PURGE_BACKEND or None,
+            "running": self.running,
+            "queued": self.queued,
+            "pending": self._queue.qsize(),
+            "batches": self.batches,
+            "purged_keys": self.purged_keys,
+            "failed": self.failed
+        }
+
+
+purge_dispatcher = PurgeDispatcher(_configured_backend(), settings.CDN_PURGE_BATCH_SECONDS)
@@ -0,0 +1,203 @@
+"""
+Per-organization change feed for delta sync.
+
+Every incident, service, settings or member write calls record_change() in
+its own transaction. That bumps the organization's sequence number and logs
+which entity changed, so both commit (or roll back) with the write itself.
+Clients remember the last sequence they saw and ask only for what changed
+since.
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, joinedload
+
+from app.core.config import settings
+from app.models.change_log import ChangeLogEntry, ChangeSequence
+from app.models.incident import Incident
+from app.models.organization_settings import OrganizationSettings
+from app.models.service import Service
+from app.models.user import User
+
+INCIDENT = "incident"
+SERVICE = "service"
+SETTINGS = "settings"
+MEMBER = "member"
+
+UPSERT = "upsert"
+DELETE = "delete"
+
+# Old entries are pruned from the writing transaction every this many changes
+PRUNE_EVERY = 256
+_recorded = 0
+
+
+def _next_sequence(db: Session, organization_id: str) -> int:
+    """
+    Bump and return the organization's sequence in one statement.
+    The row stays locked until the transaction ends, so sequence numbers
+    commit in order: a client that has seen N never misses a lower number
+    that commits later.
+    """
+    insert = postgresql_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    statement = insert(ChangeSequence).values(organization_id=organization_id, last_sequence=1)
+    statement = statement.on_conflict_do_update(
+        index_elements=[ChangeSequence.organization_id],
+        set_={"last_sequence": ChangeSequence.last_sequence + 1}
+    ).returning(ChangeSequence.last_sequence)
+    return db.execute(statement).scalar_one()
+
+
+def record_change(db: Session, organization_id: str, entity: str, entity_id: str, operation: str = UPSERT) -> int:
+    """
+    Log a change as part of db's current transaction and return its sequence number.
+    New rows must have their ID assigned before this is called.
+    """
+    global _recorded
+    if entity_id is None:
+        raise ValueError(f"record_change: {entity} has no ID yet")
+    sequence = _next_sequence(db, organization_id)
+    db.add(ChangeLogEntry(
+        organization_id=organization_id,
+        sequence=sequence,
+        entity=entity,
+        entity_id=entity_id,
+        operation=operation
+    ))
+    _recorded += 1
+    if _recorded % PRUNE_EVERY == 0:
+        db.query(ChangeLogEntry).filter(
+            ChangeLogEntry.organization_id == organization_id,
+            ChangeLogEntry.created_at < datetime.utcnow() - timedelta(days=settings.CHANGE_FEED_RETENTION_DAYS)
+        ).delete(synchronize_session=False)
+    return sequence
+
+
+def incident_data(incident: Incident) -> dict:
+    return {
+        "id": incident.id,
+        "title": incident.title,
+        "description": incident.description,
+        "status": incident.status.value,
+        "impact": incident.impact.value,
+        "service_id": incident.service_id,
+        "created_by": incident.created_by,
+        "resolved_at": incident.resolved_at,
+        "created_at": incident.created_at,
+        "updated_at": incident.updated_at,
+        "service_name": incident.service.name if incident.service else None,
+        "creator_email": incident.creator.email if incident.creator else None
+    }
+
+
+def service_data(service: Service) -> dict:
+    return {
+        "id": service.id,
+        "name": service.name,
+        "description": service.description,
+        "status": service.status.value,
+        "organization_id": service.organization_id,
+        "uptime_percentage": service.uptime_percentage,
+        "created_at": service.created_at,
+        "updated_at": service.updated_at
+    }
+
+
+def _member_data(member: User) -> dict:
+    return {
+        "id": member.id,
+        "first_name": member.first_name,
+        "last_name": member.last_name,
+        "email": member.email,
+        "role": member.role.value,
+        "status": member.status.value,
+        "created_at": member.created_at.isoformat(),
+        "approved_at": member.approved_at.isoformat() if member.approved_at else None,
+        "approved_by": member.approved_by
+    }
+
+
+def _settings_data(settings_row: OrganizationSettings) -> dict:
+    return {
+        column.name: getattr(settings_row, column.name)
+        for column in OrganizationSettings.__table__.columns
+    }
+
+
+# entity -> (response key, loader of current rows by ID, serializer)
+_ENTITIES = {
+    INCIDENT: ("incidents", lambda db, ids: db.query(Incident).options(
+        joinedload(Incident.service), joinedload(Incident.creator)
+    ).filter(Incident.id.in_(ids)).all(), incident_data),
+    SERVICE: ("services", lambda db, ids: db.query(Service).filter(Service.id.in_(ids)).all(), service_data),
+    SETTINGS: ("settings", lambda db, ids: db.query(OrganizationSettings).filter(
+        OrganizationSettings.id.in_(ids)
+    ).all(), _settings_data),
+    MEMBER: ("members", lambda db, ids: db.query(User).filter(User.id.in_(ids)).all(), _member_data),
+}
+
+
+def get_changes(
+    db: Session,
+    organization_id: str,
+    since: int,
+    limit: int,
+    include_members: bool = True
+) -> dict:
+    """
+    Entities changed after sequence `since`, in their current state.
+    Several changes to one entity collapse into one. "sequence" is what to
+    pass as `since` next time; "reset" means the log no longer reaches back
+    to `since` and the client must refetch everything.
+    """
+    # Read the high-water mark first: entries at or below it have all committed
+    current = db.query(ChangeSequence.last_sequence).filter(
+        ChangeSequence.organization_id == organization_id
+    ).scalar() or 0
+
+    oldest = db.query(func.min(ChangeLogEntry.sequence)).filter(
+        ChangeLogEntry.organization_id == organization_id
+    ).scalar()
+    if since > current or (since < current and (oldest is None or oldest > since + 1)):
+        return {"since": since, "sequence": current, "reset": True, "has_more": False, "changes": {}, "deleted": {}}
+
+    entries = db.query(ChangeLogEntry).filter(
+        ChangeLogEntry.organization_id == organization_id,
+        ChangeLogEntry.sequence > since,
+        ChangeLogEntry.sequence <= current
+    ).order_by(ChangeLogEntry.sequence).limit(limit + 1).all()
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+
+    # Latest operation per entity wins
+    latest: Dict[Tuple[str, str], str] = {}
+    for entry in entries:
+        if entry.entity == MEMBER and not include_members:
+            continue
+        latest[(entry.entity, entry.entity_id)] = entry.operation
+
+    changes: Dict[str, List[dict]] = {}
+    deleted: Dict[str, List[str]] = {}
+    for entity, (key, load, serialize) in _ENTITIES.items():
+        ids = [entity_id for (kind, entity_id), operation in latest.items() if kind == entity and operation == UPSERT]
+        rows = load(db, ids) if ids else []
+        found = {row.id for row in rows}
+        changes[key] = [serialize(row) for row in rows]
+        # Gone since it was logged (deleted by a later change beyond this page)
+        deleted[key] = [
+            entity_id for (kind, entity_id), operation in latest.items()
+            if kind == entity and (operation == DELETE or entity_id not in found)
+        ]
+
+    return {
+        "since": since,
+        "sequence": entries[-1].sequence if has_more else current,
+        "reset": False,
+        "has_more": has_more,
+        "changes": changes,
+        "deleted": deleted
+    }
@@ -0,0 +1,61 @@
+"""
+Everything the admin incident page shows on load, in one pass.
+
+Services are loaded first and everything else reuses them: incidents are
+filtered by the loaded service IDs instead of joining services again, their
+service relationship resolves from the session's identity map, and the
+active-incident statistics are counted from the rows already fetched.
+"""
+
+from collections import Counter
+from typing import Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session, joinedload
+
+from app.models.incident import Incident, IncidentImpact, IncidentStatus
+from app.models.service import Service
+from app.models.user import User, UserStatus
+from app.services.change_feed import incident_data, service_data
+
+
+def get_organization_dashboard(db: Session, organization_id: str, include_members: bool = True) -> dict:
+    """Active incidents, services, incident statistics and (for admins) pending members."""
+    services = db.query(Service).filter(Service.organization_id == organization_id).all()
+    service_ids = [service.id for service in services]
+
+    active_incidents, total_incidents = [], 0
+    if service_ids:
+        active_incidents = db.query(Incident).options(joinedload(Incident.creator)).filter(
+            Incident.service_id.in_(service_ids),
+            Incident.status != IncidentStatus.RESOLVED
+        ).order_by(Incident.created_at.desc()).all()
+        total_incidents = db.query(func.count(Incident.id)).filter(
+            Incident.service_id.in_(service_ids)
+        ).scalar()
+
+    active_by_impact = Counter(incident.impact.value for incident in active_incidents)
+    active_by_service = Counter(incident.service_id for incident in active_incidents)
+
+    pending_members: Optional[int] = None
+    if include_members:
+        pending_members = db.query(func.count(User.id)).filter(
+            User.organization_id == organization_id,
+            User.status == UserStatus.PENDING
+        ).scalar()
+
+    return {
+        "active_incidents": [incident_data(incident) for incident in active_incidents],
+        "services": [
+            {**service_data(service), "active_incidents": active_by_service[service.id]}
+            for service in services
+        ],
+        "incident_stats": {
+            "total_incidents": total_incidents,
+            "active_incidents": len(active_incidents),
+            "resolved_incidents": total_incidents - len(active_incidents),
+            "critical_active": active_by_impact[IncidentImpact.CRITICAL.value],
+            "active_by_impact": {impact.value: active_by_impact[impact.value] for impact in IncidentImpact}
+        },
+        "pending_members": pending_members
+    }
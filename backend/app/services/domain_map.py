@@ -0,0 +1,128 @@
+"""
+In-memory map from public hostnames to organizations.
+
+Every subdomain and custom domain is loaded once at startup and kept current
+by the invalidation bus, so a status page requested on a vanity domain (or by
+subdomain in the URL) is resolved without a lookup query.
+"""
+
+import threading
+from typing import Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.core.invalidation import InvalidationMessage
+from app.db.session.database import SessionLocal
+from app.services.organization_settings import get_public_domains
+
+DOMAIN_ENTITIES = {"organization_settings", "organization"}
+
+
+def normalize_host(host: str) -> str:
+    """Lower-case a Host header value and strip its port and trailing dot."""
+    host = host.strip().lower()
+    if host.startswith("["):
+        # IPv6 literal; never a vanity domain
+        return host
+    return host.rsplit(":", 1)[0].rstrip(".")
+
+
+class DomainMap:
+    """Subdomain and custom domain -> organization ID, refreshed per organization on change."""
+
+    def __init__(self, base_domain: str):
+        self.base_domain = normalize_host(base_domain) if base_domain else ""
+        self._domains: Dict[str, str] = {}
+        self._by_organization: Dict[str, Tuple[str, ...]] = {}
+        self._lock = threading.Lock()
+        self.loaded = False
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+
+    def load(self) -> None:
+        """Replace the whole map from the database."""
+        db = SessionLocal()
+        try:
+            rows = get_public_domains(db)
+        finally:
+            db.close()
+        domains, by_organization = {}, {}
+        for organization_id, subdomain, custom_domain in rows:
+            names = self._names(subdomain, custom_domain)
+            by_organization[organization_id] = names
+            for name in names:
+                domains[name] = organization_id
+        with self._lock:
+            self._domains, self._by_organization = domains, by_organization
+            self.loaded = True
+
+    def refresh(self, organization_id: str) -> None:
+        """Reload one organization's names."""
+        db = SessionLocal()
+        try:
+            rows = get_public_domains(db, organization_id)
+        finally:
+            db.close()
+        names = self._names(*rows[0][1:]) if rows else ()
+        with self._lock:
+            # Copy on write: readers use whichever dict is current without locking
+            domains = {
+                name: owner for name, owner in self._domains.items()
+                if owner != organization_id
+            }
+            for name in names:
+                domains[name] = organization_id
+            self._domains = domains
+            if names:
+                self._by_organization[organization_id] = names
+            else:
+                self._by_organization.pop(organization_id, None)
+            self.refreshes += 1
+
+    def on_invalidation(self, message: InvalidationMessage) -> None:
+        """Invalidation bus subscriber: pick up changed subdomains and custom domains."""
+        if message.entity not in DOMAIN_ENTITIES:
+            return
+        try:
+            self.refresh(message.organization_id)
+        except Exception:
+            # Keep serving the old names; the next change or restart reloads them
+            self.refresh_errors += 1
+
+    def _names(self, subdomain: Optional[str], custom_domain: Optional[str]) -> Tuple[str, ...]:
+        names = []
+        for name in (subdomain, custom_domain):
+            if name:
+                names.append(normalize_host(name))
+        if subdomain and self.base_domain and "." not in subdomain:
+            names.append(f"{normalize_host(subdomain)}.{self.base_domain}")
+        return tuple(names)
+
+    def resolve(self, identifier: str) -> Optional[str]:
+        """Organization ID for a subdomain, custom domain or vanity hostname, if known."""
+        organization_id = self._domains.get(normalize_host(identifier))
+        if organization_id is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return organization_id
+
+    def names_for(self, organization_id: str) -> Tuple[str, ...]:
+        """Every subdomain, custom domain and vanity hostname of an organization."""
+        return self._by_organization.get(organization_id, ())
+
+    def stats(self) -> dict:
+        return {
+            "loaded": self.loaded,
+            "base_domain": self.base_domain,
+            "domains": len(self._domains),
+            "organizations": len(self._by_organization),
+            "hits": self.hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "refresh_errors": self.refresh_errors
+        }
+
+
+domain_map = DomainMap(settings.STATUS_PAGE_BASE_DOMAIN)
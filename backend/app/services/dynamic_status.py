@@ -1,8 +1,11 @@
 from sqlalchemy.orm import Session
 from app.models.service import Service, ServiceStatus
 from app.models.incident import Incident, IncidentStatus, IncidentImpact
-from typing import Optional
+from typing import Dict, Iterable, List, Optional, Set
+from collections import defaultdict
 from datetime import datetime
+from app.core.invalidation import publish_invalidation
+from app.services.change_feed import record_change
 
 def calculate_service_status_from_incidents(db: Session, service_id: str) -> ServiceStatus:
     """
@@ -15,13 +18,15 @@ def calculate_service_status_from_incidents(db: Session, service_id: str) -> Ser
         Incident.status != IncidentStatus.RESOLVED
     ).all()
     
-    if not active_incidents:
+    return _status_for_impacts(incident.impact for incident in active_incidents)
+
+def _status_for_impacts(impacts: Iterable[IncidentImpact]) -> ServiceStatus:
+    """Service status implied by the impacts of its active incidents."""
+    impact_levels = set(impacts)
+    if not impact_levels:
         # No active incidents - service should be operational
         return ServiceStatus.OPERATIONAL
     
-    # Determine the most severe impact level from active incidents
-    impact_levels = [incident.impact for incident in active_incidents]
-    
     # Map incident impact to service status
     if IncidentImpact.CRITICAL in impact_levels:
         return ServiceStatus.MAJOR_OUTAGE
@@ -48,6 +53,8 @@ def update_service_status_from_incidents(db: Session, service_id: str) -> Option
     if service.status != new_status:
         service.status = new_status
         service.updated_at = datetime.utcnow()
+        publish_invalidation(db, "service", service.organization_id)
+        record_change(db, service.organization_id, "service", service.id)
         db.commit()
         db.refresh(service)
     
@@ -57,16 +64,31 @@ def update_all_services_status_for_organization(db: Session, organization_id: st
     """
     Update all services' status for an organization based on their incidents.
     Returns the number of services updated.
+    Two queries however many services there are, plus the writes for those that changed.
     """
     services = db.query(Service).filter(Service.organization_id == organization_id).all()
-    updated_count = 0
+    if not services:
+        return 0
+    
+    active_impacts: Dict[str, Set[IncidentImpact]] = defaultdict(set)
+    for service_id, impact in db.query(Incident.service_id, Incident.impact).filter(
+        Incident.service_id.in_([service.id for service in services]),
+        Incident.status != IncidentStatus.RESOLVED
+    ):
+        active_impacts[service_id].add(impact)
     
+    updated_count = 0
     for service in services:
-        old_status = service.status
-        updated_service = update_service_status_from_incidents(db, service.id)
-        if updated_service and updated_service.status != old_status:
+        new_status = _status_for_impacts(active_impacts[service.id])
+        if service.status != new_status:
+            service.status = new_status
+            service.updated_at = datetime.utcnow()
+            record_change(db, organization_id, "service", service.id)
             updated_count += 1
     
+    if updated_count:
+        publish_invalidation(db, "service", organization_id)
+        db.commit()
     return updated_count
 
 def get_organization_overall_status(db: Session, organization_id: str) -> str:
@@ -75,13 +97,13 @@ def get_organization_overall_status(db: Session, organization_id: str) -> str:
     This provides a quick summary status for the organization.
     """
     services = db.query(Service).filter(Service.organization_id == organization_id).all()
-    
-    if not services:
+    return summarize_service_statuses([service.status for service in services])
+
+def summarize_service_statuses(service_statuses: List[ServiceStatus]) -> str:
+    """Overall status for a set of service statuses: the most severe one wins."""
+    if not service_statuses:
         return "operational"
     
-    # Check for the most severe status across all services
-    service_statuses = [service.status for service in services]
-    
     if ServiceStatus.MAJOR_OUTAGE in service_statuses:
         return "major_outage"
     elif ServiceStatus.PARTIAL_OUTAGE in service_statuses:
@@ -0,0 +1,52 @@
+"""
+Incident exports for SLA reporting.
+
+Rows come from iter_organization_incidents, so an export reads through a
+server-side cursor a batch at a time and its memory stays flat however many
+incidents the organization has.
+"""
+
+from datetime import datetime
+from typing import Iterator, Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.incident import Incident
+from app.services.incident_management import iter_organization_incidents
+
+EXPORT_FIELDS = (
+    "id", "service_id", "service_name", "title", "description", "status", "impact",
+    "created_by", "creator_email", "created_at", "updated_at", "resolved_at", "resolution_seconds"
+)
+
+
+def export_row(incident: Incident) -> dict:
+    return {
+        "id": incident.id,
+        "service_id": incident.service_id,
+        "service_name": incident.service.name,
+        "title": incident.title,
+        "description": incident.description,
+        "status": incident.status.value,
+        "impact": incident.impact.value,
+        "created_by": incident.created_by,
+        "creator_email": incident.creator.email if incident.creator else None,
+        "created_at": incident.created_at,
+        "updated_at": incident.updated_at,
+        "resolved_at": incident.resolved_at,
+        # Time to resolve; None while the incident is open
+        "resolution_seconds": int((incident.resolved_at - incident.created_at).total_seconds())
+        if incident.resolved_at else None
+    }
+
+
+def iter_incident_export(
+    organization_id: str,
+    service_id: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    db: Optional[Session] = None
+) -> Iterator[dict]:
+    """Export rows for an organization's incidents created in [start, end), newest first."""
+    for incident in iter_organization_incidents(organization_id, service_id=service_id, start=start, end=end, db=db):
+        yield export_row(incident)
@@ -1,11 +1,15 @@
-from sqlalchemy.orm import Session
+import uuid
+from sqlalchemy.orm import Session, contains_eager, joinedload
 from app.models.incident import Incident, IncidentStatus, IncidentImpact
 from app.models.service import Service
 from app.models.user import User
 from app.schemas.incident import IncidentCreate, IncidentUpdate, IncidentStatusUpdate
 from app.services.dynamic_status import update_service_status_from_incidents
-from typing import List, Optional
+from typing import Iterator, List, Optional
 from datetime import datetime
+from app.core.invalidation import publish_invalidation
+from app.db.session.database import SessionLocal
+from app.services.change_feed import DELETE, record_change
 
 def get_incidents_by_organization(db: Session, organization_id: str) -> List[Incident]:
     """Get all incidents for an organization."""
@@ -20,6 +24,44 @@ def get_incidents_by_service(db: Session, service_id: str, organization_id: str)
         Service.organization_id == organization_id
     ).order_by(Incident.created_at.desc()).all()
 
+def iter_organization_incidents(
+    organization_id: str,
+    service_id: Optional[str] = None,
+    active_only: bool = False,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    batch_size: int = 500,
+    db: Optional[Session] = None
+) -> Iterator[Incident]:
+    """
+    Stream an organization's incidents, newest first, with service and creator loaded.
+    Rows are fetched batch_size at a time (a server-side cursor on Postgres).
+    The generator owns its session, so a streaming response can consume it
+    after the request's own session has been closed. A batch passes its
+    shared session instead, so reads see the batch's uncommitted writes;
+    that one is left open.
+    """
+    owned = db is None
+    if owned:
+        db = SessionLocal()
+    try:
+        query = db.query(Incident).join(Incident.service).options(
+            contains_eager(Incident.service),
+            joinedload(Incident.creator)
+        ).filter(Service.organization_id == organization_id)
+        if service_id:
+            query = query.filter(Incident.service_id == service_id)
+        if active_only:
+            query = query.filter(Incident.status != IncidentStatus.RESOLVED)
+        if start:
+            query = query.filter(Incident.created_at >= start)
+        if end:
+            query = query.filter(Incident.created_at < end)
+        yield from query.order_by(Incident.created_at.desc()).yield_per(batch_size)
+    finally:
+        if owned:
+            db.close()
+
 def get_incident_by_id(db: Session, incident_id: str, organization_id: str) -> Optional[Incident]:
     """Get a specific incident by ID within an organization."""
     return db.query(Incident).join(Service).filter(
@@ -39,15 +81,19 @@ def create_incident(db: Session, incident_data: IncidentCreate, user_id: str, or
         return None
     
     incident = Incident(
+        id=str(uuid.uuid4()),
         title=incident_data.title,
         description=incident_data.description,
         impact=IncidentImpact(incident_data.impact),
         service_id=incident_data.service_id,
+        organization_id=service.organization_id,
         created_by=user_id,
         status=IncidentStatus.INVESTIGATING
     )
     
     db.add(incident)
+    publish_invalidation(db, "incident", organization_id)
+    record_change(db, organization_id, "incident", incident.id)
     db.commit()
     db.refresh(incident)
     
@@ -87,6 +133,8 @@ def update_incident(db: Session, incident_id: str, incident_data: IncidentUpdate
             elif incident.resolved_at:
                 incident.resolved_at = None
         
+        publish_invalidation(db, "incident", organization_id)
+        record_change(db, organization_id, "incident", incident.id)
         db.commit()
         db.refresh(incident)
         
@@ -119,6 +167,8 @@ def update_incident_status(db: Session, incident_id: str, status_data: IncidentS
         update_text = f"\n\n**Update ({current_time}):** {status_data.update_message}"
         incident.description += update_text
     
+    publish_invalidation(db, "incident", organization_id)
+    record_change(db, organization_id, "incident", incident.id)
     db.commit()
     db.refresh(incident)
     
@@ -135,6 +185,8 @@ def delete_incident(db: Session, incident_id: str, organization_id: str) -> bool
     
     service_id = incident.service_id
     db.delete(incident)
+    publish_invalidation(db, "incident", organization_id)
+    record_change(db, organization_id, "incident", incident_id, DELETE)
     db.commit()
     
     # Update service status after incident deletion
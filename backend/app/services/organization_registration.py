@@ -5,6 +5,7 @@ from app.models.organization_settings import OrganizationSettings
 from app.schemas.organization_registration import OrganizationRegistration, SubscriptionCodeValidation
 from app.core.auth import get_password_hash
 import uuid
+from app.core.invalidation import publish_invalidation
 
 def validate_subscription_code(subscription_code: str) -> dict:
     """
@@ -104,6 +105,8 @@ def register_organization(db: Session, registration_data: OrganizationRegistrati
     )
     db.add(admin_user)
     
+    publish_invalidation(db, "organization", organization.id)
+    
     # Commit all changes
     db.commit()
     db.refresh(organization)
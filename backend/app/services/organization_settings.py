@@ -5,6 +5,9 @@ from app.models.service import Service
 from app.models.incident import Incident
 from app.schemas.organization_settings import OrganizationSettingsCreate, OrganizationSettingsUpdate
 import uuid
+from app.core.invalidation import publish_invalidation
+from app.services.branding import branding_css_url
+from app.services.change_feed import record_change
 
 def get_organization_settings(db: Session, organization_id: str) -> OrganizationSettings:
     """Get organization settings by organization ID."""
@@ -24,6 +27,8 @@ def create_organization_settings(
         **settings.dict(exclude_unset=True)
     )
     db.add(db_settings)
+    publish_invalidation(db, "organization_settings", organization_id)
+    record_change(db, organization_id, "settings", db_settings.id)
     db.commit()
     db.refresh(db_settings)
     return db_settings
@@ -42,10 +47,34 @@ def update_organization_settings(
     for field, value in update_data.items():
         setattr(db_settings, field, value)
     
+    publish_invalidation(db, "organization_settings", organization_id)
+    record_change(db, organization_id, "settings", db_settings.id)
     db.commit()
     db.refresh(db_settings)
     return db_settings
 
+def resolve_public_organization_id(db: Session, identifier: str):
+    """Get the organization ID behind a subdomain or custom domain."""
+    row = db.query(OrganizationSettings.organization_id).filter(
+        (OrganizationSettings.subdomain == identifier) |
+        (OrganizationSettings.custom_domain == identifier)
+    ).first()
+    return row[0] if row else None
+
+def get_public_domains(db: Session, organization_id: str = None):
+    """(organization_id, subdomain, custom_domain) for organizations with a public name."""
+    query = db.query(
+        OrganizationSettings.organization_id,
+        OrganizationSettings.subdomain,
+        OrganizationSettings.custom_domain
+    )
+    if organization_id is not None:
+        query = query.filter(OrganizationSettings.organization_id == organization_id)
+    return query.filter(
+        (OrganizationSettings.subdomain.isnot(None)) |
+        (OrganizationSettings.custom_domain.isnot(None))
+    ).all()
+
 def get_public_status_page(db: Session, identifier: str, by_org_id: bool = False):
     """Get public status page data by subdomain, custom domain, or organization ID."""
     
@@ -99,7 +128,7 @@ def get_public_status_page(db: Session, identifier: str, by_org_id: bool = False
         {
             "id": incident.id,
             "title": incident.title,
-            "message": incident.message,
+            "message": incident.description,
             "status": incident.status,
             "service_id": incident.service_id,
             "created_at": incident.created_at.isoformat(),
@@ -114,7 +143,8 @@ def get_public_status_page(db: Session, identifier: str, by_org_id: bool = False
         "logo_url": settings.logo_url,
         "primary_color": settings.primary_color,
         "background_color": settings.background_color,
-        "custom_css": settings.custom_css,
+        # Served separately as a long-cacheable asset
+        "custom_css_url": branding_css_url(settings.organization_id, settings.custom_css),
         "show_incident_history": settings.show_incident_history,
         "show_uptime_stats": settings.show_uptime_stats,
         "maintenance_mode": settings.maintenance_mode,
@@ -123,5 +153,6 @@ def get_public_status_page(db: Session, identifier: str, by_org_id: bool = False
         "support_url": settings.support_url,
         "services": services_data,
         "incidents": incidents_data,
+        "organization_id": organization.id,
         "organization_name": organization.name
     }
@@ -1,122 +1,230 @@
-from sqlalchemy.orm import Session
+import base64
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Session, load_only
+import orjson
+from app.core.config import settings
 from app.models.organization import Organization, OrganizationStatus
 from app.models.service import Service, ServiceStatus
 from app.models.incident import Incident, IncidentImpact
-from app.services.dynamic_status import get_organization_overall_status
-from typing import List, Optional, Dict, Any
-from datetime import datetime, timedelta
+from app.services.dynamic_status import summarize_service_statuses
+from typing import List, Optional, Dict, Any, Tuple
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
 
-def get_organization_status_page(db: Session, org_identifier: str) -> Optional[dict]:
+# Sections and fields clients can select with include= / fields[...]=
+STATUS_SECTIONS = ("overall_status", "services", "incidents")
+SERVICE_FIELDS = ("id", "name", "description", "status", "uptime_percentage")
+INCIDENT_FIELDS = ("id", "title", "description", "status", "impact", "created_at", "updated_at", "resolved_at")
+TIMELINE_SECTIONS = ("incidents", "summary", "legend")
+TIMELINE_SERVICE_FIELDS = ("id", "name", "description", "current_status")
+TIMELINE_INCIDENT_FIELDS = (
+    "id", "title", "description", "impact", "status", "color",
+    "start_time", "end_time", "duration_hours", "is_ongoing"
+)
+MAX_TIMELINE_DAYS = 365
+IMPACTS = tuple(impact.value for impact in IncidentImpact)
+
+# Rows fetched per round trip when streaming large result sets
+STREAM_BATCH_SIZE = 500
+
+def parse_selection(value: Optional[str], allowed: Tuple[str, ...]) -> Optional[Tuple[str, ...]]:
     """
-    Get public status page data for an organization.
-    org_identifier can be either organization ID or name.
+    Parse a comma-separated include/fields parameter.
+    Returns the selected names in `allowed` order (so equivalent requests
+    compare equal), or None if the parameter wasn't given.
     """
+    if value is None:
+        return None
+    requested = {part.strip() for part in value.split(",") if part.strip()}
+    unknown = requested - set(allowed)
+    if unknown:
+        raise ValueError(f"Unknown value(s) {', '.join(sorted(unknown))}; allowed: {', '.join(allowed)}")
+    return tuple(name for name in allowed if name in requested)
+
+def _find_organization(db: Session, org_identifier: str) -> Optional[Organization]:
     # Try to find organization by ID first, then by name
-    organization = db.query(Organization).filter(
+    return db.query(Organization).filter(
         (Organization.id == org_identifier) | 
         (Organization.name == org_identifier)
     ).first()
+
+def get_organization_status_page(
+    db: Session,
+    org_identifier: str,
+    sections: Tuple[str, ...] = STATUS_SECTIONS,
+    service_fields: Tuple[str, ...] = SERVICE_FIELDS,
+    incident_fields: Tuple[str, ...] = INCIDENT_FIELDS
+) -> Optional[dict]:
+    """
+    Get public status page data for an organization.
+    org_identifier can be either organization ID or name.
+    Only the selected sections and fields are queried: unselected columns
+    aren't loaded, and the incidents query is skipped unless incidents are
+    selected.
+    """
+    organization = _find_organization(db, org_identifier)
     
     if not organization:
         return None
     
-    # Get all services for this organization
-    services = db.query(Service).filter(Service.organization_id == organization.id).all()
+    data = {"organization": _organization_data(organization)}
     
-    # Get recent incidents (last 30 days) through services
-    thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-    recent_incidents = db.query(Incident).join(Service).filter(
-        Service.organization_id == organization.id,
-        Incident.created_at >= thirty_days_ago
-    ).order_by(Incident.created_at.desc()).all()
+    if "services" in sections:
+        # Status is always needed for the overall status
+        columns = set(service_fields) | ({"status"} if "overall_status" in sections else set())
+        services = db.query(Service).options(
+            load_only(Service.id, *[getattr(Service, column) for column in columns])
+        ).filter(Service.organization_id == organization.id).all()
+        service_statuses = [service.status for service in services] if "overall_status" in sections else []
+    elif "overall_status" in sections:
+        service_statuses = [
+            row[0] for row in db.query(Service.status).filter(Service.organization_id == organization.id)
+        ]
     
-    # Calculate overall status using dynamic status service
-    overall_status = get_organization_overall_status(db, organization.id)
+    if "overall_status" in sections:
+        data["overall_status"] = summarize_service_statuses(service_statuses)
     
-    # Format services data
-    services_data = []
-    for service in services:
-        services_data.append({
-            "id": service.id,
-            "name": service.name,
-            "description": service.description or "",
-            "status": service.status.value if hasattr(service.status, 'value') else service.status,
-            "uptime_percentage": service.uptime_percentage or 99.9
-        })
+    if "services" in sections:
+        data["services"] = [_service_data(service, service_fields) for service in services]
     
-    # Format incidents data
-    incidents_data = []
-    for incident in recent_incidents:
-        incidents_data.append({
-            "id": incident.id,
-            "title": incident.title,
-            "description": incident.description,
-            "status": incident.status.value,
-            "impact": incident.impact.value,
-            "created_at": incident.created_at.isoformat(),
-            "updated_at": incident.updated_at.isoformat(),
-            "resolved_at": incident.resolved_at.isoformat() if incident.resolved_at else None
-        })
+    if "incidents" in sections:
+        # Get recent incidents (last 30 days) through services
+        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
+        recent_incidents = db.query(Incident).options(
+            load_only(Incident.id, *[getattr(Incident, column) for column in incident_fields])
+        ).join(Service).filter(
+            Service.organization_id == organization.id,
+            Incident.created_at >= thirty_days_ago
+        ).order_by(Incident.created_at.desc()).all()
+        data["incidents"] = [_incident_data(incident, incident_fields) for incident in recent_incidents]
     
+    data["last_updated"] = datetime.utcnow().isoformat()
+    return data
+
+def _organization_data(organization: Organization) -> dict:
     return {
-        "organization": {
-            "id": organization.id,
-            "name": organization.name,
-            "description": organization.description,
-            "website": organization.website
-        },
-        "overall_status": overall_status,
-        "services": services_data,
-        "incidents": incidents_data,
-        "last_updated": datetime.utcnow().isoformat()
+        "id": organization.id,
+        "name": organization.name,
+        "description": organization.description,
+        "website": organization.website
     }
 
-def get_all_organizations_list(db: Session) -> List[dict]:
-    """Get a list of all organizations with basic info for directory."""
+# Only the selected attributes are read, so deferred columns are never lazy-loaded
+_SERVICE_VALUES = {
+    "id": lambda service: service.id,
+    "name": lambda service: service.name,
+    "description": lambda service: service.description or "",
+    "status": lambda service: service.status.value if hasattr(service.status, 'value') else service.status,
+    "uptime_percentage": lambda service: service.uptime_percentage or 99.9
+}
+
+_INCIDENT_VALUES = {
+    "id": lambda incident: incident.id,
+    "title": lambda incident: incident.title,
+    "description": lambda incident: incident.description,
+    "status": lambda incident: incident.status.value,
+    "impact": lambda incident: incident.impact.value,
+    "created_at": lambda incident: incident.created_at.isoformat(),
+    "updated_at": lambda incident: incident.updated_at.isoformat(),
+    "resolved_at": lambda incident: incident.resolved_at.isoformat() if incident.resolved_at else None
+}
+
+def _service_data(service: Service, fields: Tuple[str, ...] = SERVICE_FIELDS) -> dict:
+    return {field: _SERVICE_VALUES[field](service) for field in fields}
+
+def _incident_data(incident: Incident, fields: Tuple[str, ...] = INCIDENT_FIELDS) -> dict:
+    return {field: _INCIDENT_VALUES[field](incident) for field in fields}
+
+def get_services_status_batch(db: Session, org_identifiers: List[str]) -> Dict[str, dict]:
+    """
+    Services-only status views for many organizations at once, keyed by the
+    identifier (ID or name) that matched. Two queries regardless of how many
+    organizations are asked for; identifiers that match nothing are left out.
+    """
     organizations = db.query(Organization).filter(
-        Organization.status.in_([OrganizationStatus.ACTIVE, OrganizationStatus.TRIAL])
+        Organization.id.in_(org_identifiers) |
+        Organization.name.in_(org_identifiers)
     ).all()
+    if not organizations:
+        return {}
+    
+    services_by_org: Dict[str, List[Service]] = {organization.id: [] for organization in organizations}
+    for service in db.query(Service).filter(Service.organization_id.in_(list(services_by_org))).all():
+        services_by_org[service.organization_id].append(service)
     
+    last_updated = datetime.utcnow().isoformat()
+    by_id = {organization.id: organization for organization in organizations}
+    # Names aren't unique; like the single-org lookup, take the first match
+    by_name: Dict[str, Organization] = {}
+    for organization in organizations:
+        by_name.setdefault(organization.name, organization)
+    
+    views = {}
+    for identifier in org_identifiers:
+        organization = by_id.get(identifier) or by_name.get(identifier)
+        if organization is None:
+            continue
+        services = services_by_org[organization.id]
+        views[identifier] = {
+            "organization": _organization_data(organization),
+            "overall_status": summarize_service_statuses([service.status for service in services]),
+            "services": [_service_data(service) for service in services],
+            "last_updated": last_updated
+        }
+    return views
+
+def get_all_organizations_list(db: Session) -> List[dict]:
+    """Get a list of all organizations with basic info for directory."""
+    listed = [OrganizationStatus.ACTIVE, OrganizationStatus.TRIAL]
+
+    # Every listed organization's service statuses in one streamed query
+    statuses = defaultdict(list)
+    for organization_id, service_status in db.query(Service.organization_id, Service.status).join(
+        Organization, Service.organization_id == Organization.id
+    ).filter(Organization.status.in_(listed)).yield_per(STREAM_BATCH_SIZE):
+        statuses[organization_id].append(service_status)
+
+    organizations = db.query(Organization).options(
+        load_only(Organization.id, Organization.name, Organization.description, Organization.website)
+    ).filter(Organization.status.in_(listed)).yield_per(STREAM_BATCH_SIZE)
+
     org_list = []
     for org in organizations:
-        # Get service count and overall status using dynamic status service
-        services = db.query(Service).filter(Service.organization_id == org.id).all()
-        overall_status = get_organization_overall_status(db, org.id)
-        
         org_list.append({
             "id": org.id,
             "name": org.name,
             "description": org.description,
             "website": org.website,
-            "status": overall_status,
-            "service_count": len(services)
+            "status": summarize_service_statuses(statuses[org.id]),
+            "service_count": len(statuses[org.id])
         })
     
     return org_list
 
-def get_organization_incident_timeline(db: Session, org_identifier: str, days: int = 30) -> Optional[Dict[str, Any]]:
+def get_organization_incident_timeline(
+    db: Session,
+    org_identifier: str,
+    days: int = 30,
+    sections: Tuple[str, ...] = TIMELINE_SECTIONS,
+    service_fields: Tuple[str, ...] = TIMELINE_SERVICE_FIELDS,
+    incident_fields: Tuple[str, ...] = TIMELINE_INCIDENT_FIELDS
+) -> Optional[Dict[str, Any]]:
     """
     Get incident timeline data for visualization/graphing.
     Returns data structure optimized for timeline charts with color coding.
+    Only the selected sections and fields are queried; without incidents or
+    summary the incidents query is skipped.
     """
-    # Try to find organization by ID first, then by name
-    organization = db.query(Organization).filter(
-        (Organization.id == org_identifier) | 
-        (Organization.name == org_identifier)
-    ).first()
+    organization = _find_organization(db, org_identifier)
     
     if not organization:
         return None
     
     # Get all services for this organization
-    services = db.query(Service).filter(Service.organization_id == organization.id).all()
-    
-    # Get incidents for the specified time period
-    start_date = datetime.utcnow() - timedelta(days=days)
-    incidents = db.query(Incident).join(Service).filter(
-        Service.organization_id == organization.id,
-        Incident.created_at >= start_date
-    ).order_by(Incident.created_at.asc()).all()
+    service_columns = {"current_status": "status"}
+    services = db.query(Service).options(
+        load_only(Service.id, *[getattr(Service, service_columns.get(field, field)) for field in service_fields])
+    ).filter(Service.organization_id == organization.id).all()
     
     # Define impact color mapping for visualization
     impact_colors = {
@@ -126,58 +234,68 @@ def get_organization_incident_timeline(db: Session, org_identifier: str, days: i
         IncidentImpact.LOW: "#16a34a"          # Green
     }
     
+    # Stream incidents for the specified time period into per-service blocks
+    # and summary counters, so rows are never all held at once
+    start_date = datetime.utcnow() - timedelta(days=days)
+    blocks_by_service = defaultdict(list)
+    impact_counts = defaultdict(int)
+    total_incidents = ongoing_incidents = resolved_count = 0
+    total_resolution_time = 0
+    if "incidents" in sections or "summary" in sections:
+        # Timing and impact drive the blocks and the summary; text is loaded only if selected
+        columns = [Incident.service_id, Incident.impact, Incident.created_at, Incident.resolved_at]
+        if "incidents" in sections:
+            columns += [getattr(Incident, field) for field in ("title", "description", "status") if field in incident_fields]
+        incidents = db.query(Incident).options(load_only(Incident.id, *columns)).join(Service).filter(
+            Service.organization_id == organization.id,
+            Incident.created_at >= start_date
+        ).order_by(Incident.created_at.asc()).yield_per(STREAM_BATCH_SIZE)
+
+        for incident in incidents:
+            total_incidents += 1
+            impact_counts[incident.impact] += 1
+            if incident.resolved_at is None:
+                ongoing_incidents += 1
+            else:
+                resolved_count += 1
+                total_resolution_time += (incident.resolved_at - incident.created_at).total_seconds() / 3600
+
+            if "incidents" in sections:
+                end_time = incident.resolved_at or datetime.utcnow()
+                duration_hours = (end_time - incident.created_at).total_seconds() / 3600
+                
+                block = {
+                    "id": incident.id,
+                    "title": incident.title if "title" in incident_fields else None,
+                    "description": incident.description if "description" in incident_fields else None,
+                    "impact": incident.impact.value,
+                    "status": incident.status.value if "status" in incident_fields else None,
+                    "color": impact_colors.get(incident.impact, "#6b7280"),  # Default gray
+                    "start_time": incident.created_at.isoformat(),
+                    "end_time": end_time.isoformat(),
+                    "duration_hours": round(duration_hours, 2),
+                    "is_ongoing": incident.resolved_at is None
+                }
+                blocks_by_service[incident.service_id].append({field: block[field] for field in incident_fields})
+    
     # Create service timeline data
     services_timeline = []
     for service in services:
-        service_incidents = [inc for inc in incidents if inc.service_id == service.id]
-        
-        # Create incident blocks for this service
-        incident_blocks = []
-        for incident in service_incidents:
-            end_time = incident.resolved_at or datetime.utcnow()
-            duration_hours = (end_time - incident.created_at).total_seconds() / 3600
-            
-            incident_blocks.append({
-                "id": incident.id,
-                "title": incident.title,
-                "description": incident.description,
-                "impact": incident.impact.value,
-                "status": incident.status.value,
-                "color": impact_colors.get(incident.impact, "#6b7280"),  # Default gray
-                "start_time": incident.created_at.isoformat(),
-                "end_time": end_time.isoformat(),
-                "duration_hours": round(duration_hours, 2),
-                "is_ongoing": incident.resolved_at is None
-            })
+        service_data = {
+            field: (
+                service.status.value if hasattr(service.status, 'value') else service.status
+            ) if field == "current_status" else getattr(service, field)
+            for field in service_fields
+        }
+        entry = {"service": service_data}
         
-        services_timeline.append({
-            "service": {
-                "id": service.id,
-                "name": service.name,
-                "description": service.description,
-                "current_status": service.status.value if hasattr(service.status, 'value') else service.status
-            },
-            "incidents": incident_blocks,
-            "incident_count": len(incident_blocks)
-        })
-    
-    # Calculate summary statistics
-    total_incidents = len(incidents)
-    critical_incidents = sum(1 for inc in incidents if inc.impact == IncidentImpact.CRITICAL)
-    high_incidents = sum(1 for inc in incidents if inc.impact == IncidentImpact.HIGH)
-    ongoing_incidents = sum(1 for inc in incidents if inc.resolved_at is None)
-    
-    # Calculate average resolution time for resolved incidents
-    resolved_incidents = [inc for inc in incidents if inc.resolved_at is not None]
-    avg_resolution_hours = 0
-    if resolved_incidents:
-        total_resolution_time = sum(
-            (inc.resolved_at - inc.created_at).total_seconds() / 3600 
-            for inc in resolved_incidents
-        )
-        avg_resolution_hours = round(total_resolution_time / len(resolved_incidents), 2)
+        if "incidents" in sections:
+            incident_blocks = blocks_by_service.get(service.id, [])
+            entry["incidents"] = incident_blocks
+            entry["incident_count"] = len(incident_blocks)
+        services_timeline.append(entry)
     
-    return {
+    data = {
         "organization": {
             "id": organization.id,
             "name": organization.name
@@ -187,19 +305,125 @@ def get_organization_incident_timeline(db: Session, org_identifier: str, days: i
             "end_date": datetime.utcnow().isoformat(),
             "days": days
         },
-        "services": services_timeline,
-        "summary": {
+        "services": services_timeline
+    }
+    
+    if "summary" in sections:
+        # Average resolution time for resolved incidents
+        avg_resolution_hours = 0
+        if resolved_count:
+            avg_resolution_hours = round(total_resolution_time / resolved_count, 2)
+        
+        data["summary"] = {
             "total_incidents": total_incidents,
-            "critical_incidents": critical_incidents,
-            "high_incidents": high_incidents,
+            "critical_incidents": impact_counts[IncidentImpact.CRITICAL],
+            "high_incidents": impact_counts[IncidentImpact.HIGH],
             "ongoing_incidents": ongoing_incidents,
             "average_resolution_hours": avg_resolution_hours
-        },
-        "impact_legend": {
+        }
+    
+    if "legend" in sections:
+        data["impact_legend"] = {
             "critical": {"color": impact_colors[IncidentImpact.CRITICAL], "label": "Critical"},
             "high": {"color": impact_colors[IncidentImpact.HIGH], "label": "High"},
             "medium": {"color": impact_colors[IncidentImpact.MEDIUM], "label": "Medium"},
             "low": {"color": impact_colors[IncidentImpact.LOW], "label": "Low"}
+        }
+    
+    data["generated_at"] = datetime.utcnow().isoformat()
+    return data
+
+def naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # Stored timestamps are naive UTC
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+def encode_history_cursor(created_at: datetime, incident_id: str) -> str:
+    """Opaque cursor for the position after an incident in the history order."""
+    return base64.urlsafe_b64encode(orjson.dumps([created_at.isoformat(), incident_id])).rstrip(b"=").decode()
+
+def decode_history_cursor(cursor: str) -> Tuple[datetime, str]:
+    """(created_at, id) from encode_history_cursor; ValueError if malformed."""
+    try:
+        created_at, incident_id = orjson.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return naive_utc(datetime.fromisoformat(created_at)), str(incident_id)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+def get_incident_history(
+    db: Session,
+    org_identifier: str,
+    service_id: Optional[str] = None,
+    impacts: Optional[Tuple[str, ...]] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = 25
+) -> Optional[Dict[str, Any]]:
+    """
+    One page of an organization's incident history, newest first.
+    Pages are keyed by (created_at, id) rather than offset, so every page is
+    an index range scan however deep it is: on (service_id, created_at, id)
+    for one service, on (organization_id, created_at, id) across all of them.
+    A page is "settled" when new incidents can't land on it (its range ends
+    in the past) and every incident on it was resolved long enough ago. Edits,
+    deletes and service renames can still change it, so it's only cached
+    longer where edge purges reach it.
+    """
+    organization = _find_organization(db, org_identifier)
+    
+    if not organization:
+        return None
+    
+    after = decode_history_cursor(cursor) if cursor else None
+    start, end = naive_utc(start), naive_utc(end)
+    service_names = dict(db.query(Service.id, Service.name).filter(Service.organization_id == organization.id).all())
+    
+    incidents = []
+    if not service_id or service_id in service_names:
+        query = db.query(Incident).options(load_only(
+            Incident.id, Incident.title, Incident.description, Incident.status, Incident.impact,
+            Incident.service_id, Incident.created_at, Incident.updated_at, Incident.resolved_at
+        ))
+        if service_id:
+            query = query.filter(Incident.service_id == service_id)
+        else:
+            query = query.filter(Incident.organization_id == organization.id)
+        if impacts:
+            query = query.filter(Incident.impact.in_([IncidentImpact(impact) for impact in impacts]))
+        if start:
+            query = query.filter(Incident.created_at >= start)
+        if end:
+            query = query.filter(Incident.created_at < end)
+        if after:
+            query = query.filter(tuple_(Incident.created_at, Incident.id) < tuple_(*after))
+        incidents = query.order_by(Incident.created_at.desc(), Incident.id.desc()).limit(limit + 1).all()
+    
+    has_more = len(incidents) > limit
+    incidents = incidents[:limit]
+    
+    settled_before = datetime.utcnow() - timedelta(days=settings.HISTORY_SETTLED_AFTER_DAYS)
+    bounds = [bound for bound in (end, after[0] if after else None) if bound is not None]
+    settled = bool(bounds) and min(bounds) <= settled_before and all(
+        incident.resolved_at is not None and incident.resolved_at <= settled_before
+        for incident in incidents
+    )
+    
+    return {
+        "organization": {
+            "id": organization.id,
+            "name": organization.name
         },
-        "generated_at": datetime.utcnow().isoformat()
+        "incidents": [
+            {
+                **_incident_data(incident),
+                "service_id": incident.service_id,
+                "service_name": service_names.get(incident.service_id)
+            }
+            for incident in incidents
+        ],
+        "next_cursor": encode_history_cursor(incidents[-1].created_at, incidents[-1].id) if has_more else None,
+        "has_more": has_more,
+        "settled": settled
     }
@@ -1,9 +1,12 @@
+import uuid
 from sqlalchemy.orm import Session
 from app.models.service import Service, ServiceStatus
 from app.models.user import User, UserRole
 from app.schemas.service import ServiceCreate, ServiceUpdate
 from typing import List, Optional
 from datetime import datetime
+from app.core.invalidation import publish_invalidation
+from app.services.change_feed import DELETE, record_change
 
 def get_services_by_organization(db: Session, organization_id: str) -> List[Service]:
     """Get all services for an organization."""
@@ -19,12 +22,15 @@ def get_service_by_id(db: Session, service_id: str, organization_id: str) -> Opt
 def create_service(db: Session, service_data: ServiceCreate, organization_id: str) -> Service:
     """Create a new service for an organization."""
     service = Service(
+        id=str(uuid.uuid4()),
         name=service_data.name,
         description=service_data.description,
         status=service_data.status,
         organization_id=organization_id
     )
     db.add(service)
+    publish_invalidation(db, "service", organization_id)
+    record_change(db, organization_id, "service", service.id)
     db.commit()
     db.refresh(service)
     return service
@@ -40,6 +46,8 @@ def update_service(db: Session, service_id: str, service_data: ServiceUpdate, or
         for field, value in update_data.items():
             setattr(service, field, value)
         service.updated_at = datetime.utcnow()
+        publish_invalidation(db, "service", organization_id)
+        record_change(db, organization_id, "service", service.id)
         db.commit()
         db.refresh(service)
     
@@ -52,6 +60,8 @@ def delete_service(db: Session, service_id: str, organization_id: str) -> bool:
         return False
     
     db.delete(service)
+    publish_invalidation(db, "service", organization_id)
+    record_change(db, organization_id, "service", service_id, DELETE)
     db.commit()
     return True
 
@@ -63,6 +73,8 @@ def update_service_status(db: Session, service_id: str, status: ServiceStatus, o
     
     service.status = status
     service.updated_at = datetime.utcnow()
+    publish_invalidation(db, "service", organization_id)
+    record_change(db, organization_id, "service", service.id)
     db.commit()
     db.refresh(service)
     return service
@@ -0,0 +1,160 @@
+"""
+Prewarming of public status snapshots.
+
+The busiest organizations (per the tenant tracker) have their snapshots
+rebuilt off the request path when the host starts and right after one of
+them is invalidated, so their viewers never wait on a cold build. One worker
+per host (the holder of the shared store's "prewarm" leadership) does the
+warming, since what it builds lands in the shared store for all of them;
+another takes over if it exits. Every worker contributes its traffic to the
+hot list, which is persisted alongside the last-known-good snapshots, so a
+freshly deployed host knows what to warm before it has seen any traffic.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+from app.core.circuit_breaker import CLOSED, status_breaker
+from app.core.config import settings
+from app.core.heavy_hitters import tenant_tracker
+from app.core.invalidation import InvalidationMessage
+from app.core.snapshots import fallback_store, shared_snapshots
+from app.db.session.database import SessionLocal
+from app.services.status_snapshots import PUBLIC_ENTITIES, warm_snapshot
+
+HOT_LIST_KEY = "prewarm:hot-organizations"
+LEADERSHIP = "prewarm"
+GLOBAL_KEYS = ["directory"]
+
+
+class Prewarmer:
+    """Rebuilds hot snapshots in the background with bounded concurrency."""
+
+    def __init__(self, organizations: int, concurrency: int, interval: float):
+        self.organizations = organizations
+        self.concurrency = concurrency
+        self.interval = interval
+        self._executor = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._hot: Dict[str, List[str]] = {}
+        self._counts: Dict[str, float] = {}
+        self.leader = False
+        self.warmed = 0
+        self.failed = 0
+        self.skipped = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stop.clear()
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="snapshot-prewarm")
+        self._thread = threading.Thread(target=self._run, name="snapshot-prewarm", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        self._thread = self._executor = None
+
+    def on_invalidation(self, message: InvalidationMessage) -> None:
+        """Invalidation bus subscriber: rebuild a hot organization's snapshots right away."""
+        if message.entity not in PUBLIC_ENTITIES or not self.leader:
+            return
+        # Every invalidation also drops the global snapshots
+        self.schedule(self._hot.get(message.organization_id, []) + GLOBAL_KEYS)
+
+    def schedule(self, keys: List[str]) -> None:
+        if self._executor is None:
+            return
+        if status_breaker.state != CLOSED:
+            # Don't add load to a database that is already struggling
+            self.skipped += len(keys)
+            return
+        for key in keys:
+            with self._lock:
+                if key in self._pending:
+                    continue
+                self._pending.add(key)
+            try:
+                self._executor.submit(self._warm, key)
+            except RuntimeError:
+                # Executor shut down underneath us
+                with self._lock:
+                    self._pending.discard(key)
+                return
+
+    def _warm(self, key: str) -> None:
+        db = SessionLocal()
+        try:
+            warm_snapshot(db, key)
+            self.warmed += 1
+        except Exception:
+            # A failed prewarm just means the next viewer builds it
+            self.failed += 1
+        finally:
+            db.close()
+            with self._lock:
+                self._pending.discard(key)
+
+    def _run(self) -> None:
+        self._hot = self._rank()
+        while True:
+            if not self.leader and shared_snapshots.files.hold_leadership(LEADERSHIP):
+                # Just became the host's prewarmer (at start, or the previous one exited)
+                self.leader = True
+                self.schedule([key for keys in self._hot.values() for key in keys] + GLOBAL_KEYS)
+            if self._stop.wait(self.interval):
+                return
+            self._hot = self._rank()
+            self._save()
+
+    def _rank(self) -> Dict[str, List[str]]:
+        """Keys of the busiest organizations, merging this worker's view with the persisted list."""
+        ranked: Dict[str, List] = {}
+        # Other workers' traffic counts too, at half weight so it fades unless still seen
+        for organization_id, count, keys in fallback_store.load_value(HOT_LIST_KEY) or []:
+            ranked[organization_id] = [count * 0.5, keys]
+        for organization_id, count, keys in tenant_tracker.top_organizations(self.organizations):
+            saved_count, saved_keys = ranked.get(organization_id, (0.0, []))
+            merged_keys = keys + [key for key in saved_keys if key not in keys]
+            ranked[organization_id] = [saved_count + count, merged_keys[:tenant_tracker.keys_per_organization]]
+        self._counts = {organization_id: count for organization_id, (count, _) in ranked.items()}
+        busiest = sorted(ranked, key=lambda organization_id: ranked[organization_id][0], reverse=True)
+        return {organization_id: ranked[organization_id][1] for organization_id in busiest[:self.organizations]}
+
+    def _save(self) -> None:
+        fallback_store.save_value(HOT_LIST_KEY, [
+            [organization_id, round(self._counts.get(organization_id, 0.0), 2), keys]
+            for organization_id, keys in self._hot.items()
+        ])
+
+    def stats(self) -> dict:
+        with self._lock:
+            pending = len(self._pending)
+        return {
+            "running": self.running,
+            "leader": self.leader,
+            "hot_organizations": list(self._hot),
+            "pending": pending,
+            "warmed": self.warmed,
+            "failed": self.failed,
+            "skipped": self.skipped
+        }
+
+
+prewarmer = Prewarmer(
+    organizations=settings.PREWARM_TOP_ORGANIZATIONS,
+    concurrency=settings.PREWARM_CONCURRENCY,
+    interval=settings.PREWARM_INTERVAL_SECONDS
+)
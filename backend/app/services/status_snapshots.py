@@ -0,0 +1,484 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from app.core.circuit_breaker import StatusUnavailableError, status_breaker
+from app.core.config import settings
+from app.core.heavy_hitters import tenant_tracker
+from app.core.invalidation import InvalidationMessage
+from app.core.singleflight import status_flights
+from app.core.snapshots import (
+    GLOBAL_SCOPE,
+    Snapshot,
+    build_snapshot,
+    fallback_store,
+    shared_snapshots,
+    snapshot_cache,
+    versions
+)
+from app.core.tenant_costs import attribute_to_organization
+from app.db.session.database import SessionLocal
+from app.services.domain_map import domain_map
+from app.services.organization_settings import get_public_status_page, resolve_public_organization_id
+from app.services.public_status import (
+    INCIDENT_FIELDS,
+    SERVICE_FIELDS,
+    STATUS_SECTIONS,
+    TIMELINE_INCIDENT_FIELDS,
+    TIMELINE_SECTIONS,
+    TIMELINE_SERVICE_FIELDS,
+    get_organization_status_page,
+    get_all_organizations_list,
+    get_organization_incident_timeline,
+    get_incident_history,
+    get_services_status_batch
+)
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Each builder returns every snapshot it can produce from one round of queries
+Builder = Callable[[Session], Optional[List[Snapshot]]]
+
+# Writes to these entities change what public pages show
+PUBLIC_ENTITIES = {"incident", "service", "organization_settings", "organization"}
+
+# Set while prewarming, so warm-up builds aren't counted as traffic
+_local = threading.local()
+
+# Background refreshes for stale-while-revalidate, deduplicated by flight key
+_refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="snapshot-refresh")
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+def _build_and_store(db: Session, build: Builder, stamp: int) -> Optional[List[Snapshot]]:
+    """
+    Run a build under the circuit breaker and cache what it produces.
+    `stamp` is versions.current(GLOBAL_SCOPE) read before the build started.
+    """
+    started = time.perf_counter()
+    try:
+        snapshots = build(db)
+    except SQLAlchemyError:
+        status_breaker.record(time.perf_counter() - started, ok=False)
+        db.rollback()
+        raise
+    status_breaker.record(time.perf_counter() - started, ok=True)
+    for built in snapshots or []:
+        # If its organization was invalidated while the build ran, the data may
+        # predate the change: serve it, but leave it marked out of date and uncached
+        fresh = not versions.changed_since(built.organization_id, stamp)
+        built.version = versions.current(built.organization_id) if fresh else stamp
+        fallback_store.save(built)
+        if fresh and snapshot_cache.put(built, stamp):
+            shared_snapshots.put(built)
+    return snapshots
+
+def _fresh_shared(key: str) -> Optional[List[Snapshot]]:
+    """A fresh snapshot another worker stored for key, promoted into this worker's cache."""
+    snapshot = shared_snapshots.get(key)
+    if snapshot is None or snapshot.age > snapshot_cache.ttl_for(snapshot.organization_id):
+        return None
+    snapshot_cache.put(snapshot)
+    return [snapshot]
+
+def _build_on_host(db: Session, key: str, build: Builder, flight_key: str) -> Optional[List[Snapshot]]:
+    """
+    Build once per host: concurrent callers in this worker share one build,
+    and other workers wait on a host-wide lock and pick up the stored result.
+    """
+    def build_exclusive():
+        stamp = versions.current(GLOBAL_SCOPE)
+        return shared_snapshots.files.run_exclusive(
+            flight_key,
+            lambda: _build_and_store(db, build, stamp),
+            check=lambda: _fresh_shared(key),
+            timeout=settings.SINGLEFLIGHT_TIMEOUT_SECONDS
+        )
+
+    snapshots, shared = status_flights.do(flight_key, build_exclusive)
+    if shared and any(built.version != versions.current(built.organization_id) for built in snapshots or []):
+        # Joined a build whose organization was invalidated during (or since) it: build again.
+        # Writes to other organizations don't disturb the flight
+        snapshots, _ = status_flights.do(flight_key, build_exclusive)
+    return snapshots
+
+def _fallback(key: str) -> Snapshot:
+    """Last-known-good snapshot for key, or StatusUnavailableError."""
+    snapshot = fallback_store.load(key)
+    if snapshot is None:
+        raise StatusUnavailableError(status_breaker.retry_after())
+    return snapshot
+
+def _refresh_in_background(key: str, build: Builder, flight_key: str) -> None:
+    with _refreshing_lock:
+        if flight_key in _refreshing:
+            return
+        _refreshing.add(flight_key)
+
+    def refresh():
+        if not status_breaker.allow():
+            with _refreshing_lock:
+                _refreshing.discard(flight_key)
+            return
+        db = SessionLocal()
+        try:
+            _build_on_host(db, key, build, flight_key)
+        except Exception:
+            # The next request retries; failures are already counted by the breaker
+            pass
+        finally:
+            db.close()
+            status_breaker.release_probe()
+            with _refreshing_lock:
+                _refreshing.discard(flight_key)
+
+    _refresh_executor.submit(refresh)
+
+def _cached(db: Session, key: str, build: Builder, flight_key: Optional[str] = None) -> Optional[Snapshot]:
+    """Look up a snapshot and record the access with the tenant tracker."""
+    snapshot = _lookup(db, key, build, flight_key)
+    if snapshot is not None and not getattr(_local, "warming", False):
+        organization_id = snapshot.organization_id if snapshot.organization_id != GLOBAL_SCOPE else None
+        tenant_tracker.record(organization_id, key.partition(":")[0], key)
+        attribute_to_organization(organization_id)
+    return snapshot
+
+def _lookup(db: Session, key: str, build: Builder, flight_key: Optional[str] = None) -> Optional[Snapshot]:
+    """
+    Return the cached snapshot for key, building (and caching) it on a miss.
+    Lookups go through this worker's cache, then the host-wide shared store.
+    Concurrent misses on the host share one build. Recently expired snapshots
+    are served while a background refresh runs, and when the database is
+    failing the last-known-good snapshot is served instead.
+    """
+    snapshot = snapshot_cache.get(key)
+    if snapshot is not None:
+        return snapshot
+    shared = shared_snapshots.get(key)
+    if shared is not None and shared.age <= snapshot_cache.ttl_for(shared.organization_id):
+        snapshot_cache.put(shared)
+        return shared
+
+    flight_key = flight_key or key
+    expired = snapshot_cache.peek(key) or shared
+    if expired is not None and expired.age <= (
+        snapshot_cache.ttl_for(expired.organization_id) + settings.STATUS_CACHE_STALE_WHILE_REVALIDATE_SECONDS
+    ):
+        # The refresh asks the breaker itself, from the thread that builds
+        _refresh_in_background(key, build, flight_key)
+        return expired
+
+    if not status_breaker.allow():
+        return _fallback(key)
+
+    try:
+        snapshots = _build_on_host(db, key, build, flight_key)
+        if not snapshots:
+            return None
+        snapshot = next((built for built in snapshots if built.key == key), None)
+        if snapshot is None:
+            # Another worker built this family; the sibling we want is in the shared store,
+            # or in the rare case its write failed, build it here
+            found = _fresh_shared(key) or _build_and_store(db, build, versions.current(GLOBAL_SCOPE))
+            snapshot = next((built for built in found or [] if built.key == key), None)
+        return snapshot
+    except SQLAlchemyError:
+        return _fallback(key)
+    finally:
+        # Admitted as the probe but another worker (or flight) did the build
+        status_breaker.release_probe()
+
+def _build_status_views(identifier: str) -> Builder:
+    """The full status page plus its services-only and incidents-only views."""
+    def build(db: Session) -> Optional[List[Snapshot]]:
+        data = get_organization_status_page(db, identifier)
+        if not data:
+            return None
+        organization_id = data["organization"]["id"]
+        services_view = {
+            "organization": data["organization"],
+            "overall_status": data["overall_status"],
+            "services": data["services"],
+            "last_updated": data["last_updated"]
+        }
+        incidents_view = {
+            "organization": data["organization"],
+            "incidents": data["incidents"],
+            "last_updated": data["last_updated"]
+        }
+        return [
+            build_snapshot(f"status:{identifier}", data, organization_id),
+            build_snapshot(f"status-services:{identifier}", services_view, organization_id),
+            build_snapshot(f"status-incidents:{identifier}", incidents_view, organization_id),
+        ]
+    return build
+
+def _selection_key(base: str, **selections: Optional[Tuple[str, ...]]) -> str:
+    """Snapshot key for a view with include/fields selections; plain base key for the full view."""
+    params = [f"{name}={','.join(values)}" for name, values in selections.items() if values is not None]
+    return f"{base}?{'&'.join(params)}" if params else base
+
+def _sparse_status_view(
+    db: Session,
+    key: str,
+    identifier: str,
+    sections: Tuple[str, ...],
+    service_fields: Optional[Tuple[str, ...]],
+    incident_fields: Optional[Tuple[str, ...]]
+) -> Optional[Snapshot]:
+    """A status view with only some sections or fields, built and cached on its own."""
+    def build(db: Session) -> Optional[List[Snapshot]]:
+        data = get_organization_status_page(
+            db, identifier, sections,
+            service_fields if service_fields is not None else SERVICE_FIELDS,
+            incident_fields if incident_fields is not None else INCIDENT_FIELDS
+        )
+        if not data:
+            return None
+        return [build_snapshot(key, data, data["organization"]["id"])]
+    return _cached(db, key, build)
+
+def get_status_page_snapshot(
+    db: Session,
+    org_identifier: str,
+    sections: Optional[Tuple[str, ...]] = None,
+    service_fields: Optional[Tuple[str, ...]] = None,
+    incident_fields: Optional[Tuple[str, ...]] = None
+) -> Optional[Snapshot]:
+    """Snapshot of get_organization_status_page for an org ID or name."""
+    if sections is None and service_fields is None and incident_fields is None:
+        return _cached(db, f"status:{org_identifier}", _build_status_views(org_identifier),
+                       flight_key=f"status-views:{org_identifier}")
+    key = _selection_key(f"status:{org_identifier}", include=sections, services=service_fields, incidents=incident_fields)
+    return _sparse_status_view(
+        db, key, org_identifier, sections if sections is not None else STATUS_SECTIONS, service_fields, incident_fields
+    )
+
+def get_status_services_snapshot(
+    db: Session,
+    org_identifier: str,
+    service_fields: Optional[Tuple[str, ...]] = None
+) -> Optional[Snapshot]:
+    """Snapshot of the services-only status view."""
+    if service_fields is None:
+        return _cached(db, f"status-services:{org_identifier}", _build_status_views(org_identifier),
+                       flight_key=f"status-views:{org_identifier}")
+    key = _selection_key(f"status-services:{org_identifier}", services=service_fields)
+    return _sparse_status_view(db, key, org_identifier, ("overall_status", "services"), service_fields, None)
+
+def get_status_incidents_snapshot(
+    db: Session,
+    org_identifier: str,
+    incident_fields: Optional[Tuple[str, ...]] = None
+) -> Optional[Snapshot]:
+    """Snapshot of the incidents-only status view."""
+    if incident_fields is None:
+        return _cached(db, f"status-incidents:{org_identifier}", _build_status_views(org_identifier),
+                       flight_key=f"status-views:{org_identifier}")
+    key = _selection_key(f"status-incidents:{org_identifier}", incidents=incident_fields)
+    return _sparse_status_view(db, key, org_identifier, ("incidents",), None, incident_fields)
+
+def get_status_services_batch(
+    db: Session,
+    org_identifiers: List[str]
+) -> Tuple[Dict[str, Snapshot], List[str], List[str]]:
+    """
+    Services-only status snapshots for many organizations.
+    Fresh cached snapshots are used as they are; all the others are built
+    together from set-based queries and cached individually, so the next
+    single-org request hits them too.
+    Returns (snapshots by identifier, identifiers not found, identifiers
+    unavailable because the database is failing and nothing was cached).
+    """
+    found: Dict[str, Snapshot] = {}
+    missing = []
+    for identifier in org_identifiers:
+        key = f"status-services:{identifier}"
+        snapshot = snapshot_cache.get(key) or next(iter(_fresh_shared(key) or []), None)
+        if snapshot is None:
+            missing.append(identifier)
+        else:
+            found[identifier] = snapshot
+
+    unavailable = []
+    if missing:
+        def build(db: Session) -> List[Snapshot]:
+            views = get_services_status_batch(db, missing)
+            return [
+                build_snapshot(f"status-services:{identifier}", view, view["organization"]["id"])
+                for identifier, view in views.items()
+            ]
+
+        built = None
+        if status_breaker.allow():
+            try:
+                built = _build_and_store(db, build, versions.current(GLOBAL_SCOPE))
+            except SQLAlchemyError:
+                pass
+        if built is not None:
+            for snapshot in built:
+                found[snapshot.key.partition(":")[2]] = snapshot
+        else:
+            for identifier in missing:
+                snapshot = fallback_store.load(f"status-services:{identifier}")
+                if snapshot is None:
+                    unavailable.append(identifier)
+                else:
+                    found[identifier] = snapshot
+
+    if not getattr(_local, "warming", False):
+        for snapshot in found.values():
+            tenant_tracker.record(snapshot.organization_id, "status-services", snapshot.key)
+    not_found = [
+        identifier for identifier in org_identifiers
+        if identifier not in found and identifier not in unavailable
+    ]
+    return found, not_found, unavailable
+
+def get_directory_snapshot(db: Session) -> Snapshot:
+    """Snapshot of the public organization directory."""
+    key = "directory"
+    return _cached(db, key, lambda db: [build_snapshot(key, get_all_organizations_list(db), GLOBAL_SCOPE)])
+
+def get_timeline_snapshot(
+    db: Session,
+    org_identifier: str,
+    days: int,
+    sections: Optional[Tuple[str, ...]] = None,
+    service_fields: Optional[Tuple[str, ...]] = None,
+    incident_fields: Optional[Tuple[str, ...]] = None
+) -> Optional[Snapshot]:
+    """Snapshot of the incident timeline for a given look-back window."""
+    key = _selection_key(
+        f"timeline:{org_identifier}:{days}", include=sections, services=service_fields, incidents=incident_fields
+    )
+
+    def build(db: Session) -> Optional[List[Snapshot]]:
+        data = get_organization_incident_timeline(
+            db, org_identifier, days,
+            sections if sections is not None else TIMELINE_SECTIONS,
+            service_fields if service_fields is not None else TIMELINE_SERVICE_FIELDS,
+            incident_fields if incident_fields is not None else TIMELINE_INCIDENT_FIELDS
+        )
+        if not data:
+            return None
+        return [build_snapshot(key, data, data["organization"]["id"])]
+
+    return _cached(db, key, build)
+
+def get_incident_history_snapshot(
+    db: Session,
+    org_identifier: str,
+    service_id: Optional[str] = None,
+    impacts: Optional[Tuple[str, ...]] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = 25
+) -> Optional[Snapshot]:
+    """Snapshot of one page of the public incident history (never prewarmed)."""
+    params = {
+        "service": service_id,
+        "impact": ",".join(impacts) if impacts else None,
+        "start": start.isoformat() if start else None,
+        "end": end.isoformat() if end else None,
+        "cursor": cursor,
+        "limit": str(limit)
+    }
+    key = f"history:{org_identifier}?" + "&".join(f"{name}={value}" for name, value in params.items() if value is not None)
+
+    def build(db: Session) -> Optional[List[Snapshot]]:
+        data = get_incident_history(db, org_identifier, service_id, impacts, start, end, cursor, limit)
+        if not data:
+            return None
+        return [build_snapshot(key, data, data["organization"]["id"])]
+
+    return _cached(db, key, build)
+
+def _resolve_public_identifier(db: Session, identifier: str) -> Optional[str]:
+    """
+    Organization ID for a subdomain or custom domain.
+    Known names come from the in-memory domain map; anything else is resolved
+    by query. Resolutions are shared across workers and kept as last-known-good, so
+    every alias of an org serves one snapshot even while the database is down.
+    """
+    organization_id = domain_map.resolve(identifier)
+    if organization_id is not None:
+        return organization_id
+    key = f"resolve:public:{identifier}"
+    organization_id = shared_snapshots.get_value(key)
+    if organization_id is not None:
+        return organization_id
+    if not status_breaker.allow():
+        organization_id = fallback_store.load_value(key)
+        if organization_id is None:
+            raise StatusUnavailableError(status_breaker.retry_after())
+        return organization_id
+    started = time.perf_counter()
+    try:
+        organization_id = resolve_public_organization_id(db, identifier)
+        status_breaker.record(time.perf_counter() - started, ok=True)
+    except SQLAlchemyError:
+        status_breaker.record(time.perf_counter() - started, ok=False)
+        db.rollback()
+        organization_id = fallback_store.load_value(key)
+        if organization_id is None:
+            raise StatusUnavailableError(status_breaker.retry_after())
+        return organization_id
+    if organization_id is not None:
+        shared_snapshots.put_value(key, organization_id, organization_id, versions.current(organization_id))
+        fallback_store.save_value(key, organization_id)
+    return organization_id
+
+def get_public_page_snapshot(db: Session, identifier: str, by_org_id: bool = False) -> Optional[Snapshot]:
+    """Snapshot of the branded public status page by subdomain, custom domain or org ID."""
+    if not by_org_id:
+        organization_id = _resolve_public_identifier(db, identifier)
+        if organization_id is None:
+            return None
+        identifier = organization_id
+    key = f"public-org:{identifier}"
+
+    def build(db: Session) -> Optional[List[Snapshot]]:
+        data = get_public_status_page(db, identifier, by_org_id=True)
+        if not data:
+            return None
+        return [build_snapshot(key, data, data["organization_id"])]
+
+    return _cached(db, key, build)
+
+def warm_snapshot(db: Session, key: str) -> bool:
+    """
+    Make sure the snapshot for a key produced by this module is cached.
+    Returns False for keys this module doesn't know how to build.
+    """
+    family, _, identifier = key.partition(":")
+    if "?" in identifier:
+        # Sparse views are cheap to build and too varied to be worth prewarming
+        return False
+    _local.warming = True
+    try:
+        if key == "directory":
+            get_directory_snapshot(db)
+        elif family == "status":
+            get_status_page_snapshot(db, identifier)
+        elif family == "status-services":
+            get_status_services_snapshot(db, identifier)
+        elif family == "status-incidents":
+            get_status_incidents_snapshot(db, identifier)
+        elif family == "timeline":
+            org_identifier, _, days = identifier.rpartition(":")
+            get_timeline_snapshot(db, org_identifier, int(days))
+        elif family == "public-org":
+            get_public_page_snapshot(db, identifier, by_org_id=True)
+        else:
+            return False
+        return True
+    finally:
+        _local.warming = False
+
+def invalidate_snapshots(message: InvalidationMessage) -> None:
+    """Invalidation bus subscriber: drop an organization's snapshots, once per host."""
+    if message.entity in PUBLIC_ENTITIES and versions.claim(message.version):
+        snapshot_cache.invalidate_organization(message.organization_id)
@@ -4,6 +4,8 @@ from app.models.organization import Organization
 from app.schemas.team_management import UserApprovalRequest, RoleUpdateRequest
 from datetime import datetime
 from typing import List, Optional
+from app.core.invalidation import publish_invalidation
+from app.services.change_feed import record_change
 
 def get_organization_members(db: Session, organization_id: str) -> List[User]:
     """Get all members of an organization."""
@@ -36,6 +38,8 @@ def approve_user(db: Session, user_id: str, approver_id: str, role: str = "viewe
     user.approved_by = approver_id
     user.approved_at = datetime.utcnow()
     
+    publish_invalidation(db, "user", user.organization_id)
+    record_change(db, user.organization_id, "member", user.id)
     db.commit()
     db.refresh(user)
     return user
@@ -53,6 +57,8 @@ def reject_user(db: Session, user_id: str, approver_id: str) -> User:
     user.approved_by = approver_id
     user.approved_at = datetime.utcnow()
     
+    publish_invalidation(db, "user", user.organization_id)
+    record_change(db, user.organization_id, "member", user.id)
     db.commit()
     db.refresh(user)
     return user
@@ -84,6 +90,8 @@ def update_user_role(db: Session, user_id: str, new_role: str, updater_id: str)
     user.role = user_role
     user.updated_at = datetime.utcnow()
     
+    publish_invalidation(db, "user", user.organization_id)
+    record_change(db, user.organization_id, "member", user.id)
     db.commit()
     db.refresh(user)
     return user
@@ -109,6 +117,8 @@ def revoke_user_access(db: Session, user_id: str, revoker_id: str) -> User:
     user.approved_at = datetime.utcnow()
     user.updated_at = datetime.utcnow()
     
+    publish_invalidation(db, "user", user.organization_id)
+    record_change(db, user.organization_id, "member", user.id)
     db.commit()
     db.refresh(user)
     return user
@@ -140,6 +150,8 @@ def restore_user_access(db: Session, user_id: str, new_role: str, approver_id: s
     user.approved_at = datetime.utcnow()
     user.updated_at = datetime.utcnow()
     
+    publish_invalidation(db, "user", user.organization_id)
+    record_change(db, user.organization_id, "member", user.id)
     db.commit()
     db.refresh(user)
     return user
@@ -0,0 +1,517 @@
+#!/usr/bin/env python3
+"""
+Load-testing harness that replays the status-page traffic mix.
+
+Virtual users are split into roles:
+  * viewers  - anonymous status-page polls every POLL_INTERVAL seconds,
+               spread over organizations with a Zipf popularity curve
+  * admins   - dashboard refreshes (/organization/incidents, /incidents-stats,
+               /team/members fired in parallel, as the frontend does)
+  * writers  - a trickle of incident creations that are resolved later
+
+An optional burst multiplies viewer traffic on one organization, which is what
+happens when a big incident is declared. Think times are divided by --speedup
+so a 30s poll loop can be compressed into a short run.
+
+The app can be driven in-process over ASGI (no sockets, no server) or over
+HTTP against a running server. --sweep-workers starts gunicorn with each
+worker count and steps through --concurrency values to find the saturation
+point of a given gunicorn config.
+
+Examples:
+    python benchmarks/loadtest.py --scale small --concurrency 200 --duration 30
+    python benchmarks/loadtest.py --url http://127.0.0.1:8000 --concurrency 500
+    python benchmarks/loadtest.py --scale medium --sweep-workers 1,2,4 --concurrency 50,100,200,400
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import signal
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCHMARKS_DIR)
+
+# Add the backend directory to Python path
+sys.path.append(BACKEND_DIR)
+
+POLL_INTERVAL = 30.0
+ADMIN_REFRESH_INTERVAL = 15.0
+WRITE_INTERVAL = 120.0
+
+# Concrete paths are reported under their route template
+ID_SEGMENT = re.compile(r"/[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}")
+
+
+class ASGIClient:
+    """Calls the ASGI app directly; measures the app, not the network stack."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def start(self):
+        await self.app.router.startup()
+
+    async def close(self):
+        await self.app.router.shutdown()
+
+    async def request(self, method: str, path: str, headers: Dict[str, str], body: bytes = b"") -> Tuple[int, bytes]:
+        path, _, query = path.partition("?")
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": query.encode(),
+            "root_path": "",
+            "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+            "client": ("127.0.0.1", 50000),
+            "server": ("loadtest", 80),
+        }
+        sent = False
+        status = 500
+        chunks = []
+
+        async def receive():
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            await asyncio.Event().wait()
+
+        async def send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        await self.app(scope, receive, send)
+        return status, b"".join(chunks)
+
+
+class HTTPClient:
+    """Minimal keep-alive HTTP/1.1 client on asyncio streams (no dependencies)."""
+
+    def __init__(self, base_url: str, pool_size: int):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.pool: asyncio.LifoQueue = asyncio.LifoQueue()
+        self.slots = asyncio.Semaphore(pool_size)
+
+    async def start(self):
+        pass
+
+    async def close(self):
+        while not self.pool.empty():
+            _, writer = self.pool.get_nowait()
+            writer.close()
+
+    async def request(self, method: str, path: str, headers: Dict[str, str], body: bytes = b"") -> Tuple[int, bytes]:
+        async with self.slots:
+            if self.pool.empty():
+                reader, writer = await asyncio.open_connection(self.host, self.port)
+            else:
+                reader, writer = self.pool.get_nowait()
+            try:
+                status, payload, keep_alive = await self._roundtrip(reader, writer, method, path, headers, body)
+            except Exception:
+                writer.close()
+                raise
+            if keep_alive:
+                self.pool.put_nowait((reader, writer))
+            else:
+                writer.close()
+            return status, payload
+
+    async def _roundtrip(self, reader, writer, method, path, headers, body):
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}", f"Content-Length: {len(body)}"]
+        lines.extend(f"{k}: {v}" for k, v in headers.items())
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode() + body)
+        await writer.drain()
+
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionError("connection closed")
+        status = int(status_line.split()[1])
+        response_headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            response_headers[name.strip().lower()] = value.strip()
+
+        if response_headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    await reader.readline()
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readline()
+            payload = b"".join(chunks)
+        else:
+            payload = await reader.readexactly(int(response_headers.get("content-length", 0)))
+        keep_alive = response_headers.get("connection", "").lower() != "close"
+        return status, payload, keep_alive
+
+
+class Stats:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.recording = False
+
+    def record(self, label: str, seconds: float, ok: bool):
+        if not self.recording:
+            return
+        self.latencies[label].append(seconds * 1000)
+        if not ok:
+            self.errors[label] += 1
+
+    def report(self, elapsed: float) -> dict:
+        endpoints = {}
+        all_latencies = []
+        for label, values in sorted(self.latencies.items()):
+            values.sort()
+            all_latencies.extend(values)
+            endpoints[label] = _summarize(values, elapsed, self.errors[label])
+        all_latencies.sort()
+        return {
+            "elapsed_seconds": round(elapsed, 2),
+            "total": _summarize(all_latencies, elapsed, sum(self.errors.values())),
+            "endpoints": endpoints,
+        }
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))]
+
+
+def _summarize(values: List[float], elapsed: float, errors: int) -> dict:
+    return {
+        "requests": len(values),
+        "errors": errors,
+        "rps": round(len(values) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(_percentile(values, 0.50), 2),
+        "p90_ms": round(_percentile(values, 0.90), 2),
+        "p99_ms": round(_percentile(values, 0.99), 2),
+        "max_ms": round(values[-1], 2) if values else 0.0,
+        "mean_ms": round(statistics.fmean(values), 2) if values else 0.0,
+    }
+
+
+def load_targets(engine) -> dict:
+    """Organizations (with popularity weights), admin logins and services per org."""
+    from sqlalchemy.orm import sessionmaker
+    from app.models.organization import Organization
+    from app.models.organization_settings import OrganizationSettings
+    from app.models.service import Service
+    from app.models.user import User, UserRole, UserStatus
+
+    db = sessionmaker(bind=engine)()
+    try:
+        orgs = db.query(Organization.id, OrganizationSettings.subdomain).outerjoin(
+            OrganizationSettings, OrganizationSettings.organization_id == Organization.id
+        ).all()
+        admins = db.query(User.email, User.organization_id).filter(
+            User.role == UserRole.ADMIN, User.status == UserStatus.APPROVED
+        ).all()
+        services = defaultdict(list)
+        for service_id, org_id in db.query(Service.id, Service.organization_id):
+            services[org_id].append(service_id)
+    finally:
+        db.close()
+
+    rng = random.Random(7)
+    orgs = list(orgs)
+    rng.shuffle(orgs)
+    # Zipf popularity: a few tenants attract most viewers
+    weights = [1.0 / (rank + 1) ** 1.1 for rank in range(len(orgs))]
+    return {
+        "orgs": [{"id": org_id, "subdomain": subdomain} for org_id, subdomain in orgs],
+        "weights": weights,
+        "admins": [{"email": email, "organization_id": org_id} for email, org_id in admins if services.get(org_id)],
+        "services": services,
+    }
+
+
+class LoadTest:
+    def __init__(self, client, targets: dict, args):
+        self.client = client
+        self.targets = targets
+        self.args = args
+        self.stats = Stats()
+        self.stop = asyncio.Event()
+        self.burst = asyncio.Event()
+        self.burst_org = targets["orgs"][0] if targets["orgs"] else None
+        self.rng = random.Random(args.seed)
+
+    async def pause(self, interval: float):
+        """Sleep for an exponential think time, waking early when the run stops."""
+        try:
+            await asyncio.wait_for(self.stop.wait(), timeout=self.think(interval))
+        except asyncio.TimeoutError:
+            pass
+
+    def think(self, interval: float) -> float:
+        interval = interval / self.args.speedup
+        return self.rng.expovariate(1.0 / interval) if interval > 0 else 0.0
+
+    async def call(self, method: str, path: str, headers: Optional[Dict[str, str]] = None, payload=None,
+                   label: Optional[str] = None) -> Tuple[int, bytes]:
+        headers = dict(headers or {})
+        body = b""
+        if payload is not None:
+            body = json.dumps(payload).encode()
+            headers["Content-Type"] = "application/json"
+        label = f"{method} {label or ID_SEGMENT.sub('/{id}', path.split('?')[0])}"
+        started = time.perf_counter()
+        try:
+            status, response = await self.client.request(method, path, headers, body)
+        except Exception:
+            self.stats.record(label, time.perf_counter() - started, False)
+            return 599, b""
+        self.stats.record(label, time.perf_counter() - started, status < 400)
+        return status, response
+
+    async def viewer(self):
+        await asyncio.sleep(self.rng.random() * self.think(POLL_INTERVAL))
+        while not self.stop.is_set():
+            bursting = self.burst.is_set()
+            if bursting and self.rng.random() < 0.8:
+                org = self.burst_org
+            else:
+                org = self.rng.choices(self.targets["orgs"], weights=self.targets["weights"])[0]
+            roll = self.rng.random()
+            if roll < 0.70:
+                await self.call("GET", f"/api/v1/status/organizations/{org['id']}/status")
+            elif roll < 0.85 and org["subdomain"]:
+                await self.call("GET", f"/api/v1/organizations/public/{org['subdomain']}",
+                                label="/api/v1/organizations/public/{identifier}")
+            elif roll < 0.95:
+                await self.call("GET", f"/api/v1/organizations/public/{org['id']}/incidents/timeline?days=30")
+            else:
+                await self.call("GET", "/api/v1/status/organizations")
+            interval = POLL_INTERVAL / (self.args.burst_factor if bursting else 1.0)
+            await self.pause(interval)
+
+    async def login(self, admin: dict) -> Optional[Dict[str, str]]:
+        status, body = await self.call("POST", "/api/v1/auth/login", payload={
+            "email": admin["email"], "password": self.args.password
+        })
+        if status != 200:
+            return None
+        return {"Authorization": f"Bearer {json.loads(body)['access_token']}"}
+
+    async def admin(self, admin: dict):
+        headers = await self.login(admin)
+        if headers is None:
+            return
+        while not self.stop.is_set():
+            await asyncio.gather(
+                self.call("GET", "/api/v1/organization/incidents", headers),
+                self.call("GET", "/api/v1/organization/services", headers),
+                self.call("GET", "/api/v1/organization/incidents-stats", headers),
+                self.call("GET", "/api/v1/team/members", headers),
+            )
+            await self.pause(ADMIN_REFRESH_INTERVAL)
+
+    async def writer(self, admin: dict):
+        headers = await self.login(admin)
+        if headers is None:
+            return
+        services = self.targets["services"][admin["organization_id"]]
+        open_incidents = []
+        while not self.stop.is_set():
+            await self.pause(WRITE_INTERVAL)
+            if self.stop.is_set():
+                break
+            if open_incidents and self.rng.random() < 0.5:
+                incident_id = open_incidents.pop(0)
+                await self.call("PATCH", f"/api/v1/organization/incidents/{incident_id}/status", headers,
+                                {"status": "resolved", "update_message": "Resolved by load test"})
+                continue
+            status, body = await self.call("POST", "/api/v1/organization/incidents", headers, {
+                "title": "Load test incident",
+                "description": "Synthetic incident created by the load-testing harness.",
+                "impact": self.rng.choice(["low", "medium", "high", "critical"]),
+                "service_id": self.rng.choice(services),
+            })
+            if status == 200:
+                open_incidents.append(json.loads(body)["id"])
+
+    async def burst_schedule(self):
+        if self.args.burst_at is None:
+            return
+        await asyncio.sleep(self.args.warmup + self.args.burst_at)
+        self.burst.set()
+        await asyncio.sleep(self.args.burst_duration)
+        self.burst.clear()
+
+    async def run(self, concurrency: int) -> dict:
+        admins = list(self.targets["admins"])
+        self.rng.shuffle(admins)
+        n_admins = min(len(admins), int(round(concurrency * self.args.admin_fraction)))
+        n_writers = min(len(admins) - n_admins, int(round(concurrency * self.args.writer_fraction)))
+        n_viewers = max(0, concurrency - n_admins - n_writers)
+
+        tasks = [asyncio.create_task(self.viewer()) for _ in range(n_viewers)]
+        tasks += [asyncio.create_task(self.admin(admin)) for admin in admins[:n_admins]]
+        tasks += [asyncio.create_task(self.writer(admin)) for admin in admins[n_admins:n_admins + n_writers]]
+        tasks.append(asyncio.create_task(self.burst_schedule()))
+
+        await asyncio.sleep(self.args.warmup)
+        self.stats.recording = True
+        started = time.perf_counter()
+        await asyncio.sleep(self.args.duration)
+        self.stats.recording = False
+        elapsed = time.perf_counter() - started
+        self.stop.set()
+        # Let in-flight requests finish so sessions are not torn down mid-query
+        _, pending = await asyncio.wait(tasks, timeout=self.args.drain_timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        report = self.stats.report(elapsed)
+        report["users"] = {"viewers": n_viewers, "admins": n_admins, "writers": n_writers}
+        return report
+
+
+def print_report(report: dict, title: str):
+    print(f"\n📊 {title}  ({report['users']['viewers']} viewers, {report['users']['admins']} admins, "
+          f"{report['users']['writers']} writers, {report['elapsed_seconds']}s)")
+    print(f"   {'endpoint':62s} {'reqs':>7s} {'err':>5s} {'rps':>8s} {'p50':>8s} {'p90':>8s} {'p99':>8s}")
+    rows = list(report["endpoints"].items()) + [("TOTAL", report["total"])]
+    for label, row in rows:
+        print(f"   {label[:62]:62s} {row['requests']:7d} {row['errors']:5d} {row['rps']:8.1f} "
+              f"{row['p50_ms']:8.1f} {row['p90_ms']:8.1f} {row['p99_ms']:8.1f}")
+
+
+async def run_once(client, targets: dict, args, concurrency: int) -> dict:
+    await client.start()
+    try:
+        return await LoadTest(client, targets, args).run(concurrency)
+    finally:
+        await client.close()
+
+
+def start_gunicorn(workers: int, port: int, database_url: str) -> subprocess.Popen:
+    env = dict(os.environ, DATABASE_URL=database_url, PROFILER_ENABLED=os.environ.get("PROFILER_ENABLED", "false"))
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "app.main:app", "-c", "gunicorn.conf.py",
+         "-w", str(workers), "-b", f"127.0.0.1:{port}", "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            import urllib.request
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/api/v1/health", timeout=1)
+            return process
+        except Exception:
+            if process.poll() is not None:
+                raise RuntimeError("gunicorn exited during startup")
+            time.sleep(0.5)
+    process.send_signal(signal.SIGTERM)
+    raise RuntimeError("gunicorn did not become healthy")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay the status-page traffic mix and report latency/throughput.")
+    parser.add_argument("--scale", default="small", help="Dataset scale from benchmarks/run.py (ignored with --database-url)")
+    parser.add_argument("--database-url", default=None, help="Database the app under test uses")
+    parser.add_argument("--url", default=None, help="Drive a running server over HTTP instead of in-process ASGI")
+    parser.add_argument("--concurrency", default="100", help="Virtual users; comma-separated list to step through")
+    parser.add_argument("--duration", type=float, default=30.0, help="Measured seconds per step")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Unmeasured seconds before each step")
+    parser.add_argument("--speedup", type=float, default=10.0, help="Divide think times (30s polls) by this factor")
+    parser.add_argument("--admin-fraction", type=float, default=0.03)
+    parser.add_argument("--writer-fraction", type=float, default=0.01)
+    parser.add_argument("--burst-at", type=float, default=None, help="Start an incident burst this many seconds into the run")
+    parser.add_argument("--burst-duration", type=float, default=10.0)
+    parser.add_argument("--burst-factor", type=float, default=10.0, help="Viewer poll-rate multiplier during the burst")
+    parser.add_argument("--password", default="password123", help="Password of generated admin users")
+    parser.add_argument("--sweep-workers", default=None, help="Comma-separated gunicorn worker counts to sweep")
+    parser.add_argument("--port", type=int, default=18000, help="Port for gunicorn during sweeps")
+    parser.add_argument("--pool-size", type=int, default=256, help="Max open connections in HTTP mode")
+    parser.add_argument("--drain-timeout", type=float, default=30.0, help="Seconds to wait for in-flight requests after each step")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default=None, help="Write the full report as JSON")
+    args = parser.parse_args()
+
+    concurrencies = [int(value) for value in args.concurrency.split(",")]
+    # The app reads DATABASE_URL at import time, so set it before importing anything from app
+    generate = args.database_url is None
+    if generate:
+        args.database_url = f"sqlite:///{os.path.join(BENCHMARKS_DIR, '.data', args.scale + '.db')}"
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("PROFILER_ENABLED", "false")
+    if generate:
+        from benchmarks.run import prepare_database
+        prepare_database(args.scale, None, False)
+    from sqlalchemy import create_engine
+    targets = load_targets(create_engine(args.database_url))
+
+    reports = []
+    if args.sweep_workers:
+        for workers in [int(value) for value in args.sweep_workers.split(",")]:
+            process = start_gunicorn(workers, args.port, args.database_url)
+            try:
+                for concurrency in concurrencies:
+                    client = HTTPClient(f"http://127.0.0.1:{args.port}", args.pool_size)
+                    report = asyncio.run(run_once(client, targets, args, concurrency))
+                    report.update({"workers": workers, "concurrency": concurrency})
+                    print_report(report, f"{workers} workers × {concurrency} users")
+                    reports.append(report)
+            finally:
+                process.send_signal(signal.SIGTERM)
+                process.wait(timeout=30)
+
+        print("\n🏁 Saturation sweep (total throughput / p99):")
+        for workers in sorted({r["workers"] for r in reports}):
+            row = [r for r in reports if r["workers"] == workers]
+            cells = "  ".join(f"{r['concurrency']}u: {r['total']['rps']:.0f} rps / {r['total']['p99_ms']:.0f} ms" for r in row)
+            knee = next((current for previous, current in zip(row, row[1:])
+                         if current["total"]["rps"] < previous["total"]["rps"] * 1.05), None)
+            suffix = f"  ← saturates near {knee['concurrency']} users" if knee else ""
+            print(f"   {workers:3d} workers  {cells}{suffix}")
+    else:
+        for concurrency in concurrencies:
+            if args.url:
+                client = HTTPClient(args.url, args.pool_size)
+            else:
+                from app.main import app
+                client = ASGIClient(app)
+            report = asyncio.run(run_once(client, targets, args, concurrency))
+            report.update({"concurrency": concurrency, "target": args.url or "asgi"})
+            print_report(report, f"{args.url or 'in-process ASGI'} × {concurrency} users")
+            reports.append(report)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(reports, f, indent=2)
+        print(f"\n💾 Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -15,7 +15,7 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from sqlalchemy.orm import Session
 from app.db.session.database import engine, SessionLocal
-from app.db.session.base import Base
+from app.db.session.schema import sync_schema
 from app.models.user import User, UserRole, UserStatus
 from app.models.organization import Organization, OrganizationStatus
 from app.models.service import Service, ServiceStatus
@@ -175,6 +175,8 @@ def create_organizations(db: Session) -> List[Organization]:
 def create_users(db: Session, organizations: List[Organization]) -> List[User]:
     """Create sample users for each organization."""
     users = []
+    # bcrypt is deliberately slow; every seeded user shares the same password
+    hashed_password = get_password_hash("password123")
     
     for org in organizations:
         # Generate domain from organization name
@@ -185,7 +187,7 @@ def create_users(db: Session, organizations: List[Organization]) -> List[User]:
                 email=user_template["email"].format(domain=domain),
                 first_name=user_template["first_name"],
                 last_name=user_template["last_name"],
-                hashed_password=get_password_hash("password123"),
+                hashed_password=hashed_password,
                 role=user_template["role"],
                 status=user_template["status"],
                 organization_id=org.id,
@@ -252,6 +254,7 @@ def create_incidents(db: Session, services: List[Service], users: List[User]) ->
                 status=template["status"],
                 impact=template["impact"],
                 service_id=service.id,
+                organization_id=service.organization_id,
                 created_by=creator.id,
                 created_at=created_time,
                 resolved_at=created_time + timedelta(hours=random.randint(1, 48)) if template["status"] == IncidentStatus.RESOLVED else None
@@ -268,7 +271,7 @@ def main():
     print("🌱 Starting database seeding...")
     
     # Create database tables
-    Base.metadata.create_all(bind=engine)
+    sync_schema(engine)
     
     db = SessionLocal()
     
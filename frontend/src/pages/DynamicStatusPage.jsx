@@ -150,8 +150,8 @@ const DynamicStatusPage = () => {
             }}
         >
             {/* Custom CSS */}
-            {statusPage.custom_css && (
-                <style dangerouslySetInnerHTML={{ __html: statusPage.custom_css }} />
+            {statusPage.custom_css_url && (
+                <link rel="stylesheet" href={`http://127.0.0.1:8000${statusPage.custom_css_url}`} />
             )}
             
             <Container maxWidth="lg">
@@ -90,34 +90,40 @@ const IncidentManagement = () => {
   const [menuIncident, setMenuIncident] = useState(null);
 
   useEffect(() => {
-    fetchIncidents();
-    fetchServices();
-    fetchIncidentCounts();
+    refreshData();
   }, [tabValue]);
 
-  useEffect(() => {
-    // Fetch counts on initial load
-    fetchIncidentCounts();
-  }, []);
+  // Active incidents, services and counts come from one dashboard request;
+  // the full incident list is only needed on the "All" tab
+  const refreshData = () => {
+    fetchDashboard();
+    if (tabValue === 1) {
+      fetchIncidents();
+    }
+  };
 
-  const fetchIncidentCounts = async () => {
+  const fetchDashboard = async () => {
     try {
-      // Fetch active incidents count
-      const activeResponse = await apiClient.get('/organization/incidents?active_only=true');
-      setActiveIncidentCount(activeResponse.data.length);
-      
-      // Fetch all incidents count
-      const allResponse = await apiClient.get('/organization/incidents?active_only=false');
-      setTotalIncidentCount(allResponse.data.length);
+      const response = await apiClient.get('/organization/dashboard');
+      const { active_incidents, services, incident_stats } = response.data;
+      if (tabValue === 0) {
+        setIncidents(active_incidents);
+      }
+      setServices(services);
+      setActiveIncidentCount(incident_stats.active_incidents);
+      setTotalIncidentCount(incident_stats.total_incidents);
+      setError('');
     } catch (error) {
-      console.error('Error fetching incident counts:', error);
+      console.error('Error fetching dashboard:', error);
+      setError('Failed to fetch incidents');
+    } finally {
+      setLoading(false);
     }
   };
 
   const fetchIncidents = async () => {
     try {
-      const activeOnly = tabValue === 0; // Tab 0 = Active incidents, Tab 1 = All incidents
-      const response = await apiClient.get(`/organization/incidents?active_only=${activeOnly}`);
+      const response = await apiClient.get('/organization/incidents?active_only=false');
       setIncidents(response.data);
       setError('');
     } catch (error) {
@@ -128,23 +134,13 @@ const IncidentManagement = () => {
     }
   };
 
-  const fetchServices = async () => {
-    try {
-      const response = await apiClient.get('/organization/services');
-      setServices(response.data);
-    } catch (error) {
-      console.error('Error fetching services:', error);
-    }
-  };
-
   const handleCreateIncident = async () => {
     try {
       await apiClient.post('/organization/incidents', formData);
       setSuccess('Incident created successfully');
       setCreateDialogOpen(false);
       setFormData({ title: '', description: '', impact: 'medium', service_id: '' });
-      fetchIncidents();
-      fetchIncidentCounts();
+      refreshData();
     } catch (error) {
       console.error('Error creating incident:', error);
       setError(error.response?.data?.detail || 'Failed to create incident');
@@ -158,8 +154,7 @@ const IncidentManagement = () => {
       setEditDialogOpen(false);
       setSelectedIncident(null);
       setFormData({ title: '', description: '', impact: 'medium', service_id: '' });
-      fetchIncidents();
-      fetchIncidentCounts();
+      refreshData();
     } catch (error) {
       console.error('Error updating incident:', error);
       setError(error.response?.data?.detail || 'Failed to update incident');
@@ -173,8 +168,7 @@ const IncidentManagement = () => {
       setStatusDialogOpen(false);
       setSelectedIncident(null);
       setStatusFormData({ status: 'investigating', update_message: '' });
-      fetchIncidents();
-      fetchIncidentCounts();
+      refreshData();
     } catch (error) {
       console.error('Error updating incident status:', error);
       setError(error.response?.data?.detail || 'Failed to update incident status');
@@ -187,8 +181,7 @@ const IncidentManagement = () => {
       setSuccess('Incident deleted successfully');
       setDeleteDialogOpen(false);
       setSelectedIncident(null);
-      fetchIncidents();
-      fetchIncidentCounts();
+      refreshData();
     } catch (error) {
       console.error('Error deleting incident:', error);
       setError(error.response?.data?.detail || 'Failed to delete incident');